@@ -0,0 +1,95 @@
+import math
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional
+import numpy as np
+from src.arbitrage.analyzer import ArbitrageOpportunity
+from src.exchanges.base import Ticker
+from src.exchanges.orderbook import OrderBook
+
+
+class MarketGenerator:
+    def __init__(
+        self,
+        symbols: int = 2000,
+        exchanges: int = 20,
+        seed: int = 42,
+        spread_bps: float = 2.0,
+        dispersion_bps: float = 30.0,
+        timestamp: Optional[datetime] = None,
+    ):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.symbols = [f"SYM{i:04d}/USDT" for i in range(symbols)]
+        self.exchanges = [f"venue{i:02d}" for i in range(exchanges)]
+        self.spread = spread_bps / 10000
+        self.dispersion = dispersion_bps / 10000
+        self.timestamp = timestamp or datetime(2024, 1, 1)
+        self.mid_prices = np.exp(
+            self.rng.uniform(math.log(0.01), math.log(60000), symbols)
+        )
+
+    def quote_matrix(self):
+        shape = (len(self.symbols), len(self.exchanges))
+        mids = self.mid_prices[:, None] * (
+            1 + self.rng.normal(0, self.dispersion, shape)
+        )
+        half_spread = mids * self.spread / 2
+        volumes = self.rng.lognormal(8, 1.5, shape)
+        return mids - half_spread, mids + half_spread, mids, volumes
+
+    def tickers(self) -> List[Ticker]:
+        bids, asks, mids, volumes = self.quote_matrix()
+        return [
+            Ticker(
+                exchange=exchange,
+                symbol=symbol,
+                bid=float(bids[i, j]),
+                ask=float(asks[i, j]),
+                last=float(mids[i, j]),
+                volume=float(volumes[i, j]),
+                timestamp=self.timestamp,
+            )
+            for i, symbol in enumerate(self.symbols)
+            for j, exchange in enumerate(self.exchanges)
+        ]
+
+    def book_levels(self, mid: float, depth: int):
+        tick = mid * 0.0001
+        offsets = np.cumsum(self.rng.integers(1, 4, depth)) * tick
+        bid_sizes = self.rng.lognormal(0, 1, depth)
+        ask_sizes = self.rng.lognormal(0, 1, depth)
+        bids = list(zip((mid - offsets).tolist(), bid_sizes.tolist()))
+        asks = list(zip((mid + offsets).tolist(), ask_sizes.tolist()))
+        return bids, asks
+
+    def orderbook(self, exchange: str, symbol: str, depth: int = 500) -> OrderBook:
+        mid = self.mid_prices[self.symbols.index(symbol)] * (
+            1 + self.rng.normal(0, self.dispersion)
+        )
+        bids, asks = self.book_levels(float(mid), depth)
+        return OrderBook(exchange, symbol, bids, asks, self.timestamp)
+
+    def opportunities(self, count: int) -> List[ArbitrageOpportunity]:
+        rng = random.Random(self.seed)
+        opportunities = []
+        for i in range(count):
+            index = rng.randrange(len(self.symbols))
+            buy, sell = rng.sample(self.exchanges, 2)
+            buy_price = float(self.mid_prices[index])
+            profit_percent = rng.uniform(0.5, 3.0)
+            volume = rng.uniform(0.1, 100)
+            opportunities.append(
+                ArbitrageOpportunity(
+                    symbol=self.symbols[index],
+                    buy_exchange=buy,
+                    sell_exchange=sell,
+                    buy_price=buy_price,
+                    sell_price=buy_price * (1 + profit_percent / 100),
+                    profit_percent=profit_percent,
+                    profit_usd=buy_price * volume * profit_percent / 100,
+                    volume=volume,
+                    timestamp=self.timestamp + timedelta(milliseconds=i),
+                )
+            )
+        return opportunities
@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import settings
+from src.exchanges.binance import BinanceExchange
+from src.exchanges.fake import LATENCY_DISTRIBUTIONS, FakeExchange, FakeExchangeServer
+from src.main import ArbitrageBot
+
+
+def build_prices(
+    pairs: int, exchanges: int, seed: int, dispersion_percent: float
+) -> List[Dict[str, float]]:
+    rng = random.Random(seed)
+    base = {f"SYM{i:04d}/USDT": rng.lognormvariate(3, 2) for i in range(pairs)}
+    return [
+        {
+            symbol: price * (1 + rng.gauss(0, dispersion_percent / 100))
+            for symbol, price in base.items()
+        }
+        for _ in range(exchanges)
+    ]
+
+
+async def _serve(config: dict, conn):
+    servers = [
+        FakeExchangeServer(prices=prices, seed=config["seed"] + i, **config["server"])
+        for i, prices in enumerate(config["prices"])
+    ]
+    conn.send([await server.start() for server in servers])
+
+    await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+    stats = {
+        "requests": sum(sum(s.request_counts.values()) for s in servers),
+        "statuses": {},
+    }
+    for server in servers:
+        for status, count in server.status_counts.items():
+            stats["statuses"][str(status)] = (
+                stats["statuses"].get(str(status), 0) + count
+            )
+        await server.stop()
+    conn.send(stats)
+
+
+def serve(config: dict, conn):
+    logging.getLogger().setLevel(config["log_level"])
+    asyncio.run(_serve(config, conn))
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def configure_bot_settings(args, pairs: int):
+    settings.trading_pairs = [f"SYM{i:04d}/USDT" for i in range(pairs)]
+    settings.data_collection_interval_seconds = args.interval
+    settings.market_data_mode = args.mode
+    settings.depth_aware_sizing = not args.no_depth
+    settings.orderbook_depth = args.depth
+    settings.metrics_enabled = False
+    settings.tick_store_path = ""
+    settings.profile_on_start = False
+
+
+def build_exchanges(venue: str, urls: List[str]) -> List:
+    if venue == "fake":
+        return [FakeExchange(f"fake{i}", url) for i, url in enumerate(urls)]
+
+    exchanges = []
+    for i, url in enumerate(urls):
+        exchange = BinanceExchange("", "", rest_url=url)
+        exchange.name = f"binance{i}"
+        exchanges.append(exchange)
+    return exchanges
+
+
+async def drive(args, urls: List[str]) -> Dict:
+    bot = ArbitrageBot()
+    bot.exchanges = build_exchanges(args.venue, urls)
+    if args.executor_latency is not None:
+        bot.executor.simulated_latency_seconds = args.executor_latency
+    await bot.initialize()
+    logging.getLogger().setLevel(args.log_level)
+
+    cycles = bot.metrics_collector.cycles.cumulative
+    samples = []
+    started, cpu_started = time.monotonic(), time.process_time()
+    last_at, last_cpu, last_count = started, cpu_started, 0
+    task = asyncio.create_task(bot.run())
+
+    while time.monotonic() - started < args.duration and not task.done():
+        await asyncio.sleep(args.sample_interval)
+        now, cpu = time.monotonic(), time.process_time()
+        sample = {
+            "elapsed_seconds": round(now - started, 2),
+            "iterations": cycles.count,
+            "iterations_per_second": (cycles.count - last_count) / (now - last_at),
+            "cpu_percent": 100 * (cpu - last_cpu) / (now - last_at),
+            "rss_mb": rss_bytes() / 2**20,
+            "p50_cycle_seconds": cycles.quantile(0.5),
+            "p99_cycle_seconds": cycles.quantile(0.99),
+        }
+        samples.append(sample)
+        last_at, last_cpu, last_count = now, cpu, cycles.count
+        print(
+            f"  t={sample['elapsed_seconds']:>6.1f}s "
+            f"iter={sample['iterations']:>6} "
+            f"{sample['iterations_per_second']:>7.2f} it/s "
+            f"cpu={sample['cpu_percent']:>5.1f}% "
+            f"rss={sample['rss_mb']:>7.1f} MB "
+            f"p50={sample['p50_cycle_seconds'] * 1000:>8.1f} ms "
+            f"p99={sample['p99_cycle_seconds'] * 1000:>8.1f} ms"
+        )
+
+    elapsed = time.monotonic() - started
+    cpu_seconds = time.process_time() - cpu_started
+    bot.running = False
+    await task
+
+    summary = bot.metrics_collector.get_summary()
+    return {
+        "iterations": cycles.count,
+        "iterations_per_second": cycles.count / elapsed,
+        "cycle_seconds": cycles.summary((0.5, 0.9, 0.99)),
+        "cpu_percent": 100 * cpu_seconds / elapsed,
+        "rss_mb": {
+            "start": samples[0]["rss_mb"] if samples else rss_bytes() / 2**20,
+            "peak": max((s["rss_mb"] for s in samples), default=0.0),
+            "end": rss_bytes() / 2**20,
+        },
+        "fetch_success_rate": summary["fetch_success_rate"],
+        "opportunities_found": summary["total_opportunities_found"],
+        "executions": summary["total_executions"],
+        "samples": samples,
+    }
+
+
+def run_scenario(args, pairs: int) -> Dict:
+    config = {
+        "seed": args.seed,
+        "log_level": args.log_level,
+        "prices": build_prices(pairs, args.exchanges, args.seed, args.dispersion),
+        "server": {
+            "latency_seconds": args.latency,
+            "latency_distribution": args.latency_distribution,
+            "error_rate": args.error_rate,
+            "rate_limit_per_second": args.rate_limit,
+        },
+    }
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe()
+    process = context.Process(target=serve, args=(config, child), daemon=True)
+    process.start()
+    try:
+        urls = parent.recv()
+        configure_bot_settings(args, pairs)
+        print(f"{pairs} pairs x {args.exchanges} {args.venue} exchanges ({args.mode})")
+        result = asyncio.run(drive(args, urls))
+        parent.send("stop")
+        result["server"] = parent.recv()
+    finally:
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+
+    result.update(pairs=pairs, exchanges=args.exchanges)
+    print(
+        f"  => {result['iterations_per_second']:.2f} it/s, "
+        f"p50 {result['cycle_seconds']['p50'] * 1000:.1f} ms, "
+        f"p99 {result['cycle_seconds']['p99'] * 1000:.1f} ms, "
+        f"cpu {result['cpu_percent']:.1f}%, "
+        f"peak rss {result['rss_mb']['peak']:.1f} MB, "
+        f"fetch success {result['fetch_success_rate']:.1%}"
+    )
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the full ArbitrageBot loop against local fake exchanges"
+    )
+    parser.add_argument(
+        "--pairs",
+        default="50",
+        help="Comma-separated trading pair counts; each one runs a scenario",
+    )
+    parser.add_argument("--exchanges", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--sample-interval", type=float, default=5.0)
+    parser.add_argument("--mode", choices=["polling", "streaming"], default="polling")
+    parser.add_argument(
+        "--venue",
+        choices=["binance", "fake"],
+        default="binance",
+        help="binance drives the real ccxt adapter against Binance-shaped REST "
+        "endpoints; fake uses the lightweight FakeExchange client",
+    )
+    parser.add_argument("--interval", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument(
+        "--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="Requests per second each fake exchange accepts before answering 429",
+    )
+    parser.add_argument("--dispersion", type=float, default=0.5)
+    parser.add_argument("--depth", type=int, default=50)
+    parser.add_argument("--no-depth", action="store_true")
+    parser.add_argument("--executor-latency", type=float)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+    if args.venue == "binance" and args.mode == "streaming":
+        parser.error(
+            "streaming needs --venue fake; Binance websockets are not emulated"
+        )
+
+    results = [run_scenario(args, int(pairs)) for pairs in args.pairs.split(",")]
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
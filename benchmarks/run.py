@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+from benchmarks.generators import MarketGenerator
+from src.arbitrage.analyzer import ArbitrageAnalyzer
+from src.arbitrage.depth import executable_size
+from src.arbitrage.executor import ArbitrageExecutor
+from src.azure.archive import ColumnarArchiveWriter
+from src.azure.fake import ACCOUNT_KEY
+from src.azure.storage import StorageManager
+from src.exchanges.orderbook import OrderBook
+from src.marketdata.recorder import TickRecorder
+from src.monitoring import telemetry
+from src.monitoring.metrics import MetricsCollector
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+STORAGE_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=https;AccountName=benchmark;"
+    f"AccountKey={ACCOUNT_KEY};EndpointSuffix=core.windows.net"
+)
+TELEMETRY_CALLS = 5_000
+SHIP_LATENCY_SECONDS = 0.00005
+TELEMETRY_MODES = {
+    "verbose": {"telemetry_mode": "verbose"},
+    "verbose+queue": {
+        "telemetry_mode": "verbose",
+        "async_logging": True,
+        "queue_size": TELEMETRY_CALLS * 2,
+    },
+    "aggregate": {"telemetry_mode": "aggregate", "event_sample_rate": 0.0},
+    "aggregate+1%+queue": {
+        "telemetry_mode": "aggregate",
+        "metric_sample_rate": 0.01,
+        "event_sample_rate": 0.01,
+        "async_logging": True,
+    },
+}
+
+BENCHMARKS: Dict[str, Callable[["Market"], Tuple[int, Callable[[], object]]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+class Market:
+    def __init__(self, args):
+        self.args = args
+        self.generator = MarketGenerator(args.symbols, args.exchanges, args.seed)
+        self.tickers = self.generator.tickers()
+        self.opportunities = self.generator.opportunities(args.opportunities)
+        self.records = [vars(o).copy() for o in self.opportunities]
+
+
+@benchmark("analyzer.analyze_opportunities[numpy]")
+def bench_analyzer_numpy(market: Market):
+    analyzer = ArbitrageAnalyzer(threshold_percent=0.5, engine="numpy")
+    return len(market.tickers), lambda: analyzer.analyze_opportunities(market.tickers)
+
+
+@benchmark("analyzer.analyze_opportunities[python]")
+def bench_analyzer_python(market: Market):
+    analyzer = ArbitrageAnalyzer(threshold_percent=0.5, engine="python")
+    return len(market.tickers), lambda: analyzer.analyze_opportunities(market.tickers)
+
+
+@benchmark("analyzer.top_opportunities[numpy]")
+def bench_analyzer_top(market: Market):
+    analyzer = ArbitrageAnalyzer(threshold_percent=0.5, engine="numpy")
+    return len(market.tickers), lambda: analyzer.top_opportunities(market.tickers, 10)
+
+
+@benchmark("orderbook.snapshot")
+def bench_orderbook_snapshot(market: Market):
+    depth = market.args.depth
+    generator = market.generator
+    levels = [
+        generator.book_levels(float(mid), depth)
+        for mid in generator.mid_prices[: market.args.books]
+    ]
+
+    def build():
+        for bids, asks in levels:
+            OrderBook("venue00", "SYM0000/USDT", bids, asks, generator.timestamp)
+
+    return len(levels) * depth * 2, build
+
+
+@benchmark("depth.executable_size")
+def bench_executable_size(market: Market):
+    generator = market.generator
+    pairs = []
+    for symbol in generator.symbols[: market.args.books]:
+        buy_exchange, sell_exchange = generator.exchanges[:2]
+        buy_book = generator.orderbook(buy_exchange, symbol, market.args.depth)
+        sell_book = generator.orderbook(sell_exchange, symbol, market.args.depth)
+        pairs.append((buy_book, sell_book))
+
+    def run():
+        for buy_book, sell_book in pairs:
+            executable_size(buy_book, sell_book, 1e9)
+
+    return len(pairs), run
+
+
+@benchmark("metrics.record_ticker_fetch")
+def bench_metrics_record(market: Market):
+    collector = MetricsCollector()
+    keys = [(t.exchange, t.symbol) for t in market.tickers]
+
+    def run():
+        for exchange, symbol in keys:
+            collector.record_ticker_fetch(exchange, symbol, True)
+
+    return len(keys), run
+
+
+def _loaded_collector(market: Market) -> MetricsCollector:
+    collector = MetricsCollector()
+    for ticker in market.tickers:
+        collector.record_ticker_fetch(ticker.exchange, ticker.symbol, True)
+    for exchange in market.generator.exchanges:
+        collector.record_fetch_latency(exchange, 0.05)
+    return collector
+
+
+@benchmark("metrics.get_summary")
+def bench_metrics_summary(market: Market):
+    collector = _loaded_collector(market)
+    return 1, collector.get_summary
+
+
+@benchmark("metrics.get_exchange_statistics")
+def bench_metrics_exchange_statistics(market: Market):
+    collector = _loaded_collector(market)
+    return len(market.generator.exchanges), collector.get_exchange_statistics
+
+
+@benchmark("serialize.blob_json")
+def bench_serialize_json(market: Market):
+    records = market.records
+    return len(records), lambda: json.dumps(records, default=str)
+
+
+@benchmark("serialize.archive_columns")
+def bench_serialize_archive(market: Market):
+    writer = ColumnarArchiveWriter(store=None)
+    records = market.records
+    return len(records), lambda: writer._encode_rows(records)
+
+
+@benchmark("serialize.table_entities")
+def bench_serialize_table(market: Market):
+    records = market.records
+
+    async def create():
+        return StorageManager(STORAGE_CONNECTION_STRING)
+
+    loop = asyncio.new_event_loop()
+    storage = loop.run_until_complete(create())
+    loop.run_until_complete(storage.close())
+    loop.close()
+
+    def run():
+        for record in records:
+            storage._to_entity(record)
+
+    return len(records), run
+
+
+@benchmark("executor.get_statistics")
+def bench_executor_statistics(market: Market):
+    executor = ArbitrageExecutor(dry_run=True)
+    executor.executed_trades = list(market.opportunities)
+    return len(executor.executed_trades), executor.get_statistics
+
+
+@benchmark("recorder.record")
+def bench_recorder_record(market: Market):
+    tickers = market.tickers
+
+    def run():
+        recorder = TickRecorder()
+        for ticker in tickers:
+            recorder.record(ticker)
+
+    return len(tickers), run
+
+
+@benchmark("recorder.record_many")
+def bench_recorder_record_many(market: Market):
+    tickers = market.tickers
+    batch = market.args.exchanges * 20
+
+    def run():
+        recorder = TickRecorder()
+        for start in range(0, len(tickers), batch):
+            recorder.record_many(tickers[start : start + batch])
+
+    return len(tickers), run
+
+
+@benchmark("recorder.encode_segments")
+def bench_recorder_encode(market: Market):
+    recorder = TickRecorder()
+    recorder.record_many(market.tickers)
+    segments = recorder.take_segments(force=True)
+    return len(market.tickers), lambda: [segment.encode() for segment in segments]
+
+
+class _ShippingHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord):
+        self.format(record)
+        time.sleep(SHIP_LATENCY_SECONDS)
+
+
+def _telemetry_benchmark(label: str, options: Dict):
+    @benchmark(f"telemetry.track_metric[{label}]")
+    def setup(market: Market):
+        telemetry.stop_telemetry()
+        telemetry.logger.handlers = [_ShippingHandler()]
+        telemetry.logger.propagate = False
+        telemetry.logger.setLevel(logging.INFO)
+        telemetry.configure_telemetry(**options)
+        properties = {"exchange": "binance", "symbol": "BTC/USDT"}
+
+        def run():
+            for i in range(TELEMETRY_CALLS):
+                telemetry.track_metric("ticker_price", float(i), properties)
+
+        return TELEMETRY_CALLS, run
+
+    return setup
+
+
+for label, options in TELEMETRY_MODES.items():
+    _telemetry_benchmark(label, options)
+
+
+def measure(func: Callable[[], object], repeats: int) -> Dict[str, float]:
+    func()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "min_seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "max_seconds": max(timings),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_suite(args) -> Dict:
+    market = Market(args)
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter and args.filter not in name:
+            continue
+
+        items, func = setup(market)
+        result = measure(func, args.repeats)
+        result["items"] = items
+        result["items_per_second"] = items / result["median_seconds"]
+        results[name] = result
+        print(
+            f"{name:<42} {result['median_seconds'] * 1000:>10.2f} ms "
+            f"{result['items_per_second']:>14,.0f} items/s"
+        )
+    telemetry.stop_telemetry()
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "symbols": args.symbols,
+            "exchanges": args.exchanges,
+            "depth": args.depth,
+            "books": args.books,
+            "opportunities": args.opportunities,
+            "seed": args.seed,
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> int:
+    mismatched = [
+        key
+        for key in ("symbols", "exchanges", "depth", "books", "opportunities", "seed")
+        if report["meta"][key] != baseline["meta"].get(key)
+    ]
+    if mismatched:
+        print(f"warning: baseline was recorded with different {', '.join(mismatched)}")
+
+    regressions = 0
+    print(f"\nCompared with baseline {baseline['meta'].get('revision') or '?'}:")
+    for name, result in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"  {name:<42} new")
+            continue
+
+        ratio = result["min_seconds"] / previous["min_seconds"]
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 / (1 + tolerance):
+            status = "faster"
+        print(f"  {name:<42} {ratio:>6.2f}x  {status}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arbitrage bot benchmark suite")
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--exchanges", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=500)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--opportunities", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--output", type=Path, help="Write results to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Overwrite the baseline with this run instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown of the fastest run before a benchmark is a regression",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_suite(args)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline")
+        return 0
+
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
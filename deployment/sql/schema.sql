@@ -12,6 +12,7 @@ CREATE TABLE arbitrage_opportunities (
     created_at DATETIME DEFAULT GETDATE(),
     INDEX idx_symbol (symbol),
     INDEX idx_timestamp (timestamp),
+    INDEX idx_timestamp_id (timestamp, id),
     INDEX idx_profit_percent (profit_percent)
 );
 
@@ -1,7 +1,18 @@
-from typing import List, Dict, Optional
+import asyncio
+import heapq
+import numpy as np
+from collections.abc import Sequence
+from typing import Callable, List, Dict, Optional
 from dataclasses import dataclass
 from datetime import datetime
-from src.exchanges.base import Ticker
+from src.exchanges.base import BaseExchange, OrderBook, Ticker
+from src.arbitrage.depth import executable_size
+from src.arbitrage.matrix import (
+    PriceMatrix,
+    OpportunityArrays,
+    find_opportunities,
+    universe,
+)
 
 
 @dataclass
@@ -17,16 +28,59 @@ class ArbitrageOpportunity:
     timestamp: datetime
 
 
+class RankedOpportunities(Sequence):
+    def __init__(
+        self,
+        total: int,
+        count: int,
+        materialize: Callable[[int], ArbitrageOpportunity],
+        records: Callable[[], List[dict]],
+    ):
+        self.total = total
+        self._count = count
+        self._materialize = materialize
+        self._records = records
+        self._cache: Dict[int, ArbitrageOpportunity] = {}
+
+    def records(self) -> List[dict]:
+        return self._records()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("opportunity index out of range")
+
+        opportunity = self._cache.get(index)
+        if opportunity is None:
+            opportunity = self._cache[index] = self._materialize(index)
+        return opportunity
+
+
 class ArbitrageAnalyzer:
     def __init__(
-        self, threshold_percent: float = 0.5, max_position_size: float = 10000
+        self,
+        threshold_percent: float = 0.5,
+        max_position_size: float = 10000,
+        engine: str = "numpy",
     ):
         self.threshold_percent = threshold_percent
         self.max_position_size = max_position_size
+        self.engine = engine
+        self.matrix: Optional[PriceMatrix] = None
 
     def analyze_opportunities(
         self, tickers: List[Ticker]
     ) -> List[ArbitrageOpportunity]:
+        if self.engine == "numpy":
+            return self._analyze_vectorized(tickers)
+
         opportunities = []
         grouped = self._group_by_symbol(tickers)
 
@@ -39,6 +93,158 @@ class ArbitrageAnalyzer:
 
         return sorted(opportunities, key=lambda x: x.profit_percent, reverse=True)
 
+    def top_opportunities(
+        self, tickers: List[Ticker], limit: int = 10
+    ) -> RankedOpportunities:
+        if self.engine != "numpy":
+            opportunities = self.analyze_opportunities(tickers)
+            top = heapq.nlargest(limit, opportunities, key=lambda x: x.profit_percent)
+            return RankedOpportunities(
+                len(opportunities),
+                len(top),
+                top.__getitem__,
+                lambda: [vars(o).copy() for o in opportunities],
+            )
+
+        matrix, found = self._scan(tickers)
+        profit = found.profit_percent
+        if limit < len(profit):
+            rows = np.argpartition(-profit, limit - 1)[:limit]
+        else:
+            rows = np.arange(len(profit))
+        rows = rows[np.argsort(-profit[rows], kind="stable")]
+        timestamp = datetime.now()
+
+        return RankedOpportunities(
+            len(found),
+            len(rows),
+            lambda i: self._materialize(
+                found, rows[i : i + 1], matrix.symbols, matrix.exchanges, timestamp
+            )[0],
+            lambda: self._records(found, matrix.symbols, matrix.exchanges, timestamp),
+        )
+
+    def _matrix_for(self, tickers: List[Ticker]) -> PriceMatrix:
+        matrix = self.matrix
+        if matrix is not None:
+            matrix.clear()
+            if matrix.update(tickers) == len(tickers):
+                return matrix
+
+        symbols, exchanges = universe(tickers)
+        if matrix is not None:
+            symbols = list(dict.fromkeys(matrix.symbols + symbols))
+            exchanges = list(dict.fromkeys(matrix.exchanges + exchanges))
+            self._release(matrix)
+
+        self.matrix = self._create_matrix(symbols, exchanges)
+        self.matrix.update(tickers)
+        return self.matrix
+
+    def _create_matrix(self, symbols: List[str], exchanges: List[str]) -> PriceMatrix:
+        return PriceMatrix(symbols, exchanges)
+
+    def _release(self, matrix: PriceMatrix):
+        pass
+
+    def _scan(self, tickers: List[Ticker]):
+        matrix = self._matrix_for(tickers)
+        found = find_opportunities(
+            matrix.bids,
+            matrix.asks,
+            matrix.volumes,
+            self.threshold_percent,
+            self.max_position_size,
+        )
+        return matrix, found
+
+    def _analyze_vectorized(self, tickers: List[Ticker]) -> List[ArbitrageOpportunity]:
+        matrix, found = self._scan(tickers)
+        order = np.argsort(-found.profit_percent, kind="stable")
+        return self._materialize(found, order, matrix.symbols, matrix.exchanges)
+
+    def _materialize(
+        self,
+        found: OpportunityArrays,
+        rows: np.ndarray,
+        symbols: List[str],
+        exchanges: List[str],
+        timestamp: Optional[datetime] = None,
+    ) -> List[ArbitrageOpportunity]:
+        timestamp = timestamp or datetime.now()
+        return [
+            ArbitrageOpportunity(
+                symbol=symbols[symbol_idx],
+                buy_exchange=exchanges[buy_idx],
+                sell_exchange=exchanges[sell_idx],
+                buy_price=buy_price,
+                sell_price=sell_price,
+                profit_percent=profit_percent,
+                profit_usd=profit_usd,
+                volume=volume,
+                timestamp=timestamp,
+            )
+            for (
+                symbol_idx,
+                buy_idx,
+                sell_idx,
+                buy_price,
+                sell_price,
+                profit_percent,
+                profit_usd,
+                volume,
+            ) in zip(
+                found.symbol_idx[rows].tolist(),
+                found.buy_idx[rows].tolist(),
+                found.sell_idx[rows].tolist(),
+                found.buy_price[rows].tolist(),
+                found.sell_price[rows].tolist(),
+                found.profit_percent[rows].tolist(),
+                found.profit_usd[rows].tolist(),
+                found.volume[rows].tolist(),
+            )
+        ]
+
+    def _records(
+        self,
+        found: OpportunityArrays,
+        symbols: List[str],
+        exchanges: List[str],
+        timestamp: datetime,
+    ) -> List[dict]:
+        return [
+            {
+                "symbol": symbols[symbol_idx],
+                "buy_exchange": exchanges[buy_idx],
+                "sell_exchange": exchanges[sell_idx],
+                "buy_price": buy_price,
+                "sell_price": sell_price,
+                "profit_percent": profit_percent,
+                "profit_usd": profit_usd,
+                "volume": volume,
+                "timestamp": timestamp,
+            }
+            for (
+                symbol_idx,
+                buy_idx,
+                sell_idx,
+                buy_price,
+                sell_price,
+                profit_percent,
+                profit_usd,
+                volume,
+            ) in zip(
+                found.symbol_idx.tolist(),
+                found.buy_idx.tolist(),
+                found.sell_idx.tolist(),
+                found.buy_price.tolist(),
+                found.sell_price.tolist(),
+                found.profit_percent.tolist(),
+                found.profit_usd.tolist(),
+                found.volume.tolist(),
+            )
+        ]
+
     def _group_by_symbol(self, tickers: List[Ticker]) -> Dict[str, List[Ticker]]:
         grouped = {}
         for ticker in tickers:
@@ -94,3 +300,69 @@ class ArbitrageAnalyzer:
             volume=position_size / buy_price,
             timestamp=datetime.now(),
         )
+
+    def calculate_orderbook_opportunity(
+        self, buy_book: OrderBook, sell_book: OrderBook
+    ) -> Optional[ArbitrageOpportunity]:
+        amount, cost, proceeds = executable_size(
+            buy_book, sell_book, self.max_position_size
+        )
+
+        if amount <= 0:
+            return None
+
+        buy_price = cost / amount
+        sell_price = proceeds / amount
+        profit_percent = ((sell_price - buy_price) / buy_price) * 100
+
+        if profit_percent < self.threshold_percent:
+            return None
+
+        return ArbitrageOpportunity(
+            symbol=buy_book.symbol,
+            buy_exchange=buy_book.exchange,
+            sell_exchange=sell_book.exchange,
+            buy_price=buy_price,
+            sell_price=sell_price,
+            profit_percent=profit_percent,
+            profit_usd=proceeds - cost,
+            volume=amount,
+            timestamp=datetime.now(),
+        )
+
+    async def refine_with_depth(
+        self,
+        candidates: List[ArbitrageOpportunity],
+        exchanges: List[BaseExchange],
+        depth: int = 50,
+    ) -> List[ArbitrageOpportunity]:
+        by_name = {exchange.name: exchange for exchange in exchanges}
+        keys = list(
+            dict.fromkeys(
+                (name, opp.symbol)
+                for opp in candidates
+                for name in (opp.buy_exchange, opp.sell_exchange)
+                if name in by_name
+            )
+        )
+
+        results = await asyncio.gather(
+            *(by_name[name].get_orderbook(symbol, depth) for name, symbol in keys),
+            return_exceptions=True,
+        )
+        books = {
+            key: book for key, book in zip(keys, results) if isinstance(book, OrderBook)
+        }
+
+        refined = []
+        for opp in candidates:
+            buy_book = books.get((opp.buy_exchange, opp.symbol))
+            sell_book = books.get((opp.sell_exchange, opp.symbol))
+            if buy_book is None or sell_book is None:
+                continue
+
+            depth_opp = self.calculate_orderbook_opportunity(buy_book, sell_book)
+            if depth_opp:
+                refined.append(depth_opp)
+
+        return sorted(refined, key=lambda x: x.profit_percent, reverse=True)
@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.arbitrage.analyzer import ArbitrageAnalyzer, ArbitrageOpportunity
+from src.arbitrage.executor import ArbitrageExecutor
+from src.config import settings
+from src.exchanges.base import Ticker
+from src.exchanges.orderbook import OrderBook
+from src.marketdata.recorder import TickSegment
+
+logger = logging.getLogger(__name__)
+
+MarketEvent = Union[Ticker, OrderBook]
+
+
+class VirtualClock:
+    def __init__(self, start: Optional[datetime] = None):
+        self.now = start or datetime(1970, 1, 1)
+
+    def advance_to(self, timestamp: datetime):
+        if timestamp > self.now:
+            self.now = timestamp
+
+    async def sleep(self, seconds: float):
+        self.now += timedelta(seconds=seconds)
+
+
+@dataclass
+class BacktestReport:
+    events: int
+    cycles: int
+    opportunities: int
+    trades: int
+    pnl_usd: float
+    start: Optional[datetime]
+    end: Optional[datetime]
+    wall_seconds: float
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def speedup(self) -> float:
+        if not self.wall_seconds or self.start is None:
+            return 0.0
+        return (self.end - self.start).total_seconds() / self.wall_seconds
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "events_per_second": self.events_per_second,
+            "speedup": self.speedup,
+        }
+
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, timezone.utc).replace(tzinfo=None)
+    return datetime.fromisoformat(value).replace(tzinfo=None)
+
+
+def _event_from_dict(record: dict) -> MarketEvent:
+    timestamp = _parse_timestamp(record["timestamp"])
+    if "bids" in record and "asks" in record:
+        return OrderBook(
+            record["exchange"],
+            record["symbol"],
+            record["bids"],
+            record["asks"],
+            timestamp,
+        )
+    return Ticker(
+        exchange=record["exchange"],
+        symbol=record["symbol"],
+        bid=float(record["bid"]),
+        ask=float(record["ask"]),
+        last=float(record.get("last", record.get("last_price", 0.0))),
+        volume=float(record.get("volume", 0.0)),
+        timestamp=timestamp,
+    )
+
+
+def events_from_bytes(data: bytes, name: str) -> List[MarketEvent]:
+    if name.endswith(".npz"):
+        segment = TickSegment.decode(data)
+        return [Ticker(*row) for row in segment.rows()]
+
+    text = data.decode()
+    if name.endswith(".jsonl"):
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        records = json.loads(text)
+        if isinstance(records, dict):
+            records = records.get("tickers", []) + records.get("orderbooks", [])
+    return [_event_from_dict(record) for record in records]
+
+
+def load_events(paths: Iterable[str]) -> List[MarketEvent]:
+    events = []
+    for path in paths:
+        for file in sorted(Path(path).rglob("*")) if Path(path).is_dir() else [path]:
+            file = Path(file)
+            if file.suffix in (".npz", ".json", ".jsonl"):
+                events.extend(events_from_bytes(file.read_bytes(), file.name))
+    return events
+
+
+class BacktestEngine:
+    def __init__(
+        self,
+        analyzer: Optional[ArbitrageAnalyzer] = None,
+        executor: Optional[ArbitrageExecutor] = None,
+        interval_seconds: float = 10.0,
+        top_limit: int = 10,
+        max_quote_age_seconds: Optional[float] = None,
+    ):
+        self.clock = VirtualClock()
+        self.analyzer = analyzer or ArbitrageAnalyzer(
+            threshold_percent=settings.arbitrage_threshold_percent,
+            max_position_size=settings.max_position_size_usd,
+        )
+        self.executor = executor or ArbitrageExecutor(dry_run=True)
+        self.executor.sleep = self.clock.sleep
+        self.interval = timedelta(seconds=interval_seconds)
+        self.top_limit = top_limit
+        if max_quote_age_seconds is None:
+            max_quote_age_seconds = settings.max_quote_age_seconds
+        self.max_quote_age = (
+            timedelta(seconds=max_quote_age_seconds) if max_quote_age_seconds else None
+        )
+        self.tickers: Dict[Tuple[str, str], Ticker] = {}
+        self.books: Dict[Tuple[str, str], OrderBook] = {}
+        self.opportunities: List[ArbitrageOpportunity] = []
+
+    async def run(self, events: Iterable[MarketEvent]) -> BacktestReport:
+        started = time.perf_counter()
+        count = cycles = 0
+        first: Optional[datetime] = None
+        next_cycle: Optional[datetime] = None
+
+        for event in events:
+            if first is None:
+                first = event.timestamp
+                self.clock.now = first
+                next_cycle = first + self.interval
+
+            while event.timestamp > next_cycle:
+                self.clock.advance_to(next_cycle)
+                await self._cycle()
+                cycles += 1
+                next_cycle += self.interval
+
+            self.clock.advance_to(event.timestamp)
+            key = (event.exchange, event.symbol)
+            if isinstance(event, OrderBook):
+                self.books[key] = event
+            else:
+                self.tickers[key] = event
+            count += 1
+
+        if first is not None:
+            await self._cycle()
+            cycles += 1
+
+        stats = self.executor.get_statistics()
+        return BacktestReport(
+            events=count,
+            cycles=cycles,
+            opportunities=len(self.opportunities),
+            trades=stats["total_trades"],
+            pnl_usd=stats["total_profit_usd"],
+            start=first,
+            end=self.clock.now if first is not None else None,
+            wall_seconds=time.perf_counter() - started,
+        )
+
+    async def _cycle(self):
+        tickers = list(self.tickers.values())
+        cutoff = self._cutoff()
+        if cutoff is not None:
+            tickers = [t for t in tickers if t.timestamp >= cutoff]
+        if not tickers:
+            return
+
+        opportunities = self.analyzer.top_opportunities(tickers, self.top_limit)
+        if not opportunities:
+            return
+
+        if self.books:
+            opportunities = self._refine_with_books(opportunities)
+            if not opportunities:
+                return
+
+        opportunities = [
+            replace(opp, timestamp=self.clock.now) for opp in opportunities
+        ]
+        self.opportunities.extend(opportunities)
+        await self.executor.execute_opportunity(opportunities[0])
+
+    def _cutoff(self) -> Optional[datetime]:
+        if self.max_quote_age is None:
+            return None
+        return self.clock.now - self.max_quote_age
+
+    def _refine_with_books(
+        self, candidates: List[ArbitrageOpportunity]
+    ) -> List[ArbitrageOpportunity]:
+        cutoff = self._cutoff()
+        refined = []
+        for opp in candidates:
+            buy_book = self.books.get((opp.buy_exchange, opp.symbol))
+            sell_book = self.books.get((opp.sell_exchange, opp.symbol))
+            if buy_book is None or sell_book is None:
+                continue
+            if (
+                cutoff is not None
+                and min(buy_book.timestamp, sell_book.timestamp) < cutoff
+            ):
+                continue
+
+            depth_opp = self.analyzer.calculate_orderbook_opportunity(
+                buy_book, sell_book
+            )
+            if depth_opp:
+                refined.append(depth_opp)
+
+        return sorted(refined, key=lambda x: x.profit_percent, reverse=True)
+
+
+async def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded market data through the analyzer and executor"
+    )
+    parser.add_argument("paths", nargs="+", help="Recorded .npz/.json/.jsonl files")
+    parser.add_argument(
+        "--interval", type=float, default=settings.data_collection_interval_seconds
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=settings.arbitrage_threshold_percent
+    )
+    parser.add_argument(
+        "--max-position", type=float, default=settings.max_position_size_usd
+    )
+    parser.add_argument("--top", type=int, default=settings.top_opportunities_limit)
+    parser.add_argument(
+        "--max-quote-age",
+        type=float,
+        default=settings.max_quote_age_seconds,
+        help="Ignore quotes and books older than this many seconds (0 disables)",
+    )
+    args = parser.parse_args(argv)
+
+    events = sorted(load_events(args.paths), key=lambda event: event.timestamp)
+    engine = BacktestEngine(
+        ArbitrageAnalyzer(args.threshold, args.max_position),
+        interval_seconds=args.interval,
+        top_limit=args.top,
+        max_quote_age_seconds=args.max_quote_age,
+    )
+    report = (await engine.run(events)).to_dict()
+    print(json.dumps(report, default=str, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main())
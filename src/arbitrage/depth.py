@@ -0,0 +1,34 @@
+import numpy as np
+from typing import Tuple
+from src.exchanges.base import OrderBook
+
+
+def executable_size(
+    buy_book: OrderBook, sell_book: OrderBook, max_notional: float
+) -> Tuple[float, float, float]:
+    ask_prices, ask_cum, _ = buy_book.cumulative("asks")
+    bid_prices, bid_cum, _ = sell_book.cumulative("bids")
+
+    if len(ask_prices) == 0 or len(bid_prices) == 0:
+        return 0.0, 0.0, 0.0
+
+    limit = min(ask_cum[-1], bid_cum[-1])
+    breaks = np.union1d(ask_cum, bid_cum)
+    breaks = breaks[breaks <= limit]
+    starts = np.concatenate(([0.0], breaks[:-1]))
+
+    marginal_buy = ask_prices[np.searchsorted(ask_cum, starts, side="right")]
+    marginal_sell = bid_prices[np.searchsorted(bid_cum, starts, side="right")]
+    unprofitable = np.nonzero(marginal_sell <= marginal_buy)[0]
+    segments = unprofitable[0] if len(unprofitable) else len(breaks)
+
+    if segments == 0:
+        return 0.0, 0.0, 0.0
+
+    amount = float(breaks[segments - 1])
+    amount, cost = buy_book.fill("asks", amount)
+    if cost > max_notional:
+        amount, cost = buy_book.fill_notional("asks", max_notional)
+
+    _, proceeds = sell_book.fill("bids", amount)
+    return amount, cost, proceeds
@@ -1,12 +1,19 @@
 import asyncio
-from typing import List
+from typing import Awaitable, Callable, List
 from src.arbitrage.analyzer import ArbitrageOpportunity
 from src.monitoring.telemetry import track_event, track_metric
 
 
 class ArbitrageExecutor:
-    def __init__(self, dry_run: bool = True):
+    def __init__(
+        self,
+        dry_run: bool = True,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        simulated_latency_seconds: float = 0.1,
+    ):
         self.dry_run = dry_run
+        self.sleep = sleep
+        self.simulated_latency_seconds = simulated_latency_seconds
         self.executed_trades = []
 
     async def execute_opportunity(self, opportunity: ArbitrageOpportunity) -> bool:
@@ -16,7 +23,7 @@ class ArbitrageExecutor:
             return await self._real_execution(opportunity)
 
     async def _simulate_execution(self, opportunity: ArbitrageOpportunity) -> bool:
-        await asyncio.sleep(0.1)
+        await self.sleep(self.simulated_latency_seconds)
 
         track_event(
             "arbitrage_opportunity_simulated",
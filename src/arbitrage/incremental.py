@@ -0,0 +1,191 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from src.arbitrage.analyzer import ArbitrageAnalyzer, ArbitrageOpportunity
+from src.exchanges.base import Ticker
+
+
+@dataclass
+class OpportunityEvent:
+    kind: str
+    opportunity: ArbitrageOpportunity
+
+
+class IncrementalArbitrageAnalyzer(ArbitrageAnalyzer):
+    def __init__(
+        self,
+        threshold_percent: float = 0.5,
+        max_position_size: float = 10000,
+        max_quote_age_seconds: Optional[float] = None,
+    ):
+        super().__init__(threshold_percent, max_position_size, engine="python")
+        self.max_quote_age_seconds = max_quote_age_seconds
+        self.tickers: Dict[str, Dict[str, Ticker]] = {}
+        self.asks: Dict[str, List[Tuple[float, str]]] = {}
+        self.bids: Dict[str, List[Tuple[float, str]]] = {}
+        self.opportunities: Dict[str, Dict[Tuple[str, str], ArbitrageOpportunity]] = {}
+        self.listeners: List[Callable[[OpportunityEvent], None]] = []
+
+    def add_listener(self, listener: Callable[[OpportunityEvent], None]):
+        self.listeners.append(listener)
+
+    def analyze_opportunities(
+        self, tickers: List[Ticker]
+    ) -> List[ArbitrageOpportunity]:
+        polled: Dict[str, set] = {}
+        for ticker in tickers:
+            self.update(ticker)
+            polled.setdefault(ticker.exchange, set()).add(ticker.symbol)
+
+        for symbol, symbol_tickers in list(self.tickers.items()):
+            for exchange in [e for e in symbol_tickers if e in polled]:
+                if symbol not in polled[exchange]:
+                    self.remove(exchange, symbol)
+
+        self.expire()
+        return self.current_opportunities()
+
+    def expire(self, now: Optional[datetime] = None) -> List[OpportunityEvent]:
+        cutoff = self._cutoff(now)
+        if cutoff is None:
+            return []
+
+        events = []
+        for symbol, symbol_tickers in list(self.tickers.items()):
+            for exchange, ticker in list(symbol_tickers.items()):
+                if ticker.timestamp is not None and ticker.timestamp < cutoff:
+                    events.extend(self.remove(exchange, symbol))
+        return events
+
+    def _cutoff(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        if not self.max_quote_age_seconds:
+            return None
+        return (now or datetime.now()) - timedelta(seconds=self.max_quote_age_seconds)
+
+    def current_opportunities(self) -> List[ArbitrageOpportunity]:
+        opportunities = [
+            opp
+            for symbol_opps in self.opportunities.values()
+            for opp in symbol_opps.values()
+        ]
+        return sorted(opportunities, key=lambda x: x.profit_percent, reverse=True)
+
+    def update(self, ticker: Ticker) -> List[OpportunityEvent]:
+        cutoff = self._cutoff()
+        if cutoff and ticker.timestamp is not None and ticker.timestamp < cutoff:
+            return self.remove(ticker.exchange, ticker.symbol)
+
+        symbol_tickers = self.tickers.setdefault(ticker.symbol, {})
+        previous = symbol_tickers.get(ticker.exchange)
+        symbol_tickers[ticker.exchange] = ticker
+
+        if previous is not None and (
+            previous is ticker
+            or (
+                previous.bid == ticker.bid
+                and previous.ask == ticker.ask
+                and previous.volume == ticker.volume
+            )
+        ):
+            return []
+
+        if previous is not None:
+            self._unindex(previous)
+        self._index(ticker)
+
+        return self._reevaluate(ticker.symbol)
+
+    def remove(self, exchange: str, symbol: str) -> List[OpportunityEvent]:
+        symbol_tickers = self.tickers.get(symbol)
+        previous = symbol_tickers.pop(exchange, None) if symbol_tickers else None
+        if previous is None:
+            return []
+        if not symbol_tickers:
+            del self.tickers[symbol]
+
+        self._unindex(previous)
+        return self._reevaluate(symbol)
+
+    def _index(self, ticker: Ticker):
+        if ticker.ask is not None and ticker.ask > 0:
+            insort(
+                self.asks.setdefault(ticker.symbol, []), (ticker.ask, ticker.exchange)
+            )
+        if ticker.bid is not None and ticker.bid > 0:
+            insort(
+                self.bids.setdefault(ticker.symbol, []), (-ticker.bid, ticker.exchange)
+            )
+
+    def _unindex(self, ticker: Ticker):
+        if ticker.ask is not None and ticker.ask > 0:
+            self._discard(self.asks, ticker.symbol, (ticker.ask, ticker.exchange))
+        if ticker.bid is not None and ticker.bid > 0:
+            self._discard(self.bids, ticker.symbol, (-ticker.bid, ticker.exchange))
+
+    def _discard(
+        self,
+        side: Dict[str, List[Tuple[float, str]]],
+        symbol: str,
+        key: Tuple[float, str],
+    ):
+        levels = side.get(symbol)
+        if not levels:
+            return
+        i = bisect_left(levels, key)
+        if i < len(levels) and levels[i] == key:
+            del levels[i]
+        if not levels:
+            del side[symbol]
+
+    def _reevaluate(self, symbol: str) -> List[OpportunityEvent]:
+        symbol_tickers = self.tickers.get(symbol, {})
+        asks = self.asks.get(symbol, [])
+        bids = self.bids.get(symbol, [])
+        current: Dict[Tuple[str, str], ArbitrageOpportunity] = {}
+
+        for ask, buy_exchange in asks:
+            if not bids or (-bids[0][0] - ask) / ask * 100 < self.threshold_percent:
+                break
+
+            for _, sell_exchange in bids:
+                if sell_exchange == buy_exchange:
+                    continue
+
+                opp = self._calculate_opportunity(
+                    symbol_tickers[buy_exchange], symbol_tickers[sell_exchange], symbol
+                )
+                if opp is None:
+                    break
+                current[(buy_exchange, sell_exchange)] = opp
+
+        previous = self.opportunities.get(symbol, {})
+        events = []
+
+        for key, opp in current.items():
+            old = previous.get(key)
+            if old is None:
+                events.append(OpportunityEvent("opened", opp))
+            elif (
+                old.buy_price != opp.buy_price
+                or old.sell_price != opp.sell_price
+                or old.profit_usd != opp.profit_usd
+            ):
+                events.append(OpportunityEvent("updated", opp))
+            else:
+                current[key] = old
+
+        for key, old in previous.items():
+            if key not in current:
+                events.append(OpportunityEvent("closed", old))
+
+        if current:
+            self.opportunities[symbol] = current
+        else:
+            self.opportunities.pop(symbol, None)
+
+        for event in events:
+            for listener in self.listeners:
+                listener(event)
+
+        return events
@@ -0,0 +1,121 @@
+import numpy as np
+from dataclasses import dataclass
+from itertools import repeat
+from operator import attrgetter
+from typing import Dict, List, Optional
+from src.exchanges.base import Ticker
+
+
+class PriceMatrix:
+    def __init__(self, symbols: List[str], exchanges: List[str]):
+        self.symbols = list(symbols)
+        self.exchanges = list(exchanges)
+        self.symbol_index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.exchange_index: Dict[str, int] = {
+            e: i for i, e in enumerate(self.exchanges)
+        }
+        shape = (len(self.symbols), len(self.exchanges))
+        self.bids = np.full(shape, np.nan)
+        self.asks = np.full(shape, np.nan)
+        self.volumes = np.full(shape, np.nan)
+
+    @classmethod
+    def from_tickers(cls, tickers: List[Ticker]) -> "PriceMatrix":
+        symbols, exchanges = universe(tickers)
+        matrix = cls(symbols, exchanges)
+        matrix.update(tickers)
+        return matrix
+
+    def clear(self):
+        self.bids.fill(np.nan)
+        self.asks.fill(np.nan)
+        self.volumes.fill(np.nan)
+
+    def update(self, tickers: List[Ticker]) -> int:
+        if not tickers:
+            return 0
+
+        rows = _column(tickers, "symbol", np.intp, self.symbol_index)
+        cols = _column(tickers, "exchange", np.intp, self.exchange_index)
+        known = (rows >= 0) & (cols >= 0)
+        rows, cols = rows[known], cols[known]
+        for target, field in (
+            (self.bids, "bid"),
+            (self.asks, "ask"),
+            (self.volumes, "volume"),
+        ):
+            target[rows, cols] = _column(tickers, field, np.float64)[known]
+        return len(rows)
+
+
+def universe(tickers: List[Ticker]):
+    symbols = list(dict.fromkeys(map(attrgetter("symbol"), tickers)))
+    exchanges = list(dict.fromkeys(map(attrgetter("exchange"), tickers)))
+    return symbols, exchanges
+
+
+def _column(tickers: List[Ticker], field: str, dtype, index: Optional[Dict] = None):
+    values = map(attrgetter(field), tickers)
+    if index is not None:
+        values = map(index.get, values, repeat(-1))
+    return np.fromiter(values, dtype, len(tickers))
+
+
+@dataclass
+class OpportunityArrays:
+    symbol_idx: np.ndarray
+    buy_idx: np.ndarray
+    sell_idx: np.ndarray
+    buy_price: np.ndarray
+    sell_price: np.ndarray
+    profit_percent: np.ndarray
+    profit_usd: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.profit_percent)
+
+
+def find_opportunities(
+    bids: np.ndarray,
+    asks: np.ndarray,
+    volumes: np.ndarray,
+    threshold_percent: float,
+    max_position_size: float,
+) -> OpportunityArrays:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid_asks = np.where(asks > 0, asks, np.nan)
+        valid_bids = np.where(bids > 0, bids, np.nan)
+
+        best_bid = np.fmax.reduce(valid_bids, axis=1, initial=-np.inf)
+        best_ask = np.fmin.reduce(valid_asks, axis=1, initial=np.inf)
+        candidates = np.nonzero(
+            (best_bid - best_ask) / best_ask * 100 >= threshold_percent
+        )[0]
+
+        buy = valid_asks[candidates][:, :, None]
+        sell = valid_bids[candidates][:, None, :]
+        profit = (sell - buy) / buy * 100
+        mask = profit >= threshold_percent
+        mask &= ~np.eye(bids.shape[1], dtype=bool)[None, :, :]
+
+    rows, buy_idx, sell_idx = np.nonzero(mask)
+    symbol_idx = candidates[rows]
+    buy_price = asks[symbol_idx, buy_idx]
+    sell_price = bids[symbol_idx, sell_idx]
+    profit_percent = profit[rows, buy_idx, sell_idx]
+
+    position_size = np.minimum(
+        max_position_size, volumes[symbol_idx, buy_idx] * buy_price
+    )
+
+    return OpportunityArrays(
+        symbol_idx=symbol_idx,
+        buy_idx=buy_idx,
+        sell_idx=sell_idx,
+        buy_price=buy_price,
+        sell_price=sell_price,
+        profit_percent=profit_percent,
+        profit_usd=position_size * (profit_percent / 100),
+        volume=position_size / buy_price,
+    )
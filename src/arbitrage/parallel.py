@@ -0,0 +1,145 @@
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+from src.arbitrage.analyzer import ArbitrageAnalyzer
+from src.arbitrage.matrix import PriceMatrix, OpportunityArrays, find_opportunities
+from src.exchanges.base import Ticker
+
+_attached: Dict[str, SharedMemory] = {}
+
+
+class SharedPriceMatrix(PriceMatrix):
+    def __init__(self, symbols: List[str], exchanges: List[str]):
+        self.symbols = list(symbols)
+        self.exchanges = list(exchanges)
+        self.symbol_index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.exchange_index: Dict[str, int] = {
+            e: i for i, e in enumerate(self.exchanges)
+        }
+        self.shape = (len(self.symbols), len(self.exchanges))
+        size = max(3 * self.shape[0] * self.shape[1] * 8, 8)
+        self.shm = SharedMemory(create=True, size=size)
+        self.data = _view(self.shm, self.shape)
+        self.bids, self.asks, self.volumes = self.data
+        self.clear()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def clear(self):
+        self.data.fill(np.nan)
+
+    def close(self):
+        self.data = self.bids = self.asks = self.volumes = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _view(shm: SharedMemory, shape: Tuple[int, int]) -> np.ndarray:
+    return np.ndarray((3,) + shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _attach(name: str) -> SharedMemory:
+    shm = _attached.get(name)
+    if shm is None:
+        for old in _attached.values():
+            old.close()
+        _attached.clear()
+
+        shm = _attached[name] = SharedMemory(name=name)
+    return shm
+
+
+def _scan_shard(
+    name: str,
+    shape: Tuple[int, int],
+    start: int,
+    stop: int,
+    threshold_percent: float,
+    max_position_size: float,
+) -> OpportunityArrays:
+    bids, asks, volumes = _view(_attach(name), shape)[:, start:stop]
+    found = find_opportunities(
+        bids, asks, volumes, threshold_percent, max_position_size
+    )
+    found.symbol_idx += start
+    return found
+
+
+def _concat(parts: List[OpportunityArrays]) -> OpportunityArrays:
+    return OpportunityArrays(
+        **{
+            field: np.concatenate([getattr(part, field) for part in parts])
+            for field in OpportunityArrays.__dataclass_fields__
+        }
+    )
+
+
+class ParallelArbitrageAnalyzer(ArbitrageAnalyzer):
+    def __init__(
+        self,
+        threshold_percent: float = 0.5,
+        max_position_size: float = 10000,
+        workers: int = 4,
+        min_shard_size: int = 256,
+    ):
+        super().__init__(threshold_percent, max_position_size, engine="numpy")
+        self.workers = workers
+        self.min_shard_size = min_shard_size
+        self.matrix: Optional[SharedPriceMatrix] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    def _create_matrix(
+        self, symbols: List[str], exchanges: List[str]
+    ) -> SharedPriceMatrix:
+        return SharedPriceMatrix(symbols, exchanges)
+
+    def _release(self, matrix: SharedPriceMatrix):
+        matrix.close()
+
+    def _scan(self, tickers: List[Ticker]):
+        matrix = self._matrix_for(tickers)
+
+        rows = len(matrix.symbols)
+        shards = min(self.workers, math.ceil(rows / self.min_shard_size))
+        if shards <= 1:
+            found = find_opportunities(
+                matrix.bids,
+                matrix.asks,
+                matrix.volumes,
+                self.threshold_percent,
+                self.max_position_size,
+            )
+            return matrix, found
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=get_context("spawn")
+            )
+
+        bounds = np.linspace(0, rows, shards + 1).astype(int)
+        futures = [
+            self.pool.submit(
+                _scan_shard,
+                matrix.name,
+                matrix.shape,
+                int(start),
+                int(stop),
+                self.threshold_percent,
+                self.max_position_size,
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        return matrix, _concat([future.result() for future in futures])
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.matrix is not None:
+            self.matrix.close()
+            self.matrix = None
@@ -0,0 +1,307 @@
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from src.exchanges.base import Ticker
+
+QUOTE_CURRENCIES = ("USDT", "USDC", "USD", "EUR", "BTC")
+
+
+@dataclass
+class TriangularOpportunity:
+    exchanges: List[str]
+    path: List[str]
+    legs: List[Tuple[str, str, str]]
+    profit_percent: float
+    profit_usd: float
+    timestamp: datetime
+
+
+class TriangularArbitrageAnalyzer:
+    def __init__(
+        self,
+        threshold_percent: float = 0.1,
+        max_position_size: float = 10000,
+        fee_percent: float = 0.1,
+        cross_exchange: bool = False,
+        transfer_fee_percent: float = 0.0,
+        max_cycles: int = 10,
+    ):
+        self.threshold_percent = threshold_percent
+        self.max_position_size = max_position_size
+        self.fee_rate = 1 - fee_percent / 100
+        self.cross_exchange = cross_exchange
+        self.transfer_weight = -math.log(1 - transfer_fee_percent / 100)
+        self.max_cycles = max_cycles
+
+        self.nodes: Dict[Tuple[str, str], int] = {}
+        self.node_keys: List[Tuple[str, str]] = []
+        self.currency_nodes: Dict[str, List[int]] = {}
+        self.out_edges: List[List[int]] = []
+        self.in_edges: List[List[int]] = []
+
+        self.edge_index: Dict[Tuple[int, int, str], int] = {}
+        self.edge_src: List[int] = []
+        self.edge_dst: List[int] = []
+        self.edge_weight: List[float] = []
+        self.edge_leg: List[Tuple[str, str, str]] = []
+
+        self.dist: List[float] = []
+        self.pred: List[int] = []
+        self._seeds: Set[int] = set()
+        self._invalidated: Set[int] = set()
+        self._needs_reset = True
+
+    def analyze_opportunities(
+        self, tickers: List[Ticker]
+    ) -> List[TriangularOpportunity]:
+        self.update(tickers)
+        return self.find_cycles()
+
+    def update(self, tickers: List[Ticker]):
+        for ticker in tickers:
+            base, _, quote = ticker.symbol.partition("/")
+            quote = quote.split(":")[0]
+            if not base or not quote:
+                continue
+
+            exchange = ticker.exchange
+            if ticker.bid is not None and ticker.bid > 0:
+                self._set_edge(
+                    (exchange, base),
+                    (exchange, quote),
+                    -math.log(ticker.bid * self.fee_rate),
+                    (exchange, ticker.symbol, "sell"),
+                )
+            if ticker.ask is not None and ticker.ask > 0:
+                self._set_edge(
+                    (exchange, quote),
+                    (exchange, base),
+                    -math.log(self.fee_rate / ticker.ask),
+                    (exchange, ticker.symbol, "buy"),
+                )
+
+    def find_cycles(self) -> List[TriangularOpportunity]:
+        if self._needs_reset:
+            self._reset()
+        else:
+            self._apply_invalidations()
+
+        opportunities = []
+        disabled: Set[int] = set()
+
+        for _ in range(self.max_cycles):
+            cycle = self._spfa(disabled)
+            if cycle is None:
+                break
+
+            opportunity = self._to_opportunity(cycle)
+            if opportunity.profit_percent >= self.threshold_percent:
+                opportunities.append(opportunity)
+
+            disabled.update(cycle)
+            self._reset()
+
+        self._needs_reset = bool(disabled)
+        return sorted(opportunities, key=lambda x: x.profit_percent, reverse=True)
+
+    def _node(self, key: Tuple[str, str]) -> int:
+        node = self.nodes.get(key)
+        if node is not None:
+            return node
+
+        node = len(self.node_keys)
+        self.nodes[key] = node
+        self.node_keys.append(key)
+        self.out_edges.append([])
+        self.in_edges.append([])
+        self.dist.append(0.0)
+        self.pred.append(-1)
+        self._seeds.add(node)
+
+        exchange, currency = key
+        peers = self.currency_nodes.setdefault(currency, [])
+        if self.cross_exchange:
+            for peer in peers:
+                peer_exchange = self.node_keys[peer][0]
+                self._add_edge(
+                    peer,
+                    node,
+                    self.transfer_weight,
+                    (f"{peer_exchange}->{exchange}", currency, "transfer"),
+                )
+                self._add_edge(
+                    node,
+                    peer,
+                    self.transfer_weight,
+                    (f"{exchange}->{peer_exchange}", currency, "transfer"),
+                )
+        peers.append(node)
+        return node
+
+    def _add_edge(
+        self, u: int, v: int, weight: float, leg: Tuple[str, str, str]
+    ) -> int:
+        edge = len(self.edge_src)
+        self.edge_index[(u, v, leg[1])] = edge
+        self.edge_src.append(u)
+        self.edge_dst.append(v)
+        self.edge_weight.append(weight)
+        self.edge_leg.append(leg)
+        self.out_edges[u].append(edge)
+        self.in_edges[v].append(edge)
+        self._seeds.add(u)
+        return edge
+
+    def _set_edge(
+        self,
+        src: Tuple[str, str],
+        dst: Tuple[str, str],
+        weight: float,
+        leg: Tuple[str, str, str],
+    ):
+        u, v = self._node(src), self._node(dst)
+        edge = self.edge_index.get((u, v, leg[1]))
+        if edge is None:
+            self._add_edge(u, v, weight, leg)
+            return
+
+        old_weight = self.edge_weight[edge]
+        if weight == old_weight:
+            return
+
+        self.edge_weight[edge] = weight
+        if weight < old_weight:
+            self._seeds.add(u)
+        elif self.pred[v] == edge:
+            self._invalidated.add(v)
+
+    def _reset(self):
+        n = len(self.node_keys)
+        self.dist = [0.0] * n
+        self.pred = [-1] * n
+        self._seeds = set(range(n))
+        self._invalidated = set()
+
+    def _apply_invalidations(self):
+        if not self._invalidated:
+            return
+
+        in_subtree: Dict[int, bool] = {node: True for node in self._invalidated}
+        for start in range(len(self.node_keys)):
+            chain = []
+            on_chain = set()
+            node = start
+            result = True
+            while node not in in_subtree:
+                if node in on_chain:
+                    break
+                chain.append(node)
+                on_chain.add(node)
+                edge = self.pred[node]
+                if edge < 0:
+                    result = False
+                    break
+                node = self.edge_src[edge]
+            else:
+                result = in_subtree[node]
+
+            for member in chain:
+                in_subtree[member] = result
+
+        for node, invalid in in_subtree.items():
+            if not invalid:
+                continue
+            self.dist[node] = 0.0
+            self.pred[node] = -1
+            self._seeds.add(node)
+            for edge in self.in_edges[node]:
+                self._seeds.add(self.edge_src[edge])
+
+        self._invalidated = set()
+
+    def _spfa(self, disabled: Set[int]) -> Optional[List[int]]:
+        n = len(self.node_keys)
+        dist, pred = self.dist, self.pred
+        edge_dst, edge_weight = self.edge_dst, self.edge_weight
+        queue = deque(self._seeds)
+        in_queue = [False] * n
+        for node in queue:
+            in_queue[node] = True
+        self._seeds = set()
+
+        relaxations = 0
+        while queue:
+            u = queue.popleft()
+            in_queue[u] = False
+            du = dist[u]
+
+            for edge in self.out_edges[u]:
+                v = edge_dst[edge]
+                candidate = du + edge_weight[edge]
+                if candidate < dist[v] - 1e-12 and edge not in disabled:
+                    dist[v] = candidate
+                    pred[v] = edge
+                    relaxations += 1
+
+                    if relaxations % n == 0:
+                        cycle = self._pred_cycle()
+                        if cycle:
+                            return cycle
+
+                    if not in_queue[v]:
+                        in_queue[v] = True
+                        queue.append(v)
+
+        return self._pred_cycle()
+
+    def _pred_cycle(self) -> Optional[List[int]]:
+        stamp = [0] * len(self.node_keys)
+
+        for start in range(len(self.node_keys)):
+            if stamp[start]:
+                continue
+
+            node = start
+            while node >= 0 and stamp[node] == 0:
+                stamp[node] = start + 1
+                edge = self.pred[node]
+                node = self.edge_src[edge] if edge >= 0 else -1
+
+            if node >= 0 and stamp[node] == start + 1:
+                cycle = []
+                current = node
+                while True:
+                    edge = self.pred[current]
+                    cycle.append(edge)
+                    current = self.edge_src[edge]
+                    if current == node:
+                        break
+                return cycle[::-1]
+
+        return None
+
+    def _to_opportunity(self, cycle: List[int]) -> TriangularOpportunity:
+        currencies = [self.node_keys[self.edge_src[edge]][1] for edge in cycle]
+        for quote in QUOTE_CURRENCIES:
+            if quote in currencies:
+                shift = currencies.index(quote)
+                cycle = cycle[shift:] + cycle[:shift]
+                break
+
+        total_weight = sum(self.edge_weight[edge] for edge in cycle)
+        profit_percent = (math.exp(-total_weight) - 1) * 100
+        path = [self.node_keys[self.edge_src[edge]][1] for edge in cycle]
+        path.append(path[0])
+
+        return TriangularOpportunity(
+            exchanges=list(
+                dict.fromkeys(self.node_keys[self.edge_src[e]][0] for e in cycle)
+            ),
+            path=path,
+            legs=[self.edge_leg[edge] for edge in cycle],
+            profit_percent=profit_percent,
+            profit_usd=self.max_position_size * profit_percent / 100,
+            timestamp=datetime.now(),
+        )
@@ -0,0 +1,249 @@
+import asyncio
+import io
+import json
+import logging
+import time
+import uuid
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from src.azure.storage import safe_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = {
+    "symbol": str,
+    "buy_exchange": str,
+    "sell_exchange": str,
+    "buy_price": np.float64,
+    "sell_price": np.float64,
+    "profit_percent": np.float64,
+    "profit_usd": np.float64,
+    "volume": np.float64,
+    "timestamp": "datetime64[us]",
+}
+SOURCES_KEY = "_sources"
+
+
+def encode_columns(
+    columns: Dict[str, np.ndarray], file_format: str, sources: Sequence[str] = ()
+) -> bytes:
+    buffer = io.BytesIO()
+    if file_format == "parquet":
+        table = pa.table(columns)
+        if sources:
+            table = table.replace_schema_metadata(
+                {SOURCES_KEY: json.dumps(list(sources))}
+            )
+        pq.write_table(table, buffer, compression="zstd")
+    else:
+        extra = {SOURCES_KEY: np.array(sources, dtype=str)} if sources else {}
+        np.savez_compressed(buffer, **columns, **extra)
+    return buffer.getvalue()
+
+
+def decode_sources(data: bytes, file_format: str) -> List[str]:
+    if file_format == "parquet":
+        metadata = pq.read_schema(io.BytesIO(data)).metadata or {}
+        return json.loads(metadata.get(SOURCES_KEY.encode(), b"[]"))
+
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        if SOURCES_KEY not in archive.files:
+            return []
+        return archive[SOURCES_KEY].tolist()
+
+
+def decode_columns(data: bytes, file_format: str) -> Dict[str, np.ndarray]:
+    if file_format == "parquet":
+        table = pq.read_table(io.BytesIO(data))
+        return {
+            name: np.asarray(table.column(name).to_numpy(), dtype=ARCHIVE_COLUMNS[name])
+            for name in table.column_names
+        }
+
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files if name != SOURCES_KEY}
+
+
+class ColumnarArchiveWriter:
+    def __init__(
+        self,
+        store,
+        root: str = "opportunities",
+        flush_rows: int = 5000,
+        flush_interval_seconds: float = 300.0,
+        file_format: Optional[str] = None,
+        max_buffered_rows: Optional[int] = None,
+    ):
+        self.store = store
+        self.root = root
+        self.flush_rows = flush_rows
+        self.max_buffered_rows = max_buffered_rows or flush_rows * 10
+        self.flush_interval_seconds = flush_interval_seconds
+        self.file_format = file_format or ("parquet" if PYARROW_AVAILABLE else "npz")
+        if self.file_format == "parquet" and not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is not installed")
+
+        self.buffers: Dict[str, List[dict]] = {}
+        self.buffered_rows = 0
+        self.first_buffered_at: Optional[float] = None
+        self.pending_compaction: Dict[str, datetime] = {}
+
+    def append(self, rows: List[dict]):
+        for row in rows:
+            timestamp = row.get("timestamp")
+            if not isinstance(timestamp, datetime):
+                timestamp = datetime.now()
+                row = {**row, "timestamp": timestamp}
+
+            self.buffers.setdefault(self._hour_directory(row, timestamp), []).append(
+                row
+            )
+
+        self.buffered_rows += len(rows)
+        if rows and self.first_buffered_at is None:
+            self.first_buffered_at = time.monotonic()
+
+    def flush_due(self) -> bool:
+        if not self.buffered_rows:
+            return False
+        return (
+            self.buffered_rows >= self.flush_rows
+            or time.monotonic() - self.first_buffered_at >= self.flush_interval_seconds
+        )
+
+    async def flush(self) -> List[str]:
+        buffers, self.buffers = self.buffers, {}
+        self.buffered_rows = 0
+        self.first_buffered_at = None
+
+        written = []
+        failed = []
+        for directory, rows in buffers.items():
+            path = f"{directory}/part-{uuid.uuid4().hex[:12]}.{self.file_format}"
+            try:
+                data = await asyncio.to_thread(self._encode_rows, rows)
+                await self.store.upload_file(path, data)
+                written.append(path)
+                self.pending_compaction[directory] = rows[0]["timestamp"].replace(
+                    minute=0, second=0, microsecond=0
+                )
+            except Exception as e:
+                logger.error(f"Failed to write archive file {path}: {e}")
+                failed.append((directory, rows))
+
+        if failed:
+            retained = self._rebuffer(failed)
+            failed_rows = sum(len(rows) for _, rows in failed)
+            raise RuntimeError(
+                f"Failed to write {len(failed)} archive files ({failed_rows} rows, "
+                f"{retained} kept for retry)"
+            )
+        return written
+
+    def _rebuffer(self, failed: List[tuple]) -> int:
+        retained = 0
+        for directory, rows in failed:
+            if self.buffered_rows + len(rows) > self.max_buffered_rows:
+                logger.error(
+                    f"Dropping {len(rows)} archive rows for {directory}: "
+                    f"buffer is full ({self.buffered_rows} rows)"
+                )
+                continue
+            self.buffers.setdefault(directory, [])[:0] = rows
+            self.buffered_rows += len(rows)
+            retained += len(rows)
+
+        if retained and self.first_buffered_at is None:
+            self.first_buffered_at = time.monotonic()
+        return retained
+
+    async def compact_due(self, now: Optional[datetime] = None) -> List[str]:
+        current_hour = (now or datetime.now()).replace(
+            minute=0, second=0, microsecond=0
+        )
+        closed = [
+            directory
+            for directory, hour in sorted(self.pending_compaction.items())
+            if hour < current_hour
+        ]
+        compacted = []
+        for directory in closed:
+            path = await self.compact(directory)
+            if path:
+                compacted.append(path)
+        return compacted
+
+    async def compact(self, directory: str) -> Optional[str]:
+        # Each compacted file lists the files it merged, so a compaction that
+        # died between upload and cleanup is finished instead of re-merged.
+        # Files written into the hour while this runs re-register it.
+        hour = self.pending_compaction.pop(directory, None)
+        try:
+            files = [
+                path
+                for path in await self.store.list_files(directory)
+                if path.endswith(f".{self.file_format}")
+            ]
+            contents = {path: await self.store.download_file(path) for path in files}
+            merged = set()
+            for path, data in contents.items():
+                if path.rsplit("/", 1)[-1].startswith("compacted-"):
+                    merged.update(
+                        await asyncio.to_thread(decode_sources, data, self.file_format)
+                    )
+
+            for source in merged.intersection(contents):
+                await self.store.delete_file(source)
+                del contents[source]
+            if len(contents) < 2:
+                return None
+
+            parts = [
+                await asyncio.to_thread(decode_columns, data, self.file_format)
+                for data in contents.values()
+            ]
+            data = await asyncio.to_thread(self._merge_parts, parts, list(contents))
+
+            path = f"{directory}/compacted-{uuid.uuid4().hex[:12]}.{self.file_format}"
+            await self.store.upload_file(path, data)
+            for source in contents:
+                await self.store.delete_file(source)
+        except Exception as e:
+            logger.error(f"Failed to compact archive directory {directory}: {e}")
+            if hour is not None:
+                self.pending_compaction.setdefault(directory, hour)
+            return None
+
+        return path
+
+    def _hour_directory(self, row: dict, timestamp: datetime) -> str:
+        return (
+            f"{self.root}/date={timestamp:%Y-%m-%d}/"
+            f"symbol={safe_key(row.get('symbol', 'UNKNOWN'))}/hour={timestamp:%H}"
+        )
+
+    def _merge_parts(
+        self, parts: List[Dict[str, np.ndarray]], sources: List[str]
+    ) -> bytes:
+        columns = {
+            name: np.concatenate([part[name] for part in parts]) for name in parts[0]
+        }
+        order = np.argsort(columns["timestamp"], kind="stable")
+        columns = {name: values[order] for name, values in columns.items()}
+        return encode_columns(columns, self.file_format, sources)
+
+    def _encode_rows(self, rows: List[dict]) -> bytes:
+        columns = {
+            name: np.array([row.get(name) for row in rows], dtype=dtype)
+            for name, dtype in ARCHIVE_COLUMNS.items()
+        }
+        return encode_columns(columns, self.file_format)
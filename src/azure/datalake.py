@@ -1,61 +1,107 @@
+import asyncio
 import json
+import uuid
 from datetime import datetime
-from typing import List
-from azure.storage.filedatalake import DataLakeServiceClient
-from azure.identity import DefaultAzureCredential
+from typing import Any, List, Optional, Set
+from azure.storage.filedatalake.aio import DataLakeServiceClient
+from azure.identity.aio import DefaultAzureCredential
+from src.azure.transport import SharedTransport
 
 
 class DataLakeManager:
-    def __init__(self, account_name: str):
-        self.account_url = f"https://{account_name}.dfs.core.windows.net"
-        self.credential = DefaultAzureCredential()
+    def __init__(
+        self,
+        account_name: str,
+        account_url: Optional[str] = None,
+        credential: Any = None,
+        transport: Optional[SharedTransport] = None,
+        max_concurrency: int = 8,
+    ):
+        self.account_url = account_url or f"https://{account_name}.dfs.core.windows.net"
+        self.credential = credential or DefaultAzureCredential()
+        self.owns_transport = transport is None
+        self.transport = transport or SharedTransport()
         self.service_client = DataLakeServiceClient(
-            account_url=self.account_url, credential=self.credential
+            account_url=self.account_url,
+            credential=self.credential,
+            transport=self.transport.transport(),
         )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
         self.filesystem_name = "arbitrage"
+        self.directories: Set[str] = set()
 
     async def init_filesystem(self):
         try:
-            self.service_client.create_file_system(self.filesystem_name)
+            await self.service_client.create_file_system(self.filesystem_name)
         except Exception:
             pass
 
-    async def upload_market_data(self, symbol: str, data: List[dict]):
-        filesystem_client = self.service_client.get_file_system_client(
-            self.filesystem_name
-        )
+    async def close(self):
+        await self.service_client.close()
+        if isinstance(self.credential, DefaultAzureCredential):
+            await self.credential.close()
+        if self.owns_transport:
+            await self.transport.close()
 
-        timestamp = datetime.now()
-        file_path = f"market_data/{symbol}/{timestamp.strftime('%Y/%m/%d')}/{timestamp.strftime('%H%M%S')}.json"
+    async def ensure_directory(self, path: str):
+        if not path or path in self.directories:
+            return
 
-        directory_client = filesystem_client.get_directory_client(
-            f"market_data/{symbol}/{timestamp.strftime('%Y/%m/%d')}"
-        )
-        try:
-            directory_client.create_directory()
-        except Exception:
-            pass
+        directory_client = self.service_client.get_file_system_client(
+            self.filesystem_name
+        ).get_directory_client(path)
+        async with self.semaphore:
+            try:
+                await directory_client.create_directory()
+            except Exception:
+                pass
+        self.directories.add(path)
 
-        file_client = filesystem_client.get_file_client(file_path)
-        file_data = json.dumps(data, default=str, indent=2)
-        file_client.upload_data(file_data, overwrite=True)
+    async def upload_file(self, path: str, data):
+        await self.ensure_directory(path.rpartition("/")[0])
+        file_client = self.service_client.get_file_system_client(
+            self.filesystem_name
+        ).get_file_client(path)
+        async with self.semaphore:
+            await file_client.upload_data(data, overwrite=True)
 
-    async def upload_arbitrage_results(self, results: dict):
+    async def list_files(self, directory: str) -> List[str]:
         filesystem_client = self.service_client.get_file_system_client(
             self.filesystem_name
         )
+        files = []
+        async with self.semaphore:
+            async for path in filesystem_client.get_paths(
+                path=directory, recursive=True
+            ):
+                if not path.is_directory:
+                    files.append(path.name)
+        return files
 
-        timestamp = datetime.now()
-        file_path = f"arbitrage_results/{timestamp.strftime('%Y/%m/%d/%H%M%S')}.json"
+    async def download_file(self, path: str) -> bytes:
+        file_client = self.service_client.get_file_system_client(
+            self.filesystem_name
+        ).get_file_client(path)
+        async with self.semaphore:
+            downloader = await file_client.download_file()
+            return await downloader.readall()
 
-        directory_client = filesystem_client.get_directory_client(
-            f"arbitrage_results/{timestamp.strftime('%Y/%m/%d')}"
+    async def delete_file(self, path: str):
+        file_client = self.service_client.get_file_system_client(
+            self.filesystem_name
+        ).get_file_client(path)
+        async with self.semaphore:
+            await file_client.delete_file()
+
+    async def upload_market_data(self, segment: bytes, timestamp: datetime) -> str:
+        file_path = (
+            f"market_data/{timestamp.strftime('%Y/%m/%d/%H')}/"
+            f"{timestamp.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.npz"
         )
-        try:
-            directory_client.create_directory()
-        except Exception:
-            pass
+        await self.upload_file(file_path, segment)
+        return file_path
 
-        file_client = filesystem_client.get_file_client(file_path)
-        file_data = json.dumps(results, default=str, indent=2)
-        file_client.upload_data(file_data, overwrite=True)
+    async def upload_arbitrage_results(self, results: dict):
+        timestamp = datetime.now()
+        file_path = f"arbitrage_results/{timestamp.strftime('%Y/%m/%d/%H%M%S')}.json"
+        await self.upload_file(file_path, json.dumps(results, default=str))
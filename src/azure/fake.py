@@ -0,0 +1,443 @@
+import asyncio
+import json
+from collections import Counter
+from email.utils import formatdate
+from aiohttp import web
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote
+from xml.sax.saxutils import escape
+
+ACCOUNT_NAME = "devstoreaccount1"
+ACCOUNT_KEY = (
+    "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/"
+    "K1SZFPTOtr/KBHBeksoGMGw=="
+)
+
+
+class FakeAzureStorageServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        account_name: str = ACCOUNT_NAME,
+        latency_seconds: float = 0.0,
+    ):
+        self.host = host
+        self.port = port
+        self.account_name = account_name
+        self.account_key = ACCOUNT_KEY
+        self.latency_seconds = latency_seconds
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+        self._etag = 0
+
+        self.containers: Dict[str, Dict[str, bytes]] = {}
+        self.directories: Dict[str, set] = {}
+        self.tables: Dict[str, Dict[Tuple[str, str], dict]] = {}
+        self._pending: Dict[Tuple[str, str], bytearray] = {}
+
+        self.request_counts = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self.app = web.Application(middlewares=[self._track_requests])
+        self.app.router.add_route("*", "/blob/{account}/{path:.*}", self._handle_blob)
+        self.app.router.add_route("*", "/dfs/{account}/{path:.*}", self._handle_dfs)
+        self.app.router.add_route("*", "/table/{account}/{path:.*}", self._handle_table)
+
+    @property
+    def blob_url(self) -> str:
+        return f"{self.url}/blob/{self.account_name}"
+
+    @property
+    def dfs_url(self) -> str:
+        return f"{self.url}/dfs/{self.account_name}"
+
+    @property
+    def table_url(self) -> str:
+        return f"{self.url}/table/{self.account_name}"
+
+    @property
+    def connection_string(self) -> str:
+        return (
+            f"DefaultEndpointsProtocol=http;AccountName={self.account_name};"
+            f"AccountKey={self.account_key};BlobEndpoint={self.blob_url};"
+            f"TableEndpoint={self.table_url};"
+        )
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _track_requests(self, request: web.Request, handler):
+        self.request_counts[request.method] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds)
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    def _headers(self, **extra) -> Dict[str, str]:
+        self._etag += 1
+        headers = {
+            "ETag": f'"0x{self._etag:X}"',
+            "Last-Modified": formatdate(usegmt=True),
+            "x-ms-request-id": str(self._etag),
+        }
+        headers.update(extra)
+        return headers
+
+    def _storage_error(self, status: int, code: str) -> web.Response:
+        body = (
+            f'<?xml version="1.0" encoding="utf-8"?><Error><Code>{code}</Code></Error>'
+        )
+        return web.Response(
+            status=status,
+            body=body,
+            content_type="application/xml",
+            headers={"x-ms-error-code": code},
+        )
+
+    def _create_container(self, name: str) -> web.Response:
+        if name in self.containers:
+            return self._storage_error(409, "ContainerAlreadyExists")
+        self.containers[name] = {}
+        self.directories[name] = set()
+        return web.Response(status=201, headers=self._headers())
+
+    async def _handle_blob(self, request: web.Request) -> web.Response:
+        container, _, blob = request.match_info["path"].partition("/")
+        query = request.query
+
+        if request.method == "PUT" and query.get("restype") == "container":
+            return self._create_container(container)
+        if container not in self.containers:
+            return self._storage_error(404, "ContainerNotFound")
+
+        blobs = self.containers[container]
+        if request.method == "GET" and query.get("comp") == "list":
+            return self._list_blobs(container, query.get("prefix", ""))
+
+        if request.method == "PUT":
+            blobs[blob] = await request.read()
+            return web.Response(status=201, headers=self._headers())
+
+        if request.method == "DELETE":
+            if blobs.pop(blob, None) is None:
+                return self._storage_error(404, "BlobNotFound")
+            return web.Response(status=202, headers=self._headers())
+
+        if request.method == "GET" and blob:
+            if blob not in blobs:
+                return self._storage_error(404, "BlobNotFound")
+            return self._download(blobs[blob], request)
+
+        return self._storage_error(400, "UnsupportedOperation")
+
+    def _list_blobs(self, container: str, prefix: str) -> web.Response:
+        items = "".join(
+            f"<Blob><Name>{escape(name)}</Name><Properties>"
+            f"<Last-Modified>{formatdate(usegmt=True)}</Last-Modified>"
+            f"<Etag>0x{self._etag:X}</Etag>"
+            f"<Content-Length>{len(data)}</Content-Length>"
+            "<BlobType>BlockBlob</BlobType></Properties></Blob>"
+            for name, data in sorted(self.containers[container].items())
+            if name.startswith(prefix)
+        )
+        body = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            f'<EnumerationResults ServiceEndpoint="{self.blob_url}/" '
+            f'ContainerName="{container}"><Prefix>{escape(prefix)}</Prefix>'
+            f"<Blobs>{items}</Blobs><NextMarker /></EnumerationResults>"
+        )
+        return web.Response(
+            status=200,
+            body=body,
+            content_type="application/xml",
+            headers=self._headers(),
+        )
+
+    def _download(self, data: bytes, request: web.Request) -> web.Response:
+        headers = self._headers(**{"x-ms-blob-type": "BlockBlob"})
+        requested = request.headers.get("x-ms-range") or request.headers.get("Range")
+        if not requested or not data:
+            return web.Response(status=200, body=data, headers=headers)
+
+        start, _, end = requested.split("=", 1)[1].partition("-")
+        start, end = int(start), min(int(end or len(data) - 1), len(data) - 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        return web.Response(status=206, body=data[start : end + 1], headers=headers)
+
+    async def _handle_dfs(self, request: web.Request) -> web.Response:
+        filesystem, _, path = request.match_info["path"].partition("/")
+        query = request.query
+
+        if request.method == "PUT" and query.get("restype") == "container":
+            return self._create_container(filesystem)
+        if filesystem not in self.containers:
+            return self._storage_error(404, "FilesystemNotFound")
+
+        files = self.containers[filesystem]
+        resource, action = query.get("resource"), query.get("action")
+
+        if request.method == "PUT" and resource == "directory":
+            self.directories[filesystem].add(path)
+            return web.Response(status=201, headers=self._headers())
+
+        if request.method == "PUT" and resource == "file":
+            files[path] = b""
+            self._pending[(filesystem, path)] = bytearray()
+            return web.Response(status=201, headers=self._headers())
+
+        if request.method == "PATCH" and action == "append":
+            pending = self._pending.setdefault((filesystem, path), bytearray())
+            position = int(query.get("position", len(pending)))
+            pending[position:] = await request.read()
+            return web.Response(status=202, headers=self._headers())
+
+        if request.method == "PATCH" and action == "flush":
+            pending = self._pending.pop((filesystem, path), bytearray())
+            files[path] = bytes(pending[: int(query.get("position", len(pending)))])
+            return web.Response(status=200, headers=self._headers())
+
+        if request.method == "GET" and query.get("resource") == "filesystem":
+            return self._list_paths(files, query.get("directory", ""))
+
+        if request.method == "GET" and path in files:
+            return self._download(files[path], request)
+
+        if request.method == "DELETE":
+            if files.pop(path, None) is None:
+                return self._storage_error(404, "PathNotFound")
+            return web.Response(status=200, headers=self._headers())
+
+        return self._storage_error(400, "UnsupportedOperation")
+
+    def _list_paths(self, files: Dict[str, bytes], directory: str) -> web.Response:
+        prefix = directory.rstrip("/") + "/" if directory else ""
+        paths = [
+            {
+                "name": name,
+                "contentLength": str(len(data)),
+                "lastModified": formatdate(usegmt=True),
+                "etag": f"0x{self._etag:X}",
+            }
+            for name, data in sorted(files.items())
+            if name.startswith(prefix)
+        ]
+        return web.json_response({"paths": paths}, headers=self._headers())
+
+    def _table_error(self, status: int, code: str) -> web.Response:
+        body = {"odata.error": {"code": code, "message": {"value": code}}}
+        return web.json_response(
+            body,
+            status=status,
+            content_type="application/json;odata=minimalmetadata",
+        )
+
+    def _table_entity(self, body: dict) -> dict:
+        return {k: v for k, v in body.items() if not k.endswith("@odata.type")}
+
+    async def _handle_table(self, request: web.Request) -> web.Response:
+        path = request.match_info["path"]
+
+        if request.method == "POST" and path == "$batch":
+            return await self._handle_batch(request)
+
+        if request.method == "POST" and path == "Tables":
+            name = json.loads(await request.read())["TableName"]
+            if name in self.tables:
+                return self._table_error(409, "TableAlreadyExists")
+            self.tables[name] = {}
+            return web.json_response(
+                {"TableName": name},
+                status=201,
+                content_type="application/json;odata=minimalmetadata",
+                headers=self._headers(),
+            )
+
+        if request.method == "POST" and path in self.tables:
+            entity = self._table_entity(json.loads(await request.read()))
+            key = (entity["PartitionKey"], entity["RowKey"])
+            if _invalid_key(key):
+                return self._table_error(400, "OutOfRangeInput")
+            if key in self.tables[path]:
+                return self._table_error(409, "EntityAlreadyExists")
+            self.tables[path][key] = entity
+            return web.json_response(
+                entity,
+                status=201,
+                content_type="application/json;odata=minimalmetadata",
+                headers=self._headers(),
+            )
+
+        table = path.split("(")[0]
+        if table not in self.tables:
+            return self._table_error(404, "TableNotFound")
+        if request.method == "GET":
+            return self._query_entities(self.tables[table], request.query)
+        return self._table_error(400, "NotImplemented")
+
+    async def _handle_batch(self, request: web.Request) -> web.Response:
+        self.request_counts["batch"] += 1
+        body = (await request.read()).decode().replace("\r\n", "\n")
+        changeset = body.split("boundary=", 1)[1].split("\n", 1)[0].strip()
+        parts = body.split(f"--{changeset}")[1:-1]
+
+        staged: Dict[str, Dict[Tuple[str, str], Optional[dict]]] = {}
+        partitions = set()
+        for index, part in enumerate(parts):
+            http = part.split("\n\n", 1)[1]
+            request_line, _, rest = http.partition("\n")
+            method, url, _ = request_line.split(" ", 2)
+            payload = rest.split("\n\n", 1)[1].strip() if "\n\n" in rest else ""
+
+            table, _, key = url.split(f"/{self.account_name}/", 1)[1].partition("(")
+            if table not in self.tables:
+                return self._batch_response([(index, 404, "TableNotFound")])
+
+            entity = self._table_entity(json.loads(payload)) if payload else {}
+            if key:
+                values = [
+                    unquote(v.split("=", 1)[1]).strip("')") for v in key.split(",")
+                ]
+                entity.update(PartitionKey=values[0], RowKey=values[1])
+            entity_key = (entity["PartitionKey"], entity["RowKey"])
+            partitions.add(entity_key[0])
+
+            pending = staged.setdefault(table, {})
+            exists = (
+                pending[entity_key] is not None
+                if entity_key in pending
+                else entity_key in self.tables[table]
+            )
+            if _invalid_key(entity_key):
+                return self._batch_response([(index, 400, "OutOfRangeInput")])
+            if method == "POST" and exists:
+                return self._batch_response([(index, 409, "EntityAlreadyExists")])
+            if method == "DELETE" and not exists:
+                return self._batch_response([(index, 404, "ResourceNotFound")])
+            if len(partitions) > 1 or len(parts) > 100:
+                return self._batch_response([(index, 400, "InvalidInput")])
+            if method in ("MERGE", "PATCH") and exists:
+                current = pending.get(entity_key) or self.tables[table][entity_key]
+                entity = {**current, **entity}
+            pending[entity_key] = None if method == "DELETE" else entity
+
+        for table, entities in staged.items():
+            for entity_key, entity in entities.items():
+                if entity is None:
+                    self.tables[table].pop(entity_key, None)
+                else:
+                    self.tables[table][entity_key] = entity
+
+        return self._batch_response([(i, 204, None) for i in range(len(parts))])
+
+    def _batch_response(self, results) -> web.Response:
+        self._etag += 1
+        batch = f"batchresponse_{self._etag}"
+        changeset = f"changesetresponse_{self._etag}"
+        lines = [
+            f"--{batch}",
+            f"Content-Type: multipart/mixed; boundary={changeset}",
+            "",
+        ]
+        for index, status, code in results:
+            lines += [
+                f"--{changeset}",
+                "Content-Type: application/http",
+                "Content-Transfer-Encoding: binary",
+                "",
+            ]
+            if code is None:
+                lines += [
+                    f"HTTP/1.1 {status} No Content",
+                    "DataServiceVersion: 3.0;",
+                    f'ETag: W/"{self._etag}"',
+                    "",
+                    "",
+                ]
+            else:
+                error = {
+                    "odata.error": {
+                        "code": code,
+                        "message": {"lang": "en-US", "value": f"{index}:{code}"},
+                    }
+                }
+                lines += [
+                    f"HTTP/1.1 {status} {code}",
+                    "Content-Type: application/json;odata=minimalmetadata",
+                    "DataServiceVersion: 3.0;",
+                    "",
+                    json.dumps(error),
+                ]
+        lines += [f"--{changeset}--", f"--{batch}--", ""]
+
+        return web.Response(
+            status=202,
+            body="\r\n".join(lines).encode(),
+            headers={"Content-Type": f"multipart/mixed; boundary={batch}"},
+        )
+
+    def _query_entities(self, entities: dict, query) -> web.Response:
+        conditions = []
+        for clause in filter(None, query.get("$filter", "").split(" and ")):
+            name, op, value = clause.strip("() ").split(" ", 2)
+            conditions.append((name, op, value.strip("'").replace("''", "'")))
+
+        start = (query.get("NextPartitionKey"), query.get("NextRowKey"))
+        rows = [
+            entity
+            for key, entity in sorted(entities.items())
+            if (start[0] is None or key >= start)
+            and all(
+                _FILTER_OPERATORS[op](entity.get(name), value)
+                for name, op, value in conditions
+            )
+        ]
+
+        headers = self._headers()
+        top = int(query.get("$top", 1000))
+        if len(rows) > top:
+            headers["x-ms-continuation-NextPartitionKey"] = rows[top]["PartitionKey"]
+            headers["x-ms-continuation-NextRowKey"] = rows[top]["RowKey"]
+            rows = rows[:top]
+
+        select = query.get("$select")
+        if select:
+            columns = select.split(",")
+            rows = [{k: v for k, v in row.items() if k in columns} for row in rows]
+
+        return web.json_response(
+            {"value": rows},
+            content_type="application/json;odata=minimalmetadata",
+            headers=headers,
+        )
+
+
+_FILTER_OPERATORS = {
+    "eq": lambda a, b: a is not None and a == b,
+    "ne": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "ge": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "le": lambda a, b: a is not None and a <= b,
+}
+
+
+def _invalid_key(key: Tuple[str, str]) -> bool:
+    return any(c in part for part in key for c in "/\\#?")
@@ -1,31 +1,47 @@
-from azure.identity import DefaultAzureCredential
-from azure.keyvault.secrets import SecretClient
-from typing import Dict
+import asyncio
+from azure.identity.aio import DefaultAzureCredential
+from azure.keyvault.secrets.aio import SecretClient
+from typing import Dict, Optional
+from src.azure.transport import SharedTransport
 
 
 class KeyVaultManager:
-    def __init__(self, vault_url: str):
+    def __init__(self, vault_url: str, transport: Optional[SharedTransport] = None):
         self.vault_url = vault_url
         self.credential = DefaultAzureCredential()
-        self.client = SecretClient(vault_url=vault_url, credential=self.credential)
+        self.owns_transport = transport is None
+        self.transport = transport or SharedTransport()
+        self.client = SecretClient(
+            vault_url=vault_url,
+            credential=self.credential,
+            transport=self.transport.transport(),
+        )
+
+    async def close(self):
+        await self.client.close()
+        await self.credential.close()
+        if self.owns_transport:
+            await self.transport.close()
 
     async def get_exchange_credentials(self, exchange_name: str) -> Dict[str, str]:
         try:
-            api_key = self.client.get_secret(f"{exchange_name}-api-key").value
-            api_secret = self.client.get_secret(f"{exchange_name}-api-secret").value
-            return {"api_key": api_key, "api_secret": api_secret}
+            api_key, api_secret = await asyncio.gather(
+                self.client.get_secret(f"{exchange_name}-api-key"),
+                self.client.get_secret(f"{exchange_name}-api-secret"),
+            )
+            return {"api_key": api_key.value, "api_secret": api_secret.value}
         except Exception:
             return {"api_key": "", "api_secret": ""}
 
     async def get_openai_key(self) -> str:
         try:
-            return self.client.get_secret("openai-api-key").value
+            return (await self.client.get_secret("openai-api-key")).value
         except Exception:
             return ""
 
     async def set_secret(self, name: str, value: str) -> bool:
         try:
-            self.client.set_secret(name, value)
+            await self.client.set_secret(name, value)
             return True
         except Exception:
             return False
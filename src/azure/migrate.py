@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import logging
+import re
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.azure.storage import StorageManager
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+MIGRATED_ROW_KEY = re.compile(r"^\d{19}_[0-9a-f]{32}$")
+
+
+def _entity_timestamp(entity: dict) -> Optional[datetime]:
+    value = entity.get("timestamp")
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+
+    candidates = [entity["RowKey"].split("_", 1)[0]]
+    if isinstance(value, str):
+        candidates.insert(0, value)
+
+    for candidate in candidates:
+        for parse in (
+            datetime.fromisoformat,
+            lambda v: datetime.strptime(v, "%Y%m%d%H%M%S%f"),
+        ):
+            try:
+                return parse(candidate).replace(tzinfo=None)
+            except ValueError:
+                pass
+    return None
+
+
+async def migrate_table(
+    storage: StorageManager, delete_source: bool = False, batch_size: int = 1000
+) -> Dict[str, int]:
+    stats = Counter()
+    table_client = storage.table_service.get_table_client(storage.table_name)
+    upserts: List[tuple] = []
+    deletes: List[tuple] = []
+
+    async def flush():
+        results = await storage.submit_transactions(upserts)
+        failed = sum(r["operations"] for r in results if not r["succeeded"])
+        stats["migrated"] += len(upserts) - failed
+        stats["failed"] += failed
+        await storage.register_symbols(
+            [
+                {"symbol": entity.get("symbol") or entity["PartitionKey"]}
+                for _, entity in upserts
+            ]
+        )
+
+        if delete_source and not failed:
+            results = await storage.submit_transactions(deletes)
+            stats["deleted"] += sum(r["operations"] for r in results if r["succeeded"])
+        upserts.clear()
+        deletes.clear()
+
+    async for entity in table_client.list_entities(results_per_page=batch_size):
+        stats["scanned"] += 1
+        if MIGRATED_ROW_KEY.match(entity["RowKey"]):
+            stats["skipped"] += 1
+            continue
+
+        timestamp = _entity_timestamp(entity)
+        if timestamp is None:
+            stats["unparseable"] += 1
+            continue
+
+        source_key = f"{entity['PartitionKey']}/{entity['RowKey']}"
+        migrated = dict(entity)
+        migrated["PartitionKey"] = storage.partition_key(
+            entity.get("symbol") or entity["PartitionKey"], timestamp
+        )
+        migrated["RowKey"] = storage.row_key(
+            timestamp, uuid.uuid5(uuid.NAMESPACE_URL, source_key).hex
+        )
+        migrated.setdefault("timestamp", timestamp)
+
+        upserts.append(("upsert", migrated))
+        deletes.append(
+            (
+                "delete",
+                {"PartitionKey": entity["PartitionKey"], "RowKey": entity["RowKey"]},
+            )
+        )
+        if len(upserts) >= batch_size:
+            await flush()
+
+    if upserts:
+        await flush()
+    return dict(stats)
+
+
+async def main(argv: Optional[List[str]] = None) -> Dict[str, int]:
+    parser = argparse.ArgumentParser(
+        description="Rewrite opportunity table rows to inverted-tick RowKeys"
+    )
+    parser.add_argument(
+        "--connection-string", default=settings.azure_storage_connection_string
+    )
+    parser.add_argument("--table", default="opportunities")
+    parser.add_argument(
+        "--partition-bucket",
+        choices=["hour", "day"],
+        default=settings.table_partition_bucket or None,
+    )
+    parser.add_argument("--delete-source", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    storage = StorageManager(
+        args.connection_string, partition_bucket=args.partition_bucket
+    )
+    storage.table_name = args.table
+    try:
+        stats = await migrate_table(storage, args.delete_source, args.batch_size)
+    finally:
+        await storage.close()
+
+    logger.info(f"Table migration finished: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Sink:
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[List[Any]], Awaitable[None]],
+        max_queue_size: int,
+    ):
+        self.name = name
+        self.handler = handler
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.stats: Counter = Counter()
+        self.task: Optional[asyncio.Task] = None
+
+
+class PersistencePipeline:
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        flush_size: int = 100,
+        flush_interval_seconds: float = 1.0,
+        drop_policy: str = "oldest",
+    ):
+        if drop_policy not in ("oldest", "newest"):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.max_queue_size = max_queue_size
+        self.flush_size = flush_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.drop_policy = drop_policy
+        self.sinks: Dict[str, _Sink] = {}
+
+    def add_sink(
+        self,
+        name: str,
+        handler: Callable[[List[Any]], Awaitable[None]],
+        max_queue_size: Optional[int] = None,
+    ):
+        self.sinks[name] = _Sink(name, handler, max_queue_size or self.max_queue_size)
+
+    async def start(self):
+        for sink in self.sinks.values():
+            if sink.task is None:
+                sink.task = asyncio.create_task(self._run(sink))
+
+    async def stop(self, timeout: float = 30.0):
+        active = [sink for sink in self.sinks.values() if sink.task is not None]
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(sink.queue.join() for sink in active)), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Persistence pipeline did not drain before timeout")
+
+        for sink in active:
+            sink.task.cancel()
+        await asyncio.gather(*(sink.task for sink in active), return_exceptions=True)
+        for sink in active:
+            sink.task = None
+
+    def submit(self, name: str, records: List[Any]) -> int:
+        sink = self.sinks.get(name)
+        if sink is None:
+            return 0
+
+        accepted = 0
+        for record in records:
+            if sink.queue.full():
+                sink.stats["dropped"] += 1
+                if self.drop_policy == "newest":
+                    continue
+                sink.queue.get_nowait()
+                sink.queue.task_done()
+
+            sink.queue.put_nowait(record)
+            accepted += 1
+
+        sink.stats["submitted"] += accepted
+        return accepted
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {
+                "queued": sink.queue.qsize(),
+                "submitted": sink.stats["submitted"],
+                "written": sink.stats["written"],
+                "failed": sink.stats["failed"],
+                "dropped": sink.stats["dropped"],
+                "batches": sink.stats["batches"],
+            }
+            for name, sink in self.sinks.items()
+        }
+
+    async def _run(self, sink: _Sink):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await sink.queue.get()]
+            deadline = loop.time() + self.flush_interval_seconds
+
+            while len(batch) < self.flush_size:
+                if not sink.queue.empty():
+                    batch.append(sink.queue.get_nowait())
+                    continue
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(sink.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._write(sink, batch)
+
+    async def _write(self, sink: _Sink, batch: List[Any]):
+        try:
+            await sink.handler(batch)
+            sink.stats["written"] += len(batch)
+        except Exception as e:
+            sink.stats["failed"] += len(batch)
+            logger.error(f"Persistence sink {sink.name} failed: {e}")
+        finally:
+            sink.stats["batches"] += 1
+            for _ in batch:
+                sink.queue.task_done()
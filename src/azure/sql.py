@@ -1,4 +1,9 @@
-from typing import List, Dict, Optional
+import asyncio
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+from typing import AsyncIterator, List, Dict, Optional, Sequence
 from datetime import datetime
 
 try:
@@ -9,17 +14,97 @@ except ImportError:
     PYODBC_AVAILABLE = False
 
 
+OPPORTUNITY_COLUMNS = (
+    "symbol",
+    "buy_exchange",
+    "sell_exchange",
+    "buy_price",
+    "sell_price",
+    "profit_percent",
+    "profit_usd",
+    "volume",
+    "timestamp",
+)
+
+HISTORY_COLUMNS = {
+    "id": np.int64,
+    "symbol": object,
+    "buy_exchange": object,
+    "sell_exchange": object,
+    "buy_price": np.float64,
+    "sell_price": np.float64,
+    "profit_percent": np.float64,
+    "profit_usd": np.float64,
+    "volume": np.float64,
+    "timestamp": "datetime64[us]",
+    "created_at": "datetime64[us]",
+}
+
+MARKET_DATA_COLUMNS = (
+    "exchange",
+    "symbol",
+    "bid",
+    "ask",
+    "last_price",
+    "volume",
+    "timestamp",
+)
+
+BULK_INSERT_ROWS = 200
+
+
 class SQLManager:
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, pool_size: int = 4):
         self.connection_string = connection_string
         if not PYODBC_AVAILABLE:
             raise ImportError("pyodbc is not installed")
 
+        self.pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="sql"
+        )
+
     def get_connection(self):
         return pyodbc.connect(self.connection_string)
 
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self.pool.get_nowait()
+        except queue.Empty:
+            conn = self.get_connection()
+
+        try:
+            yield conn
+        except Exception:
+            conn.close()
+            raise
+
+        try:
+            self.pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                break
+
     async def init_database(self):
-        conn = self.get_connection()
+        await self._run(self._init_database)
+
+    def _init_database(self):
+        with self.connection() as conn:
+            self._create_tables(conn)
+
+    def _create_tables(self, conn):
         cursor = conn.cursor()
 
         cursor.execute(
@@ -41,6 +126,13 @@ class SQLManager:
             """
         )
 
+        cursor.execute(
+            """
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_timestamp_id')
+            CREATE INDEX idx_timestamp_id ON arbitrage_opportunities (timestamp, id)
+            """
+        )
+
         cursor.execute(
             """
             IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='trades' AND xtype='U')
@@ -60,49 +152,117 @@ class SQLManager:
             """
         )
 
+        cursor.execute(
+            """
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='market_data' AND xtype='U')
+            CREATE TABLE market_data (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                exchange VARCHAR(50) NOT NULL,
+                symbol VARCHAR(20) NOT NULL,
+                bid DECIMAL(18,8) NOT NULL,
+                ask DECIMAL(18,8) NOT NULL,
+                last_price DECIMAL(18,8) NOT NULL,
+                volume DECIMAL(18,8) NOT NULL,
+                timestamp DATETIME NOT NULL,
+                created_at DATETIME DEFAULT GETDATE()
+            )
+            """
+        )
+
         conn.commit()
-        conn.close()
 
     async def save_opportunity(self, opportunity: Dict) -> Optional[int]:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                INSERT INTO arbitrage_opportunities 
-                (symbol, buy_exchange, sell_exchange, buy_price, sell_price, 
-                 profit_percent, profit_usd, volume, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    opportunity["symbol"],
-                    opportunity["buy_exchange"],
-                    opportunity["sell_exchange"],
-                    opportunity["buy_price"],
-                    opportunity["sell_price"],
-                    opportunity["profit_percent"],
-                    opportunity["profit_usd"],
-                    opportunity["volume"],
-                    opportunity["timestamp"],
-                ),
-            )
-            conn.commit()
-            cursor.execute("SELECT @@IDENTITY")
-            opportunity_id = cursor.fetchone()[0]
-            return opportunity_id
+            ids = await self.save_opportunities([opportunity])
         except Exception:
             return None
-        finally:
-            conn.close()
+        return ids[0] if ids else None
+
+    async def save_opportunities(self, opportunities: List[Dict]) -> List[int]:
+        if not opportunities:
+            return []
+        return await self._run(self._insert_opportunities, opportunities)
+
+    def _insert_opportunities(self, opportunities: List[Dict]) -> List[int]:
+        ids = [None] * len(opportunities)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for start in range(0, len(opportunities), BULK_INSERT_ROWS):
+                    chunk = opportunities[start : start + BULK_INSERT_ROWS]
+                    cursor.execute(
+                        self._bulk_insert_sql(len(chunk)),
+                        [
+                            value
+                            for ordinal, opp in enumerate(chunk, start)
+                            for value in (
+                                ordinal,
+                                *(opp[column] for column in OPPORTUNITY_COLUMNS),
+                            )
+                        ],
+                    )
+                    for ordinal, inserted_id in cursor.fetchall():
+                        ids[ordinal] = inserted_id
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return ids
+
+    def _bulk_insert_sql(self, rows: int) -> str:
+        # OUTPUT order is not guaranteed to follow VALUES order, so each row
+        # carries its ordinal through a MERGE source and ids are mapped on it.
+        columns = ", ".join(OPPORTUNITY_COLUMNS)
+        placeholders = ", ".join(
+            ["(" + ", ".join(["?"] * (len(OPPORTUNITY_COLUMNS) + 1)) + ")"] * rows
+        )
+        return (
+            "MERGE INTO arbitrage_opportunities "
+            f"USING (VALUES {placeholders}) AS source (ordinal, {columns}) "
+            "ON 1 = 0 "
+            f"WHEN NOT MATCHED THEN INSERT ({columns}) "
+            f"VALUES ({', '.join(f'source.{c}' for c in OPPORTUNITY_COLUMNS)}) "
+            "OUTPUT source.ordinal, INSERTED.id;"
+        )
+
+    async def save_market_data(self, rows: Sequence[tuple]) -> int:
+        if not rows:
+            return 0
+        return await self._run(self._insert_market_data, rows)
+
+    def _insert_market_data(self, rows: Sequence[tuple]) -> int:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for start in range(0, len(rows), BULK_INSERT_ROWS):
+                    chunk = rows[start : start + BULK_INSERT_ROWS]
+                    placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+                    cursor.execute(
+                        f"INSERT INTO market_data ({', '.join(MARKET_DATA_COLUMNS)}) "
+                        f"VALUES {placeholders}",
+                        [value for row in chunk for value in row],
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return len(rows)
 
     async def get_opportunities_by_date_range(
         self, start_date: datetime, end_date: datetime
     ) -> List[Dict]:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
         try:
+            return await self._run(
+                self._select_opportunities_by_date_range, start_date, end_date
+            )
+        except Exception:
+            return []
+
+    def _select_opportunities_by_date_range(
+        self, start_date: datetime, end_date: datetime
+    ) -> List[Dict]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
             cursor.execute(
                 """
                 SELECT * FROM arbitrage_opportunities 
@@ -118,7 +278,67 @@ class SQLManager:
                 results.append(dict(zip(columns, row)))
 
             return results
-        except Exception:
-            return []
-        finally:
-            conn.close()
+
+    async def iter_opportunities(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 5000,
+        as_numpy: bool = False,
+    ) -> AsyncIterator:
+        columns = list(columns or HISTORY_COLUMNS)
+        unknown = [c for c in columns if c not in HISTORY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown opportunity columns: {unknown}")
+
+        last_key = None
+        while True:
+            rows = await self._run(
+                self._select_page, start_date, end_date, columns, batch_size, last_key
+            )
+            if not rows:
+                return
+
+            last_key = rows[-1][-2:]
+            batch = [tuple(row[: len(columns)]) for row in rows]
+            yield self._to_records(batch, columns) if as_numpy else batch
+
+            if len(rows) < batch_size:
+                return
+
+    def _select_page(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        columns: List[str],
+        batch_size: int,
+        last_key: Optional[tuple],
+    ) -> List[tuple]:
+        sql = (
+            f"SELECT TOP (?) {', '.join(columns)}, timestamp, id "
+            "FROM arbitrage_opportunities "
+            "WHERE timestamp >= ? AND timestamp < ?"
+        )
+        params = [batch_size, start_date, end_date]
+        if last_key is not None:
+            sql += " AND (timestamp > ? OR (timestamp = ? AND id > ?))"
+            params += [last_key[0], last_key[0], last_key[1]]
+        sql += " ORDER BY timestamp, id"
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = []
+            while True:
+                chunk = cursor.fetchmany(1000)
+                if not chunk:
+                    return rows
+                rows.extend(chunk)
+
+    def _to_records(self, batch: List[tuple], columns: List[str]) -> np.recarray:
+        values = list(zip(*batch))
+        return np.rec.fromarrays(
+            [np.array(v, dtype=HISTORY_COLUMNS[c]) for c, v in zip(columns, values)],
+            names=columns,
+        )
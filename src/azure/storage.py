@@ -1,29 +1,84 @@
+import asyncio
 import json
-from datetime import datetime
-from typing import List
-from azure.storage.blob import BlobServiceClient
-from azure.data.tables import TableServiceClient, TableEntity
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from azure.storage.blob.aio import BlobServiceClient
+from azure.data.tables import TableEntity
+from azure.data.tables.aio import TableServiceClient
+from src.azure.transport import SharedTransport
+
+logger = logging.getLogger(__name__)
+
+MAX_TRANSACTION_OPERATIONS = 100
+SYMBOL_PARTITION = "symbols"
+MAX_TICKS = 3155378975999999999
+PARTITION_BUCKETS = {
+    "hour": ("%Y%m%d%H", timedelta(hours=1)),
+    "day": ("%Y%m%d", timedelta(days=1)),
+}
+
+
+def inverted_ticks(timestamp: datetime) -> str:
+    ticks = (timestamp.replace(tzinfo=None) - datetime(1, 1, 1)) // timedelta(
+        microseconds=1
+    )
+    return f"{MAX_TICKS - ticks * 10:019d}"
+
+
+def safe_key(value: str) -> str:
+    for char in "/\\#?":
+        value = value.replace(char, "-")
+    return value
 
 
 class StorageManager:
-    def __init__(self, connection_string: str):
-        self.blob_service = BlobServiceClient.from_connection_string(connection_string)
+    def __init__(
+        self,
+        connection_string: str,
+        transport: Optional[SharedTransport] = None,
+        max_concurrency: int = 8,
+        partition_bucket: Optional[str] = None,
+        max_lookback_buckets: int = 48,
+    ):
+        if partition_bucket and partition_bucket not in PARTITION_BUCKETS:
+            raise ValueError(f"Unknown partition bucket: {partition_bucket}")
+
+        self.owns_transport = transport is None
+        self.transport = transport or SharedTransport()
+        self.blob_service = BlobServiceClient.from_connection_string(
+            connection_string, transport=self.transport.transport()
+        )
         self.table_service = TableServiceClient.from_connection_string(
-            connection_string
+            connection_string, transport=self.transport.transport()
         )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
         self.container_name = "arbitrage-data"
         self.table_name = "opportunities"
+        self.symbol_table_name = "opportunitysymbols"
+        self.partition_bucket = partition_bucket or None
+        self.max_lookback_buckets = max_lookback_buckets
+        self.known_symbols: Dict[str, None] = {}
+        self.registered_symbols: Set[str] = set()
 
     async def init_storage(self):
         try:
-            self.blob_service.create_container(self.container_name)
+            await self.blob_service.create_container(self.container_name)
         except Exception:
             pass
 
-        try:
-            self.table_service.create_table(self.table_name)
-        except Exception:
-            pass
+        for table_name in (self.table_name, self.symbol_table_name):
+            try:
+                await self.table_service.create_table(table_name)
+            except Exception:
+                pass
+
+    async def close(self):
+        await self.blob_service.close()
+        await self.table_service.close()
+        if self.owns_transport:
+            await self.transport.close()
 
     async def save_opportunities_to_blob(
         self, opportunities: List[dict], timestamp: datetime
@@ -33,35 +88,256 @@ class StorageManager:
             container=self.container_name, blob=blob_name
         )
 
-        data = json.dumps(opportunities, default=str, indent=2)
-        blob_client.upload_blob(data, overwrite=True)
+        data = json.dumps(opportunities, default=str)
+        async with self.semaphore:
+            await blob_client.upload_blob(data, overwrite=True)
 
-    async def save_opportunity_to_table(self, opportunity: dict):
+    async def upload_file(self, path: str, data):
+        container_client = self.blob_service.get_container_client(self.container_name)
+        async with self.semaphore:
+            await container_client.upload_blob(path, data, overwrite=True)
+
+    async def list_files(self, prefix: str) -> List[str]:
+        container_client = self.blob_service.get_container_client(self.container_name)
+        async with self.semaphore:
+            return [
+                blob.name
+                async for blob in container_client.list_blobs(name_starts_with=prefix)
+            ]
+
+    async def download_file(self, path: str) -> bytes:
+        container_client = self.blob_service.get_container_client(self.container_name)
+        async with self.semaphore:
+            downloader = await container_client.download_blob(path)
+            return await downloader.readall()
+
+    async def delete_file(self, path: str):
+        container_client = self.blob_service.get_container_client(self.container_name)
+        async with self.semaphore:
+            await container_client.delete_blob(path)
+
+    async def save_opportunity_to_table(self, opportunity: dict) -> bool:
         table_client = self.table_service.get_table_client(self.table_name)
 
-        entity = TableEntity()
-        entity["PartitionKey"] = opportunity.get("symbol", "UNKNOWN")
-        entity["RowKey"] = (
-            f"{datetime.now().isoformat()}_{opportunity.get('buy_exchange', '')}_{opportunity.get('sell_exchange', '')}"
+        try:
+            async with self.semaphore:
+                await table_client.create_entity(self._to_entity(opportunity))
+        except Exception as e:
+            logger.error(f"Failed to save opportunity to table: {e}")
+            return False
+
+        await self.register_symbols([opportunity])
+        return True
+
+    async def save_opportunities_to_table(
+        self, opportunities: List[dict]
+    ) -> List[Dict]:
+        results = await self.submit_transactions(
+            [("create", self._to_entity(opportunity)) for opportunity in opportunities]
+        )
+        await self.register_symbols(opportunities)
+        return results
+
+    async def register_symbols(self, opportunities: List[dict]):
+        symbols = {
+            opportunity.get("symbol", "UNKNOWN") for opportunity in opportunities
+        } - self.registered_symbols
+        if not symbols:
+            return
+
+        self.registered_symbols |= symbols
+        results = await self.submit_transactions(
+            [
+                (
+                    "upsert",
+                    {
+                        "PartitionKey": SYMBOL_PARTITION,
+                        "RowKey": safe_key(symbol),
+                        "symbol": symbol,
+                    },
+                )
+                for symbol in sorted(symbols)
+            ],
+            self.symbol_table_name,
         )
+        if not all(result["succeeded"] for result in results):
+            self.registered_symbols -= symbols
+
+    async def load_symbols(self) -> List[str]:
+        table_client = self.table_service.get_table_client(self.symbol_table_name)
+        try:
+            async with self.semaphore:
+                async for entity in table_client.query_entities(
+                    "PartitionKey eq @pk",
+                    parameters={"pk": SYMBOL_PARTITION},
+                    select=["symbol"],
+                ):
+                    self.known_symbols[entity["symbol"]] = None
+                    self.registered_symbols.add(entity["symbol"])
+        except Exception as e:
+            logger.error(f"Failed to load symbol registry: {e}")
+        return list(self.known_symbols)
+
+    async def submit_transactions(
+        self, operations: List[tuple], table_name: Optional[str] = None
+    ) -> List[Dict]:
+        partitions: Dict[str, List[tuple]] = {}
+        for operation in operations:
+            partitions.setdefault(operation[1]["PartitionKey"], []).append(operation)
+
+        table_client = self.table_service.get_table_client(
+            table_name or self.table_name
+        )
+        batches = [
+            (partition_key, ops[i : i + MAX_TRANSACTION_OPERATIONS])
+            for partition_key, ops in partitions.items()
+            for i in range(0, len(ops), MAX_TRANSACTION_OPERATIONS)
+        ]
+        return await asyncio.gather(
+            *(self._submit_batch(table_client, pk, batch) for pk, batch in batches)
+        )
+
+    async def _submit_batch(
+        self, table_client, partition_key: str, operations: List[tuple]
+    ) -> Dict:
+        result = {
+            "partition_key": partition_key,
+            "operations": len(operations),
+            "succeeded": True,
+            "error": None,
+        }
+        try:
+            async with self.semaphore:
+                await table_client.submit_transaction(operations)
+        except Exception as e:
+            result.update(succeeded=False, error=str(e).splitlines()[0])
+            logger.error(
+                f"Table transaction for {partition_key} failed "
+                f"({len(operations)} operations): {result['error']}"
+            )
+        return result
+
+    def _to_entity(self, opportunity: dict) -> TableEntity:
+        timestamp = opportunity.get("timestamp")
+        if not isinstance(timestamp, datetime):
+            timestamp = datetime.now()
+
+        symbol = opportunity.get("symbol", "UNKNOWN")
+        self.known_symbols[symbol] = None
+
+        entity = TableEntity()
+        entity["PartitionKey"] = self.partition_key(symbol, timestamp)
+        entity["RowKey"] = self.row_key(timestamp)
         entity.update(
             {
                 k: v
                 for k, v in opportunity.items()
-                if isinstance(v, (str, int, float, bool))
+                if isinstance(v, (str, int, float, bool, datetime))
             }
         )
+        return entity
+
+    def partition_key(self, symbol: str, timestamp: datetime) -> str:
+        if not self.partition_bucket:
+            return safe_key(symbol)
+        bucket_format, _ = PARTITION_BUCKETS[self.partition_bucket]
+        return f"{safe_key(symbol)}_{timestamp.strftime(bucket_format)}"
+
+    def row_key(self, timestamp: datetime, suffix: Optional[str] = None) -> str:
+        return f"{inverted_ticks(timestamp)}_{suffix or uuid.uuid4().hex}"
+
+    def _partitions(
+        self, symbol: str, start: Optional[datetime], end: datetime
+    ) -> List[str]:
+        if not self.partition_bucket:
+            return [safe_key(symbol)]
+
+        bucket_format, step = PARTITION_BUCKETS[self.partition_bucket]
+        if start is None:
+            start = end - step * (self.max_lookback_buckets - 1)
+
+        partitions = []
+        current = end
+        while current.strftime(bucket_format) >= start.strftime(bucket_format):
+            partitions.append(self.partition_key(symbol, current))
+            current -= step
+        return partitions
+
+    async def get_recent_opportunities(
+        self,
+        limit: int = 100,
+        symbols: Optional[List[str]] = None,
+        select: Optional[List[str]] = None,
+    ) -> List[dict]:
+        symbols = symbols or list(self.known_symbols) or await self.load_symbols()
+        now = datetime.now()
 
         try:
-            table_client.create_entity(entity)
-        except Exception:
-            pass
+            per_symbol = await asyncio.gather(
+                *(
+                    self._query_partitions(
+                        self._partitions(symbol, None, now), limit, select=select
+                    )
+                    for symbol in symbols
+                )
+            )
+        except Exception as e:
+            logger.error(f"Failed to query recent opportunities: {e}")
+            return []
 
-    async def get_recent_opportunities(self, limit: int = 100) -> List[dict]:
-        table_client = self.table_service.get_table_client(self.table_name)
+        entities = [entity for rows in per_symbol for entity in rows]
+        entities.sort(key=lambda entity: entity["RowKey"])
+        return entities[:limit]
 
+    async def get_opportunities_in_range(
+        self,
+        symbol: str,
+        start: datetime,
+        end: datetime,
+        limit: Optional[int] = None,
+        select: Optional[List[str]] = None,
+    ) -> List[dict]:
         try:
-            entities = table_client.list_entities(results_per_page=limit)
-            return [dict(e) for e in entities][:limit]
-        except Exception:
+            return await self._query_partitions(
+                self._partitions(symbol, start, end),
+                limit,
+                row_range=(inverted_ticks(end), inverted_ticks(start) + "~"),
+                select=select,
+            )
+        except Exception as e:
+            logger.error(f"Failed to query opportunities for {symbol}: {e}")
             return []
+
+    async def _query_partitions(
+        self,
+        partitions: List[str],
+        limit: Optional[int],
+        row_range: Optional[tuple] = None,
+        select: Optional[List[str]] = None,
+    ) -> List[dict]:
+        table_client = self.table_service.get_table_client(self.table_name)
+        query_filter = "PartitionKey eq @pk"
+        parameters = {}
+        if row_range:
+            query_filter += " and RowKey ge @low and RowKey lt @high"
+            parameters.update(low=row_range[0], high=row_range[1])
+        if select:
+            select = list(dict.fromkeys(["PartitionKey", "RowKey", *select]))
+
+        entities = []
+        for partition in partitions:
+            remaining = None if limit is None else limit - len(entities)
+            if remaining == 0:
+                break
+
+            async with self.semaphore:
+                async for entity in table_client.query_entities(
+                    query_filter,
+                    parameters={**parameters, "pk": partition},
+                    select=select,
+                    results_per_page=min(remaining or 1000, 1000),
+                ):
+                    entities.append(dict(entity))
+                    if remaining is not None and len(entities) >= limit:
+                        break
+        return entities
@@ -0,0 +1,25 @@
+import aiohttp
+from typing import Optional
+from azure.core.pipeline.transport import AioHttpTransport
+
+
+class SharedTransport:
+    def __init__(self, limit: int = 100, limit_per_host: int = 0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def transport(self) -> AioHttpTransport:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit, limit_per_host=self.limit_per_host
+                ),
+                auto_decompress=False,
+            )
+        return AioHttpTransport(session=self.session, session_owner=False)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
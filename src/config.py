@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 
@@ -16,6 +16,47 @@ class Settings(BaseSettings):
     arbitrage_threshold_percent: float = 0.5
     max_position_size_usd: float = 10000.0
     data_collection_interval_seconds: int = 10
+    market_data_mode: str = "polling"
+    stream_min_cycle_interval_seconds: float = 1.0
+    analyzer_engine: str = "numpy"
+    analyzer_mode: str = "batch"
+    analyzer_workers: int = 1
+    max_quote_age_seconds: float = 30.0
+    top_opportunities_limit: int = 10
+    depth_aware_sizing: bool = True
+    orderbook_depth: int = 50
+    depth_refresh_seconds: float = 10.0
+    triangular_arbitrage_enabled: bool = False
+    triangular_fee_percent: float = 0.1
+    persistence_queue_size: int = 1000
+    persistence_flush_size: int = 100
+    persistence_flush_interval_seconds: float = 2.0
+    persistence_drop_policy: str = "oldest"
+    persistence_drain_timeout_seconds: float = 30.0
+    persistence_sql_queue_cycles: int = 16
+    azure_max_concurrency: int = 8
+    table_partition_bucket: str = ""
+    archive_flush_rows: int = 5000
+    archive_flush_interval_seconds: float = 300.0
+    archive_compaction_interval_seconds: float = 60.0
+    tick_recording_enabled: bool = True
+    tick_segment_size: int = 16384
+    tick_flush_interval_seconds: float = 60.0
+    tick_store_path: str = ""
+    tick_store_capacity: int = 8192
+    metrics_enabled: bool = True
+    metrics_port: int = 8000
+    telemetry_mode: str = "aggregate"
+    telemetry_sample_rates: Dict[str, float] = {}
+    telemetry_metric_sample_rate: float = 0.0
+    telemetry_event_sample_rate: float = 1.0
+    telemetry_flush_interval_seconds: float = 60.0
+    telemetry_async_logging: bool = True
+    profile_mode: str = "sampling"
+    profile_iterations: int = 10
+    profile_on_start: bool = False
+    profile_output_dir: str = "profiles"
+    profile_sample_interval_seconds: float = 0.005
 
     class Config:
         env_file = ".env"
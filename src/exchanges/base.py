@@ -1,16 +1,9 @@
-from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+import re
+from abc import ABC
+from typing import AsyncIterator, Callable, Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
-
-
-@dataclass
-class OrderBook:
-    exchange: str
-    symbol: str
-    bids: List[tuple]
-    asks: List[tuple]
-    timestamp: datetime
+from src.exchanges.orderbook import OrderBook
 
 
 @dataclass
@@ -24,24 +17,112 @@ class Ticker:
     timestamp: datetime
 
 
+def override_rest_url(client, base_url: str):
+    client.urls["api"] = {
+        name: re.sub(r"^https?://[^/]+", base_url.rstrip("/"), url)
+        for name, url in client.urls["api"].items()
+    }
+
+
 class BaseExchange(ABC):
-    def __init__(self, api_key: str, api_secret: str, name: str):
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        name: str,
+        client: Optional[Callable] = None,
+        ws_client: Optional[Callable] = None,
+        rest_url: Optional[str] = None,
+    ):
         self.api_key = api_key
         self.api_secret = api_secret
         self.name = name
+        self.exchange = self.ws_exchange = None
+        self.orderbooks: Dict[str, OrderBook] = {}
+
+        config = {"apiKey": api_key, "secret": api_secret, "enableRateLimit": True}
+        if client:
+            self.exchange = client(config)
+            if rest_url:
+                override_rest_url(self.exchange, rest_url)
+        if ws_client:
+            self.ws_exchange = ws_client(config)
+
+    def _to_ticker(self, symbol: str, ticker: dict) -> Ticker:
+        return Ticker(
+            exchange=self.name,
+            symbol=symbol,
+            bid=ticker["bid"],
+            ask=ticker["ask"],
+            last=ticker["last"],
+            volume=ticker["baseVolume"],
+            timestamp=datetime.now(),
+        )
 
-    @abstractmethod
     async def get_ticker(self, symbol: str) -> Optional[Ticker]:
-        pass
+        try:
+            return self._to_ticker(symbol, await self.exchange.fetch_ticker(symbol))
+        except Exception:
+            return None
+
+    async def get_tickers(self, symbols: List[str]) -> List[Ticker]:
+        try:
+            tickers = await self.exchange.fetch_tickers(symbols)
+            wanted = set(symbols)
+            return [
+                self._to_ticker(symbol, ticker)
+                for symbol, ticker in tickers.items()
+                if symbol in wanted
+            ]
+        except Exception:
+            return []
 
-    @abstractmethod
     async def get_orderbook(self, symbol: str, limit: int = 10) -> Optional[OrderBook]:
-        pass
+        try:
+            orderbook = await self.exchange.fetch_order_book(symbol, limit)
+            return self._update_orderbook(symbol, orderbook, limit)
+        except Exception:
+            return None
 
-    @abstractmethod
     async def get_balance(self) -> Dict[str, float]:
-        pass
+        try:
+            balance = await self.exchange.fetch_balance()
+            return {k: v["free"] for k, v in balance.items() if v["free"] > 0}
+        except Exception:
+            return {}
+
+    async def watch_tickers(self, symbols: List[str]) -> AsyncIterator[Ticker]:
+        if self.ws_exchange is None:
+            raise NotImplementedError(f"{self.name} does not support ticker streaming")
+
+        while True:
+            tickers = await self.ws_exchange.watch_tickers(symbols)
+            for symbol, ticker in tickers.items():
+                yield self._to_ticker(symbol, ticker)
+
+    async def watch_orderbook(
+        self, symbol: str, limit: int = 10
+    ) -> AsyncIterator[OrderBook]:
+        if self.ws_exchange is None:
+            raise NotImplementedError(
+                f"{self.name} does not support order book streaming"
+            )
+
+        while True:
+            orderbook = await self.ws_exchange.watch_order_book(symbol, limit)
+            yield self._update_orderbook(symbol, orderbook, limit)
+
+    def _update_orderbook(self, symbol: str, orderbook: dict, limit: int) -> OrderBook:
+        book = self.orderbooks.get(symbol)
+        if book is None:
+            book = self.orderbooks[symbol] = OrderBook(self.name, symbol)
+        book.apply_snapshot(
+            orderbook["bids"][:limit], orderbook["asks"][:limit], datetime.now()
+        )
+        return book.copy()
 
-    @abstractmethod
     async def close(self):
-        pass
+        if self.exchange is not None:
+            await self.exchange.close()
+        if self.ws_exchange is not None:
+            await self.ws_exchange.close()
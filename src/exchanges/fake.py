@@ -0,0 +1,370 @@
+import asyncio
+import json
+import math
+import random
+import time
+import aiohttp
+from collections import Counter
+from aiohttp import web
+from typing import AsyncIterator, Dict, List, Optional
+from src.exchanges.base import BaseExchange, Ticker, OrderBook
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+
+class FakeExchangeServer:
+    def __init__(
+        self,
+        prices: Optional[Dict[str, float]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tick_interval_seconds: float = 0.05,
+        spread_percent: float = 0.02,
+        volatility_percent: float = 0.05,
+        seed: Optional[int] = None,
+        latency_seconds: float = 0.0,
+        latency_distribution: str = "constant",
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit_per_second: float = 0.0,
+        rate_limit_burst: Optional[int] = None,
+    ):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+
+        self.prices = dict(prices or {"BTC/USDT": 50000.0, "ETH/USDT": 3000.0})
+        self.host = host
+        self.port = port
+        self.tick_interval_seconds = tick_interval_seconds
+        self.spread_percent = spread_percent
+        self.volatility_percent = volatility_percent
+        self.random = random.Random(seed)
+        self.latency_seconds = latency_seconds
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_per_second = rate_limit_per_second
+        self.rate_limit_burst = rate_limit_burst or max(1, int(rate_limit_per_second))
+        self._tokens = float(self.rate_limit_burst)
+        self._refilled_at = time.monotonic()
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+        self._sockets = set()
+        self.request_counts = Counter()
+        self.status_counts = Counter()
+
+        self.app = web.Application(middlewares=[self._simulate_network])
+        self.app.router.add_get("/ticker", self._handle_ticker)
+        self.app.router.add_get("/tickers", self._handle_tickers)
+        self.app.router.add_get("/orderbook", self._handle_orderbook)
+        self.app.router.add_get("/balance", self._handle_balance)
+        self.app.router.add_get("/ws", self._handle_ws)
+        self.app.router.add_get(
+            "/api/v3/exchangeInfo", self._handle_binance_exchange_info
+        )
+        self.app.router.add_get("/fapi/v1/exchangeInfo", self._handle_binance_empty)
+        self.app.router.add_get("/dapi/v1/exchangeInfo", self._handle_binance_empty)
+        self.app.router.add_get("/api/v3/ticker/24hr", self._handle_binance_tickers)
+        self.app.router.add_get("/api/v3/depth", self._handle_binance_depth)
+
+    async def start(self) -> str:
+        # ccxt's fetch_tickers puts every symbol in the query string, which
+        # outgrows aiohttp's default 8 KiB request line at a few hundred pairs.
+        self._runner = web.AppRunner(self.app, max_line_size=2**20)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{port}"
+        return self.url
+
+    async def stop(self):
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _simulate_network(self, request: web.Request, handler):
+        self.request_counts[request.path] += 1
+        if request.path == "/ws":
+            return await handler(request)
+
+        delay = self._latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if not self._take_token():
+            response = web.json_response(
+                {"error": "RateLimitExceeded", "message": "Too many requests"},
+                status=429,
+                headers={"Retry-After": "1"},
+            )
+        elif self.error_rate and self.random.random() < self.error_rate:
+            response = web.json_response(
+                {"error": "ExchangeNotAvailable", "message": "Service unavailable"},
+                status=503,
+            )
+        else:
+            response = await handler(request)
+        self.status_counts[response.status] += 1
+        return response
+
+    def _latency(self) -> float:
+        mean = self.latency_seconds
+        if mean <= 0:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            return self.random.uniform(0, 2 * mean)
+        if self.latency_distribution == "exponential":
+            return self.random.expovariate(1 / mean)
+        if self.latency_distribution == "lognormal":
+            return self.random.lognormvariate(math.log(mean), self.latency_sigma)
+        return mean
+
+    def _take_token(self) -> bool:
+        if self.rate_limit_per_second <= 0:
+            return True
+
+        now = time.monotonic()
+        self._tokens = min(
+            self.rate_limit_burst,
+            self._tokens + (now - self._refilled_at) * self.rate_limit_per_second,
+        )
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _step(self, symbol: str) -> float:
+        price = self.prices.setdefault(symbol, 100.0)
+        price *= 1 + self.random.gauss(0, self.volatility_percent / 100)
+        self.prices[symbol] = price
+        return price
+
+    def _ticker(self, symbol: str) -> dict:
+        price = self._step(symbol)
+        half_spread = price * self.spread_percent / 200
+        return {
+            "symbol": symbol,
+            "bid": price - half_spread,
+            "ask": price + half_spread,
+            "last": price,
+            "baseVolume": self.random.uniform(100, 1000),
+            "timestamp": int(time.time() * 1000),
+        }
+
+    def _orderbook(self, symbol: str, limit: int) -> dict:
+        ticker = self._ticker(symbol)
+        tick = ticker["last"] * 0.0001
+        return {
+            "symbol": symbol,
+            "bids": [
+                [ticker["bid"] - i * tick, self.random.uniform(0.1, 5.0)]
+                for i in range(limit)
+            ],
+            "asks": [
+                [ticker["ask"] + i * tick, self.random.uniform(0.1, 5.0)]
+                for i in range(limit)
+            ],
+            "timestamp": ticker["timestamp"],
+        }
+
+    async def _handle_ticker(self, request: web.Request) -> web.Response:
+        return web.json_response(self._ticker(request.query["symbol"]))
+
+    async def _handle_tickers(self, request: web.Request) -> web.Response:
+        symbols = request.query["symbols"].split(",")
+        return web.json_response({symbol: self._ticker(symbol) for symbol in symbols})
+
+    async def _handle_orderbook(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", 10))
+        return web.json_response(self._orderbook(request.query["symbol"], limit))
+
+    async def _handle_balance(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"USDT": {"free": 100000.0, "used": 0.0, "total": 100000.0}}
+        )
+
+    def _binance_symbols(self) -> Dict[str, str]:
+        return {symbol.replace("/", ""): symbol for symbol in self.prices}
+
+    async def _handle_binance_empty(self, request: web.Request) -> web.Response:
+        return web.json_response({"timezone": "UTC", "symbols": []})
+
+    async def _handle_binance_exchange_info(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "timezone": "UTC",
+                "serverTime": int(time.time() * 1000),
+                "rateLimits": [],
+                "symbols": [
+                    {
+                        "symbol": market_id,
+                        "status": "TRADING",
+                        "baseAsset": symbol.split("/")[0],
+                        "quoteAsset": symbol.split("/")[1],
+                        "baseAssetPrecision": 8,
+                        "quotePrecision": 8,
+                        "quoteAssetPrecision": 8,
+                        "orderTypes": ["LIMIT", "MARKET"],
+                        "isSpotTradingAllowed": True,
+                        "isMarginTradingAllowed": False,
+                        "filters": [],
+                        "permissions": ["SPOT"],
+                    }
+                    for market_id, symbol in self._binance_symbols().items()
+                ],
+            }
+        )
+
+    async def _handle_binance_tickers(self, request: web.Request) -> web.Response:
+        markets = self._binance_symbols()
+        market_ids = json.loads(request.query.get("symbols", "null")) or markets
+        tickers = []
+        for market_id in market_ids:
+            ticker = self._ticker(markets[market_id])
+            tickers.append(
+                {
+                    "symbol": market_id,
+                    "bidPrice": str(ticker["bid"]),
+                    "askPrice": str(ticker["ask"]),
+                    "lastPrice": str(ticker["last"]),
+                    "volume": str(ticker["baseVolume"]),
+                    "quoteVolume": str(ticker["baseVolume"] * ticker["last"]),
+                    "openTime": ticker["timestamp"] - 86_400_000,
+                    "closeTime": ticker["timestamp"],
+                }
+            )
+        return web.json_response(tickers)
+
+    async def _handle_binance_depth(self, request: web.Request) -> web.Response:
+        symbol = self._binance_symbols()[request.query["symbol"]]
+        orderbook = self._orderbook(symbol, int(request.query.get("limit", 100)))
+        return web.json_response(
+            {
+                "lastUpdateId": orderbook["timestamp"],
+                "bids": [[str(p), str(q)] for p, q in orderbook["bids"]],
+                "asks": [[str(p), str(q)] for p, q in orderbook["asks"]],
+            }
+        )
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+
+        subscription = await ws.receive_json()
+        channel = subscription.get("channel", "ticker")
+        symbols = subscription.get("symbols", [])
+        limit = subscription.get("limit", 10)
+
+        try:
+            while not ws.closed:
+                for symbol in symbols:
+                    if channel == "orderbook":
+                        data = self._orderbook(symbol, limit)
+                    else:
+                        data = self._ticker(symbol)
+                    await ws.send_json({"channel": channel, "data": data})
+
+                try:
+                    message = await ws.receive(timeout=self.tick_interval_seconds)
+                except asyncio.TimeoutError:
+                    continue
+                if message.type in (web.WSMsgType.CLOSE, web.WSMsgType.CLOSED):
+                    break
+        except ConnectionResetError:
+            pass
+        finally:
+            self._sockets.discard(ws)
+
+        return ws
+
+
+class FakeExchange(BaseExchange):
+    def __init__(self, name: str, base_url: str):
+        super().__init__("", "", name)
+        self.base_url = base_url
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    def _to_orderbook(self, orderbook: dict, limit: int) -> OrderBook:
+        return self._update_orderbook(orderbook["symbol"], orderbook, limit)
+
+    async def get_ticker(self, symbol: str) -> Optional[Ticker]:
+        try:
+            async with self._get_session().get(
+                f"{self.base_url}/ticker", params={"symbol": symbol}
+            ) as response:
+                response.raise_for_status()
+                ticker = await response.json()
+                return self._to_ticker(ticker["symbol"], ticker)
+        except Exception:
+            return None
+
+    async def get_tickers(self, symbols: List[str]) -> List[Ticker]:
+        try:
+            async with self._get_session().get(
+                f"{self.base_url}/tickers", params={"symbols": ",".join(symbols)}
+            ) as response:
+                response.raise_for_status()
+                tickers = await response.json()
+                return [
+                    self._to_ticker(symbol, ticker)
+                    for symbol, ticker in tickers.items()
+                ]
+        except Exception:
+            return []
+
+    async def get_orderbook(self, symbol: str, limit: int = 10) -> Optional[OrderBook]:
+        try:
+            async with self._get_session().get(
+                f"{self.base_url}/orderbook",
+                params={"symbol": symbol, "limit": limit},
+            ) as response:
+                response.raise_for_status()
+                return self._to_orderbook(await response.json(), limit)
+        except Exception:
+            return None
+
+    async def get_balance(self) -> Dict[str, float]:
+        try:
+            async with self._get_session().get(f"{self.base_url}/balance") as response:
+                response.raise_for_status()
+                balance = await response.json()
+                return {k: v["free"] for k, v in balance.items() if v["free"] > 0}
+        except Exception:
+            return {}
+
+    async def watch_tickers(self, symbols: List[str]) -> AsyncIterator[Ticker]:
+        async with self._get_session().ws_connect(f"{self.base_url}/ws") as ws:
+            await ws.send_json({"channel": "ticker", "symbols": symbols})
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                ticker = message.json()["data"]
+                yield self._to_ticker(ticker["symbol"], ticker)
+
+    async def watch_orderbook(
+        self, symbol: str, limit: int = 10
+    ) -> AsyncIterator[OrderBook]:
+        async with self._get_session().ws_connect(f"{self.base_url}/ws") as ws:
+            await ws.send_json(
+                {"channel": "orderbook", "symbols": [symbol], "limit": limit}
+            )
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                yield self._to_orderbook(message.json()["data"], limit)
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
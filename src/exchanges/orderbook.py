@@ -0,0 +1,239 @@
+import numpy as np
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+
+class _BookSide:
+    def __init__(self, descending: bool, capacity: int = 64, resync_every: int = 4096):
+        self.sign = -1.0 if descending else 1.0
+        self.keys = np.empty(capacity, dtype=np.float64)
+        self.sizes = np.empty(capacity, dtype=np.float64)
+        self.cum_sizes = np.empty(capacity, dtype=np.float64)
+        self.cum_notional = np.empty(capacity, dtype=np.float64)
+        self.count = 0
+        self.resync_every = resync_every
+        self._patches = 0
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self.keys):
+            return
+        new_capacity = max(capacity, 2 * len(self.keys))
+        for name in ("keys", "sizes", "cum_sizes", "cum_notional"):
+            grown = np.empty(new_capacity, dtype=np.float64)
+            grown[: self.count] = getattr(self, name)[: self.count]
+            setattr(self, name, grown)
+
+    def _resync(self):
+        n = self.count
+        np.cumsum(self.sizes[:n], out=self.cum_sizes[:n])
+        np.cumsum(self.sizes[:n] * self.keys[:n] * self.sign, out=self.cum_notional[:n])
+        self._patches = 0
+
+    def _patched(self):
+        self._patches += 1
+        if self._patches >= self.resync_every:
+            self._resync()
+
+    def copy(self) -> "_BookSide":
+        n = self.count
+        side = _BookSide(self.sign < 0, max(n, 1), self.resync_every)
+        for name in ("keys", "sizes", "cum_sizes", "cum_notional"):
+            getattr(side, name)[:n] = getattr(self, name)[:n]
+        side.count = n
+        return side
+
+    def load(self, levels: Iterable):
+        levels = np.asarray(levels, dtype=np.float64)
+        if levels.size == 0:
+            self.count = 0
+            return
+
+        levels = levels.reshape(len(levels), -1)[:, :2]
+        levels = levels[levels[:, 1] > 0]
+        keys = levels[:, 0] * self.sign
+        order = np.argsort(keys, kind="stable")
+
+        self.count = 0
+        self._reserve(len(keys))
+        self.keys[: len(keys)] = keys[order]
+        self.sizes[: len(keys)] = levels[order, 1]
+        self.count = len(keys)
+        self._resync()
+
+    def update(self, price: float, size: float):
+        key = price * self.sign
+        n = self.count
+        i = int(np.searchsorted(self.keys[:n], key))
+        cum_sizes, cum_notional = self.cum_sizes, self.cum_notional
+
+        if i < n and self.keys[i] == key:
+            delta = size - self.sizes[i] if size > 0 else -self.sizes[i]
+            if size > 0:
+                self.sizes[i] = size
+                cum_sizes[i:n] += delta
+                cum_notional[i:n] += delta * price
+            else:
+                self.keys[i : n - 1] = self.keys[i + 1 : n]
+                self.sizes[i : n - 1] = self.sizes[i + 1 : n]
+                cum_sizes[i : n - 1] = cum_sizes[i + 1 : n] + delta
+                cum_notional[i : n - 1] = cum_notional[i + 1 : n] + delta * price
+                self.count -= 1
+        elif size > 0:
+            self._reserve(n + 1)
+            cum_sizes, cum_notional = self.cum_sizes, self.cum_notional
+            self.keys[i + 1 : n + 1] = self.keys[i:n]
+            self.sizes[i + 1 : n + 1] = self.sizes[i:n]
+            cum_sizes[i + 1 : n + 1] = cum_sizes[i:n] + size
+            cum_notional[i + 1 : n + 1] = cum_notional[i:n] + size * price
+            self.keys[i] = key
+            self.sizes[i] = size
+            cum_sizes[i] = (cum_sizes[i - 1] if i else 0.0) + size
+            cum_notional[i] = (cum_notional[i - 1] if i else 0.0) + size * price
+            self.count += 1
+        else:
+            return
+
+        self._patched()
+
+    def prices(self) -> np.ndarray:
+        return self.keys[: self.count] * self.sign
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if self.count == 0:
+            return None
+        return float(self.keys[0] * self.sign), float(self.sizes[0])
+
+    def size_at(self, price: float) -> float:
+        key = price * self.sign
+        i = int(np.searchsorted(self.keys[: self.count], key))
+        if i < self.count and self.keys[i] == key:
+            return float(self.sizes[i])
+        return 0.0
+
+    def cumulative(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.cum_sizes[: self.count], self.cum_notional[: self.count]
+
+    def fill(self, amount: float) -> Tuple[float, float]:
+        if self.count == 0 or amount <= 0:
+            return 0.0, 0.0
+
+        cum_sizes, cum_notional = self.cumulative()
+        i = int(np.searchsorted(cum_sizes, amount))
+        if i >= self.count:
+            return float(cum_sizes[-1]), float(cum_notional[-1])
+
+        prev_size = cum_sizes[i - 1] if i else 0.0
+        prev_notional = cum_notional[i - 1] if i else 0.0
+        price = self.keys[i] * self.sign
+        return amount, float(prev_notional + (amount - prev_size) * price)
+
+    def fill_notional(self, notional: float) -> Tuple[float, float]:
+        if self.count == 0 or notional <= 0:
+            return 0.0, 0.0
+
+        cum_sizes, cum_notional = self.cumulative()
+        i = int(np.searchsorted(cum_notional, notional))
+        if i >= self.count:
+            return float(cum_sizes[-1]), float(cum_notional[-1])
+
+        prev_size = cum_sizes[i - 1] if i else 0.0
+        prev_notional = cum_notional[i - 1] if i else 0.0
+        price = self.keys[i] * self.sign
+        return float(prev_size + (notional - prev_notional) / price), notional
+
+    def levels(self, limit: Optional[int] = None) -> List[tuple]:
+        n = self.count if limit is None else min(limit, self.count)
+        return list(zip((self.keys[:n] * self.sign).tolist(), self.sizes[:n].tolist()))
+
+
+class OrderBook:
+    def __init__(
+        self,
+        exchange: str,
+        symbol: str,
+        bids: Iterable = (),
+        asks: Iterable = (),
+        timestamp: Optional[datetime] = None,
+    ):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timestamp = timestamp or datetime.now()
+        self._sides = {
+            "bids": _BookSide(descending=True),
+            "asks": _BookSide(descending=False),
+        }
+        self.apply_snapshot(bids, asks, self.timestamp)
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderBook(exchange={self.exchange!r}, symbol={self.symbol!r}, "
+            f"bids={self._sides['bids'].count}, asks={self._sides['asks'].count}, "
+            f"timestamp={self.timestamp!r})"
+        )
+
+    def copy(self) -> "OrderBook":
+        book = OrderBook.__new__(OrderBook)
+        book.exchange = self.exchange
+        book.symbol = self.symbol
+        book.timestamp = self.timestamp
+        book._sides = {name: side.copy() for name, side in self._sides.items()}
+        return book
+
+    @property
+    def bids(self) -> List[tuple]:
+        return self._sides["bids"].levels()
+
+    @property
+    def asks(self) -> List[tuple]:
+        return self._sides["asks"].levels()
+
+    def apply_snapshot(
+        self, bids: Iterable, asks: Iterable, timestamp: Optional[datetime] = None
+    ):
+        self._sides["bids"].load(bids)
+        self._sides["asks"].load(asks)
+        self.timestamp = timestamp or datetime.now()
+
+    def apply_deltas(
+        self,
+        bids: Iterable = (),
+        asks: Iterable = (),
+        timestamp: Optional[datetime] = None,
+    ):
+        for side, levels in (("bids", bids), ("asks", asks)):
+            book_side = self._sides[side]
+            for level in levels:
+                book_side.update(float(level[0]), float(level[1]))
+        self.timestamp = timestamp or datetime.now()
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        return self._sides["bids"].best()
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        return self._sides["asks"].best()
+
+    def depth(self, side: str) -> int:
+        return self._sides[side].count
+
+    def depth_at(self, side: str, price: float) -> float:
+        return self._sides[side].size_at(price)
+
+    def levels(self, side: str, limit: Optional[int] = None) -> List[tuple]:
+        return self._sides[side].levels(limit)
+
+    def cumulative(self, side: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        book_side = self._sides[side]
+        cum_sizes, cum_notional = book_side.cumulative()
+        return book_side.prices(), cum_sizes, cum_notional
+
+    def fill(self, side: str, amount: float) -> Tuple[float, float]:
+        return self._sides[side].fill(amount)
+
+    def fill_notional(self, side: str, notional: float) -> Tuple[float, float]:
+        return self._sides[side].fill_notional(notional)
+
+    def vwap(self, side: str, amount: float) -> Optional[float]:
+        filled, notional = self.fill(side, amount)
+        if filled <= 0:
+            return None
+        return notional / filled
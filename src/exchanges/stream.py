@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Tuple
+from src.exchanges.base import BaseExchange, Ticker
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataStream:
+    def __init__(
+        self,
+        exchanges: List[BaseExchange],
+        symbols: List[str],
+        reconnect_delay_seconds: float = 1.0,
+    ):
+        self.exchanges = exchanges
+        self.symbols = symbols
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.tickers: Dict[Tuple[str, str], Ticker] = {}
+        self.listeners: List[Callable[[Ticker], None]] = []
+        self.error_listeners: List[Callable[[str, Exception], None]] = []
+        self.listener_errors = 0
+        self._updated = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def add_listener(self, listener: Callable[[Ticker], None]):
+        self.listeners.append(listener)
+
+    def add_error_listener(self, listener: Callable[[str, Exception], None]):
+        self.error_listeners.append(listener)
+
+    async def start(self):
+        for exchange in self.exchanges:
+            self._tasks.append(asyncio.create_task(self._consume(exchange)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def snapshot(self) -> List[Ticker]:
+        return list(self.tickers.values())
+
+    async def wait_for_update(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._updated.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._updated.clear()
+        return True
+
+    async def _consume(self, exchange: BaseExchange):
+        while True:
+            try:
+                async for ticker in exchange.watch_tickers(self.symbols):
+                    self._on_ticker(ticker)
+            except asyncio.CancelledError:
+                raise
+            except NotImplementedError as e:
+                logger.error(f"Streaming unavailable: {e}")
+                return
+            except Exception as e:
+                logger.error(f"Ticker stream error on {exchange.name}: {e}")
+                for listener in self.error_listeners:
+                    listener(exchange.name, e)
+
+            await asyncio.sleep(self.reconnect_delay_seconds)
+
+    def _on_ticker(self, ticker: Ticker):
+        self.tickers[(ticker.exchange, ticker.symbol)] = ticker
+        self._updated.set()
+
+        for listener in self.listeners:
+            try:
+                listener(ticker)
+            except Exception as e:
+                self.listener_errors += 1
+                logger.error(
+                    f"Ticker listener {getattr(listener, '__qualname__', listener)} "
+                    f"failed on {ticker.exchange} {ticker.symbol}: {e}"
+                )
@@ -1,14 +1,23 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from src.config import settings
 from src.exchanges.binance import BinanceExchange
 from src.exchanges.bybit import BybitExchange
 from src.exchanges.gateio import GateioExchange
 from src.exchanges.kraken import KrakenExchange
 from src.exchanges.base import BaseExchange, Ticker
-from src.arbitrage.analyzer import ArbitrageAnalyzer
+from src.exchanges.stream import MarketDataStream
+from src.arbitrage.analyzer import (
+    ArbitrageAnalyzer,
+    ArbitrageOpportunity,
+    RankedOpportunities,
+)
+from src.arbitrage.parallel import ParallelArbitrageAnalyzer
+from src.arbitrage.incremental import IncrementalArbitrageAnalyzer, OpportunityEvent
+from src.arbitrage.triangular import TriangularArbitrageAnalyzer
 from src.arbitrage.executor import ArbitrageExecutor
 from src.ai.openai_service import OpenAIAnalyzer
 from src.azure.keyvault import KeyVaultManager
@@ -19,9 +28,32 @@ try:
 except ImportError:
     SQLManager = None
 
+from src.azure.archive import ColumnarArchiveWriter
 from src.azure.datalake import DataLakeManager
-from src.monitoring.telemetry import init_telemetry, track_event, track_metric, create_span
+from src.azure.pipeline import PersistencePipeline
+from src.azure.transport import SharedTransport
+from src.marketdata.recorder import TickRecorder, TickSegment
+from src.marketdata.ringstore import TickRingStore
+from src.monitoring.telemetry import (
+    init_telemetry,
+    configure_telemetry,
+    stop_telemetry,
+    track_event,
+    track_metric,
+    create_span,
+)
 from src.monitoring.metrics import MetricsCollector
+from src.monitoring.prometheus import (
+    AI_LATENCY,
+    ANALYZER_LATENCY,
+    CYCLE_LATENCY,
+    EXECUTOR_LATENCY,
+    FETCH_LATENCY,
+    PERSISTENCE_LATENCY,
+    TICK_TO_DECISION,
+    MetricsServer,
+)
+from src.monitoring.profiler import RuntimeProfiler
 
 logging.basicConfig(
     level=getattr(logging, settings.log_level),
@@ -33,16 +65,68 @@ logger = logging.getLogger(__name__)
 class ArbitrageBot:
     def __init__(self):
         self.exchanges: List[BaseExchange] = []
-        self.analyzer = ArbitrageAnalyzer(
-            threshold_percent=settings.arbitrage_threshold_percent,
-            max_position_size=settings.max_position_size_usd,
-        )
+        if settings.analyzer_mode == "incremental":
+            self.analyzer = IncrementalArbitrageAnalyzer(
+                threshold_percent=settings.arbitrage_threshold_percent,
+                max_position_size=settings.max_position_size_usd,
+                max_quote_age_seconds=settings.max_quote_age_seconds,
+            )
+            self.analyzer.add_listener(self._on_opportunity_event)
+        elif settings.analyzer_workers > 1:
+            self.analyzer = ParallelArbitrageAnalyzer(
+                threshold_percent=settings.arbitrage_threshold_percent,
+                max_position_size=settings.max_position_size_usd,
+                workers=settings.analyzer_workers,
+            )
+        else:
+            self.analyzer = ArbitrageAnalyzer(
+                threshold_percent=settings.arbitrage_threshold_percent,
+                max_position_size=settings.max_position_size_usd,
+                engine=settings.analyzer_engine,
+            )
+        self.triangular_analyzer = None
+        if settings.triangular_arbitrage_enabled:
+            self.triangular_analyzer = TriangularArbitrageAnalyzer(
+                threshold_percent=settings.arbitrage_threshold_percent,
+                max_position_size=settings.max_position_size_usd,
+                fee_percent=settings.triangular_fee_percent,
+            )
         self.executor = ArbitrageExecutor(dry_run=True)
         self.ai_analyzer = None
         self.storage_manager = None
         self.sql_manager = None
         self.datalake_manager = None
+        self.archives = {}
+        self.compaction_task: Optional[asyncio.Task] = None
+        self.azure_transport = SharedTransport()
+        self.persistence = PersistencePipeline(
+            max_queue_size=settings.persistence_queue_size,
+            flush_size=settings.persistence_flush_size,
+            flush_interval_seconds=settings.persistence_flush_interval_seconds,
+            drop_policy=settings.persistence_drop_policy,
+        )
         self.metrics_collector = MetricsCollector()
+        self.metrics_server = None
+        self.profiler = RuntimeProfiler(
+            output_dir=settings.profile_output_dir,
+            mode=settings.profile_mode,
+            iterations=settings.profile_iterations,
+            sample_interval_seconds=settings.profile_sample_interval_seconds,
+        )
+        if settings.profile_on_start:
+            self.profiler.request()
+        self.market_stream = None
+        self.tick_recorder = None
+        self.tick_store = None
+        if settings.tick_store_path:
+            self.tick_store = TickRingStore(
+                settings.tick_store_path, capacity=settings.tick_store_capacity
+            )
+        self.opportunity_signal = asyncio.Event()
+        self.cycle_started_at = time.perf_counter()
+        self.last_top_key = None
+        self.depth_refined: List[ArbitrageOpportunity] = []
+        self.depth_refreshed_at = float("-inf")
         self.running = False
 
     async def initialize(self):
@@ -52,6 +136,19 @@ class ArbitrageBot:
             init_telemetry(settings.azure_application_insights_connection_string)
             track_event("bot_initialization_started")
 
+        configure_telemetry(
+            settings.telemetry_mode,
+            settings.telemetry_sample_rates,
+            settings.telemetry_metric_sample_rate,
+            settings.telemetry_event_sample_rate,
+            settings.telemetry_flush_interval_seconds,
+            settings.telemetry_async_logging,
+        )
+
+        if settings.metrics_enabled:
+            self.metrics_server = MetricsServer(port=settings.metrics_port)
+            await self.metrics_server.start()
+
         await self._initialize_azure_services()
         await self._initialize_exchanges()
         await self._initialize_ai()
@@ -62,7 +159,10 @@ class ArbitrageBot:
     async def _initialize_azure_services(self):
         if settings.azure_storage_connection_string:
             self.storage_manager = StorageManager(
-                settings.azure_storage_connection_string
+                settings.azure_storage_connection_string,
+                transport=self.azure_transport,
+                max_concurrency=settings.azure_max_concurrency,
+                partition_bucket=settings.table_partition_bucket,
             )
             await self.storage_manager.init_storage()
             logger.info("Azure Storage initialized")
@@ -77,18 +177,66 @@ class ArbitrageBot:
 
         if settings.azure_datalake_account_name:
             self.datalake_manager = DataLakeManager(
-                settings.azure_datalake_account_name
+                settings.azure_datalake_account_name,
+                transport=self.azure_transport,
+                max_concurrency=settings.azure_max_concurrency,
             )
             await self.datalake_manager.init_filesystem()
             logger.info("Azure Data Lake initialized")
 
+        if self.storage_manager:
+            self.archives["blob"] = self._archive_writer(self.storage_manager)
+            self._add_sink("blob", self._write_blob)
+            self._add_sink("table", self._write_table)
+        if self.sql_manager:
+            self._add_sink(
+                "sql", self._write_sql, settings.persistence_sql_queue_cycles
+            )
+            self._add_sink("market_data_sql", self._write_market_data_sql)
+        if self.datalake_manager:
+            self.archives["datalake"] = self._archive_writer(self.datalake_manager)
+            self._add_sink("datalake", self._write_datalake)
+            self._add_sink("market_data_lake", self._write_market_data_lake)
+        if settings.tick_recording_enabled and (
+            "market_data_lake" in self.persistence.sinks
+            or "market_data_sql" in self.persistence.sinks
+        ):
+            self.tick_recorder = TickRecorder(
+                segment_size=settings.tick_segment_size,
+                flush_interval_seconds=settings.tick_flush_interval_seconds,
+            )
+        await self.persistence.start()
+        if self.archives:
+            self.compaction_task = asyncio.create_task(self._compact_archives())
+
+    def _add_sink(self, name: str, handler, max_queue_size: Optional[int] = None):
+        async def timed(records):
+            with PERSISTENCE_LATENCY.time(sink=name):
+                await handler(records)
+
+        self.persistence.add_sink(name, timed, max_queue_size)
+
+    def _archive_writer(self, store) -> ColumnarArchiveWriter:
+        return ColumnarArchiveWriter(
+            store,
+            flush_rows=settings.archive_flush_rows,
+            flush_interval_seconds=settings.archive_flush_interval_seconds,
+        )
+
     async def _initialize_exchanges(self):
         if settings.azure_key_vault_url:
-            kv_manager = KeyVaultManager(settings.azure_key_vault_url)
-
-            for exchange_name in ["binance", "bybit", "gateio", "kraken"]:
-                creds = await kv_manager.get_exchange_credentials(exchange_name)
+            kv_manager = KeyVaultManager(
+                settings.azure_key_vault_url, transport=self.azure_transport
+            )
+            exchange_names = ["binance", "bybit", "gateio", "kraken"]
+            try:
+                all_creds = await asyncio.gather(
+                    *(kv_manager.get_exchange_credentials(n) for n in exchange_names)
+                )
+            finally:
+                await kv_manager.close()
 
+            for exchange_name, creds in zip(exchange_names, all_creds):
                 if creds.get("api_key"):
                     exchange = self._create_exchange(
                         exchange_name, creds["api_key"], creds["api_secret"]
@@ -99,6 +247,28 @@ class ArbitrageBot:
         else:
             logger.warning("No Key Vault configured, using demo mode")
 
+        if settings.market_data_mode == "streaming" and self.exchanges:
+            self.market_stream = MarketDataStream(
+                self.exchanges, settings.trading_pairs
+            )
+            if isinstance(self.analyzer, IncrementalArbitrageAnalyzer):
+                self.market_stream.add_listener(self.analyzer.update)
+            if self.tick_recorder:
+                self.market_stream.add_listener(self.tick_recorder.record)
+            if self.tick_store:
+                self.market_stream.add_listener(self.tick_store.append)
+            self.market_stream.add_listener(self._record_stream_tick)
+            self.market_stream.add_error_listener(
+                lambda exchange, error: self.metrics_collector.record_stream_error(
+                    exchange
+                )
+            )
+            await self.market_stream.start()
+            logger.info("Streaming market data mode enabled")
+
+    def _record_stream_tick(self, ticker: Ticker):
+        self.metrics_collector.record_ticker_fetch(ticker.exchange, ticker.symbol, True)
+
     def _create_exchange(
         self, name: str, api_key: str, api_secret: str
     ) -> BaseExchange:
@@ -118,53 +288,119 @@ class ArbitrageBot:
         api_key = settings.openai_api_key
 
         if not api_key and settings.azure_key_vault_url:
-            kv_manager = KeyVaultManager(settings.azure_key_vault_url)
-            api_key = await kv_manager.get_openai_key()
+            kv_manager = KeyVaultManager(
+                settings.azure_key_vault_url, transport=self.azure_transport
+            )
+            try:
+                api_key = await kv_manager.get_openai_key()
+            finally:
+                await kv_manager.close()
 
         if api_key:
             self.ai_analyzer = OpenAIAnalyzer(api_key)
             logger.info("OpenAI Analyzer initialized")
 
     async def fetch_market_data(self) -> List[Ticker]:
-        tasks = []
-        for exchange in self.exchanges:
-            for symbol in settings.trading_pairs:
-                tasks.append(self._fetch_ticker(exchange, symbol))
+        if self.market_stream:
+            return self.market_stream.snapshot()
+
+        tasks = [
+            self._fetch_tickers(exchange, settings.trading_pairs)
+            for exchange in self.exchanges
+        ]
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
-        tickers = [r for r in results if isinstance(r, Ticker)]
+        tickers = [t for r in results if isinstance(r, list) for t in r]
+
+        if self.tick_recorder:
+            self.tick_recorder.record_many(tickers)
+        if self.tick_store:
+            self.tick_store.append_many(tickers)
 
         return tickers
 
-    async def _fetch_ticker(self, exchange: BaseExchange, symbol: str) -> Ticker:
+    async def _fetch_tickers(
+        self, exchange: BaseExchange, symbols: List[str]
+    ) -> List[Ticker]:
+        started = time.perf_counter()
         try:
-            ticker = await exchange.get_ticker(symbol)
-            success = ticker is not None
-            self.metrics_collector.record_ticker_fetch(exchange.name, symbol, success)
-
-            if success:
-                track_metric(
-                    "ticker_price",
-                    ticker.last,
-                    {"exchange": exchange.name, "symbol": symbol},
-                )
-
-            return ticker
+            tickers = await exchange.get_tickers(symbols)
         except Exception as e:
-            self.metrics_collector.record_ticker_fetch(exchange.name, symbol, False)
-            logger.error(f"Error fetching {symbol} from {exchange.name}: {e}")
-            return None
+            logger.error(f"Error fetching tickers from {exchange.name}: {e}")
+            tickers = []
+        elapsed = time.perf_counter() - started
+        FETCH_LATENCY.observe(elapsed, exchange=exchange.name)
+        self.metrics_collector.record_fetch_latency(exchange.name, elapsed)
+
+        fetched = {ticker.symbol for ticker in tickers}
+        for symbol in symbols:
+            self.metrics_collector.record_ticker_fetch(
+                exchange.name, symbol, symbol in fetched
+            )
+
+        for ticker in tickers:
+            track_metric(
+                "ticker_price",
+                ticker.last,
+                {"exchange": exchange.name, "symbol": ticker.symbol},
+            )
+
+        return tickers
 
     async def analyze_and_execute(self, tickers: List[Ticker]):
-        with create_span("analyze_opportunities"):
-            opportunities = self.analyzer.analyze_opportunities(tickers)
+        if self.triangular_analyzer:
+            self._analyze_triangular(tickers)
+
+        with create_span("analyze_opportunities"), ANALYZER_LATENCY.time(
+            analyzer="pairwise"
+        ):
+            if isinstance(self.analyzer, ParallelArbitrageAnalyzer):
+                opportunities = await asyncio.to_thread(
+                    self.analyzer.top_opportunities,
+                    tickers,
+                    settings.top_opportunities_limit,
+                )
+            else:
+                opportunities = self.analyzer.top_opportunities(
+                    tickers, settings.top_opportunities_limit
+                )
 
         if not opportunities:
             logger.info("No arbitrage opportunities found")
             return
 
-        logger.info(f"Found {len(opportunities)} arbitrage opportunities")
-        track_metric("opportunities_found", len(opportunities))
+        logger.info(f"Found {opportunities.total} arbitrage opportunities")
+        track_metric("opportunities_found", opportunities.total)
+        self.metrics_collector.record_opportunities(opportunities.total)
+        if "sql" in self.persistence.sinks:
+            # One queue item per cycle: drops are whole result sets, and rows are
+            # only built in the sink worker, off the analysis path.
+            self.persistence.submit("sql", [opportunities])
+
+        top_key = tuple(
+            (o.symbol, o.buy_exchange, o.sell_exchange) for o in opportunities
+        )
+        top_changed = top_key != self.last_top_key
+        self.last_top_key = top_key
+
+        if settings.depth_aware_sizing and self.exchanges:
+            now = time.monotonic()
+            if (
+                top_changed
+                or now - self.depth_refreshed_at >= settings.depth_refresh_seconds
+            ):
+                with create_span("depth_aware_sizing"), ANALYZER_LATENCY.time(
+                    analyzer="depth"
+                ):
+                    self.depth_refined = await self.analyzer.refine_with_depth(
+                        list(opportunities), self.exchanges, settings.orderbook_depth
+                    )
+                self.depth_refreshed_at = now
+            opportunities = self.depth_refined
+
+            if not opportunities:
+                logger.info("No opportunities left after order book depth sizing")
+                return
 
         for opp in opportunities[:3]:
             logger.info(
@@ -172,10 +408,10 @@ class ArbitrageBot:
                 f"Profit: {opp.profit_percent:.2f}% (${opp.profit_usd:.2f})"
             )
 
-        await self._save_opportunities(opportunities)
+        self._save_opportunities(opportunities)
 
-        if self.ai_analyzer and opportunities:
-            with create_span("ai_analysis"):
+        if self.ai_analyzer and opportunities and top_changed:
+            with create_span("ai_analysis"), AI_LATENCY.time():
                 ai_result = await self.ai_analyzer.analyze_opportunities(
                     opportunities[:5]
                 )
@@ -184,12 +420,44 @@ class ArbitrageBot:
 
         if opportunities and self.executor:
             best_opportunity = opportunities[0]
-            with create_span("execute_trade"):
+            self._observe_tick_to_decision(tickers, best_opportunity)
+            with create_span("execute_trade"), EXECUTOR_LATENCY.time(
+                mode="dry_run" if self.executor.dry_run else "live"
+            ):
                 executed = await self.executor.execute_opportunity(best_opportunity)
                 if executed:
+                    self.metrics_collector.record_execution(
+                        {"symbol": best_opportunity.symbol}
+                    )
                     logger.info(f"Executed opportunity: {best_opportunity.symbol}")
 
-    async def _save_opportunities(self, opportunities):
+    def _observe_tick_to_decision(self, tickers: List[Ticker], opportunity):
+        now = datetime.now()
+        exchanges = (opportunity.buy_exchange, opportunity.sell_exchange)
+        for ticker in tickers:
+            if ticker.symbol == opportunity.symbol and ticker.exchange in exchanges:
+                TICK_TO_DECISION.observe(
+                    (now - ticker.timestamp).total_seconds(), exchange=ticker.exchange
+                )
+
+    def _analyze_triangular(self, tickers: List[Ticker]):
+        with create_span("triangular_analysis"), ANALYZER_LATENCY.time(
+            analyzer="triangular"
+        ):
+            cycles = self.triangular_analyzer.analyze_opportunities(tickers)
+
+        if not cycles:
+            return
+
+        track_metric("triangular_opportunities_found", len(cycles))
+        for cycle in cycles[:3]:
+            logger.info(
+                f"  Triangular {' -> '.join(cycle.path)} on "
+                f"{', '.join(cycle.exchanges)}: {cycle.profit_percent:.2f}% "
+                f"(${cycle.profit_usd:.2f})"
+            )
+
+    def _save_opportunities(self, opportunities):
         opportunity_dicts = [
             {
                 "symbol": o.symbol,
@@ -205,44 +473,115 @@ class ArbitrageBot:
             for o in opportunities
         ]
 
-        if self.storage_manager:
-            await self.storage_manager.save_opportunities_to_blob(
-                opportunity_dicts, datetime.now()
+        self.persistence.submit("blob", opportunity_dicts)
+        self.persistence.submit("table", opportunity_dicts[:10])
+        self.persistence.submit("datalake", opportunity_dicts)
+
+        for sink, sink_stats in self.persistence.stats().items():
+            track_metric(
+                "persistence_queue_depth", sink_stats["queued"], {"sink": sink}
+            )
+            track_metric("persistence_dropped", sink_stats["dropped"], {"sink": sink})
+
+    async def _write_blob(self, records: List[dict]):
+        await self._write_archive("blob", records)
+
+    async def _write_table(self, records: List[dict]):
+        results = await self.storage_manager.save_opportunities_to_table(records)
+        failed = sum(r["operations"] for r in results if not r["succeeded"])
+        track_metric("table_transactions", len(results))
+        if failed:
+            track_metric("table_write_failures", failed)
+            raise RuntimeError(
+                f"{failed} of {len(records)} table operations were not committed"
             )
 
-            for opp_dict in opportunity_dicts[:10]:
-                await self.storage_manager.save_opportunity_to_table(opp_dict)
+    async def _write_sql(self, results: List[RankedOpportunities]):
+        for ranked in results:
+            records = await asyncio.to_thread(ranked.records)
+            await self.sql_manager.save_opportunities(records)
+            track_metric("sql_opportunities_written", len(records))
 
-        if self.sql_manager:
-            for opp_dict in opportunity_dicts[:10]:
-                await self.sql_manager.save_opportunity(opp_dict)
+    async def _write_datalake(self, records: List[dict]):
+        await self._write_archive("datalake", records)
 
-        if self.datalake_manager:
-            await self.datalake_manager.upload_arbitrage_results(
-                {"opportunities": opportunity_dicts, "timestamp": datetime.now()}
-            )
+    def _submit_tick_segments(self, force: bool = False):
+        if not self.tick_recorder:
+            return
+
+        segments = self.tick_recorder.take_segments(force)
+        if segments:
+            self.persistence.submit("market_data_lake", segments)
+            self.persistence.submit("market_data_sql", segments)
+            track_metric("ticks_recorded", sum(len(s) for s in segments))
+
+    async def _write_market_data_lake(self, segments: List[TickSegment]):
+        for segment in segments:
+            data = await asyncio.to_thread(segment.encode)
+            await self.datalake_manager.upload_market_data(data, segment.started_at)
+
+    async def _write_market_data_sql(self, segments: List[TickSegment]):
+        for segment in segments:
+            rows = await asyncio.to_thread(segment.rows)
+            await self.sql_manager.save_market_data(rows)
+
+    async def _write_archive(self, name: str, records: List[dict]):
+        archive = self.archives[name]
+        archive.append(records)
+        if archive.flush_due():
+            written = await archive.flush()
+            track_metric("archive_files_written", len(written), {"sink": name})
+
+    async def _compact_archives(self):
+        while True:
+            await asyncio.sleep(settings.archive_compaction_interval_seconds)
+            for name, archive in self.archives.items():
+                try:
+                    compacted = await archive.compact_due()
+                except Exception as e:
+                    logger.error(f"Archive compaction for {name} failed: {e}")
+                    continue
+                if compacted:
+                    track_metric(
+                        "archive_files_compacted", len(compacted), {"sink": name}
+                    )
 
     async def run(self):
         self.running = True
         logger.info("Starting arbitrage bot main loop")
         track_event("bot_started")
+        self.profiler.install_signal_handler()
 
         iteration = 0
         while self.running:
             try:
                 iteration += 1
                 logger.info(f"Iteration {iteration} started")
+                self.profiler.start_iteration()
+                started = self.cycle_started_at = time.perf_counter()
 
                 tickers = await self.fetch_market_data()
+                self._submit_tick_segments()
                 logger.info(f"Fetched {len(tickers)} tickers")
 
                 if tickers:
                     await self.analyze_and_execute(tickers)
 
+                elapsed = time.perf_counter() - started
+                CYCLE_LATENCY.observe(elapsed, mode=settings.market_data_mode)
+                self.metrics_collector.record_cycle(elapsed)
+                profile = await self.profiler.end_iteration(elapsed)
+                if profile:
+                    logger.info(f"Profile summary: {profile}")
+                    track_event(
+                        "profile_captured",
+                        {"mode": profile["mode"], "iterations": profile["iterations"]},
+                    )
+
                 stats = self.metrics_collector.get_summary()
                 logger.info(f"Bot statistics: {stats}")
 
-                await asyncio.sleep(settings.data_collection_interval_seconds)
+                await self._wait_for_next_cycle()
 
             except KeyboardInterrupt:
                 logger.info("Shutdown signal received")
@@ -254,17 +593,80 @@ class ArbitrageBot:
 
         await self.shutdown()
 
+    def _on_opportunity_event(self, event: OpportunityEvent):
+        if event.kind != "closed":
+            self.opportunity_signal.set()
+
+    async def _wait_for_next_cycle(self):
+        timeout = settings.data_collection_interval_seconds
+        if self.market_stream:
+            remaining = settings.stream_min_cycle_interval_seconds - (
+                time.perf_counter() - self.cycle_started_at
+            )
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        if self.market_stream and isinstance(
+            self.analyzer, IncrementalArbitrageAnalyzer
+        ):
+            try:
+                await asyncio.wait_for(self.opportunity_signal.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.opportunity_signal.clear()
+        elif self.market_stream:
+            await self.market_stream.wait_for_update(timeout)
+        else:
+            await asyncio.sleep(timeout)
+
     async def shutdown(self):
         logger.info("Shutting down Arbitrage Bot")
         track_event("bot_shutdown")
 
+        if self.market_stream:
+            await self.market_stream.stop()
+
+        if self.compaction_task:
+            self.compaction_task.cancel()
+            try:
+                await self.compaction_task
+            except asyncio.CancelledError:
+                pass
+            self.compaction_task = None
+
+        self._submit_tick_segments(force=True)
+        await self.persistence.stop(settings.persistence_drain_timeout_seconds)
+        logger.info(f"Persistence statistics: {self.persistence.stats()}")
+        for name, archive in self.archives.items():
+            try:
+                await archive.flush()
+            except Exception as e:
+                logger.error(f"Final {name} archive flush failed: {e}")
+
+        if self.sql_manager:
+            self.sql_manager.close()
+        if self.storage_manager:
+            await self.storage_manager.close()
+        if self.datalake_manager:
+            await self.datalake_manager.close()
+        await self.azure_transport.close()
+
         for exchange in self.exchanges:
             await exchange.close()
 
+        if isinstance(self.analyzer, ParallelArbitrageAnalyzer):
+            self.analyzer.close()
+        if self.tick_store:
+            self.tick_store.close()
+
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        await self.profiler.stop()
+
         final_stats = self.executor.get_statistics()
         logger.info(f"Final statistics: {final_stats}")
 
         logger.info("Arbitrage Bot stopped")
+        stop_telemetry()
 
 
 async def main():
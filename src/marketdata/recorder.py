@@ -0,0 +1,184 @@
+import io
+import time
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from src.exchanges.base import Ticker
+
+TICK_COLUMNS = {
+    "timestamp": "datetime64[us]",
+    "exchange_id": np.uint8,
+    "symbol_id": np.uint16,
+    "bid": np.float64,
+    "ask": np.float64,
+    "last": np.float64,
+    "volume": np.float64,
+}
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+@dataclass
+class TickSegment:
+    columns: Dict[str, np.ndarray]
+    exchanges: List[str]
+    symbols: List[str]
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    @property
+    def started_at(self):
+        return self.columns["timestamp"].min().item()
+
+    def encode(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            exchanges=np.array(self.exchanges, dtype=str),
+            symbols=np.array(self.symbols, dtype=str),
+            **self.columns,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def decode(cls, data: bytes) -> "TickSegment":
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            return cls(
+                {name: archive[name] for name in TICK_COLUMNS},
+                archive["exchanges"].tolist(),
+                archive["symbols"].tolist(),
+            )
+
+    def rows(self) -> List[tuple]:
+        columns = self.columns
+        complete = np.isfinite(columns["bid"])
+        for name in ("ask", "last", "volume"):
+            complete &= np.isfinite(columns[name])
+        if not complete.all():
+            columns = {name: values[complete] for name, values in columns.items()}
+
+        exchanges = np.array(self.exchanges, dtype=object)[columns["exchange_id"]]
+        symbols = np.array(self.symbols, dtype=object)[columns["symbol_id"]]
+        return list(
+            zip(
+                exchanges.tolist(),
+                symbols.tolist(),
+                columns["bid"].tolist(),
+                columns["ask"].tolist(),
+                columns["last"].tolist(),
+                columns["volume"].tolist(),
+                columns["timestamp"].tolist(),
+            )
+        )
+
+
+class TickRecorder:
+    def __init__(self, segment_size: int = 16384, flush_interval_seconds: float = 60.0):
+        self.segment_size = segment_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.exchange_ids: Dict[str, int] = {}
+        self.symbol_ids: Dict[str, int] = {}
+        self.completed: List[TickSegment] = []
+        self.recorded = 0
+        self._allocate()
+
+    def _allocate(self):
+        self.columns = {
+            name: np.empty(self.segment_size, dtype=dtype)
+            for name, dtype in TICK_COLUMNS.items()
+        }
+        self.micros = self.columns["timestamp"].view(np.int64)
+        self.size = 0
+        self.started_at: Optional[float] = None
+
+    def _exchange_id(self, exchange: str) -> int:
+        exchange_id = self.exchange_ids.get(exchange)
+        if exchange_id is None:
+            exchange_id = self.exchange_ids[exchange] = len(self.exchange_ids)
+        return exchange_id
+
+    def _symbol_id(self, symbol: str) -> int:
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.symbol_ids[symbol] = len(self.symbol_ids)
+        return symbol_id
+
+    def record(self, ticker: Ticker):
+        if self.size == 0:
+            self.started_at = time.monotonic()
+
+        i = self.size
+        columns = self.columns
+        self.micros[i] = (ticker.timestamp - EPOCH) // MICROSECOND
+        columns["exchange_id"][i] = self._exchange_id(ticker.exchange)
+        columns["symbol_id"][i] = self._symbol_id(ticker.symbol)
+        columns["bid"][i] = ticker.bid
+        columns["ask"][i] = ticker.ask
+        columns["last"][i] = ticker.last
+        columns["volume"][i] = ticker.volume
+
+        self.size += 1
+        self.recorded += 1
+        if self.size == self.segment_size:
+            self._seal()
+
+    def record_many(self, tickers: List[Ticker]):
+        if not tickers:
+            return
+        if self.size == 0:
+            self.started_at = time.monotonic()
+
+        count = len(tickers)
+        micros = np.fromiter(
+            ((t.timestamp - EPOCH) // MICROSECOND for t in tickers), np.int64, count
+        )
+        exchange_ids = np.fromiter(
+            (self._exchange_id(t.exchange) for t in tickers), np.uint8, count
+        )
+        symbol_ids = np.fromiter(
+            (self._symbol_id(t.symbol) for t in tickers), np.uint16, count
+        )
+        values = np.array(
+            [(t.bid, t.ask, t.last, t.volume) for t in tickers], dtype=np.float64
+        )
+
+        offset = 0
+        while offset < count:
+            take = min(self.segment_size - self.size, count - offset)
+            source = slice(offset, offset + take)
+            target = slice(self.size, self.size + take)
+            self.micros[target] = micros[source]
+            self.columns["exchange_id"][target] = exchange_ids[source]
+            self.columns["symbol_id"][target] = symbol_ids[source]
+            for j, name in enumerate(("bid", "ask", "last", "volume")):
+                self.columns[name][target] = values[source, j]
+
+            self.size += take
+            offset += take
+            if self.size == self.segment_size:
+                self._seal()
+                self.started_at = time.monotonic()
+
+        self.recorded += count
+
+    def _seal(self):
+        self.completed.append(
+            TickSegment(
+                {name: values[: self.size] for name, values in self.columns.items()},
+                list(self.exchange_ids),
+                list(self.symbol_ids),
+            )
+        )
+        self._allocate()
+
+    def take_segments(self, force: bool = False) -> List[TickSegment]:
+        if self.size and (
+            force or time.monotonic() - self.started_at >= self.flush_interval_seconds
+        ):
+            self._seal()
+
+        segments, self.completed = self.completed, []
+        return segments
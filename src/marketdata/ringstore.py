@@ -0,0 +1,162 @@
+import os
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from src.exchanges.base import Ticker
+from src.marketdata.recorder import EPOCH, MICROSECOND
+
+RING_MAGIC = 0x31474E4952534B54
+RING_HEADER_BYTES = 64
+RING_COLUMNS = {
+    "timestamp": "datetime64[us]",
+    "bid": np.float64,
+    "ask": np.float64,
+    "last": np.float64,
+    "volume": np.float64,
+}
+
+
+def _safe_name(value: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "-" for c in value)
+
+
+class TickRing:
+    def __init__(self, path: str, capacity: int = 8192, readonly: bool = False):
+        self.path = path
+        exists = os.path.exists(path)
+        if not exists and readonly:
+            raise FileNotFoundError(path)
+
+        if exists:
+            header = np.fromfile(path, dtype=np.int64, count=2)
+            if len(header) < 2 or header[0] != RING_MAGIC:
+                raise ValueError(f"Not a tick ring file: {path}")
+            capacity = int(header[1])
+
+        self.capacity = capacity
+        size = RING_HEADER_BYTES + len(RING_COLUMNS) * 2 * capacity * 8
+        mode = "r" if readonly else ("r+" if exists else "w+")
+        self.buffer = np.memmap(path, dtype=np.uint8, mode=mode, shape=(size,))
+        self.header = self.buffer[:RING_HEADER_BYTES].view(np.int64)
+        if not exists:
+            self.header[0] = RING_MAGIC
+            self.header[1] = capacity
+
+        self.columns: Dict[str, np.ndarray] = {}
+        offset = RING_HEADER_BYTES
+        for name, dtype in RING_COLUMNS.items():
+            end = offset + 2 * capacity * 8
+            self.columns[name] = self.buffer[offset:end].view(dtype)
+            offset = end
+        self.micros = self.columns["timestamp"].view(np.int64)
+
+    @property
+    def count(self) -> int:
+        return int(self.header[2])
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, ticker: Ticker):
+        count = self.count
+        i = count % self.capacity
+        j = i + self.capacity
+        columns = self.columns
+        self.micros[i] = self.micros[j] = (ticker.timestamp - EPOCH) // MICROSECOND
+        columns["bid"][i] = columns["bid"][j] = ticker.bid
+        columns["ask"][i] = columns["ask"][j] = ticker.ask
+        columns["last"][i] = columns["last"][j] = ticker.last
+        columns["volume"][i] = columns["volume"][j] = ticker.volume
+        self.header[2] = count + 1
+
+    def last(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        count = self.count
+        n = len(self) if n is None else min(n, len(self))
+        end = count % self.capacity + self.capacity
+        if count < self.capacity:
+            end = count
+        return {name: values[end - n : end] for name, values in self.columns.items()}
+
+    def since(self, start: datetime) -> Dict[str, np.ndarray]:
+        window = self.last()
+        first = np.searchsorted(
+            window["timestamp"], np.datetime64(start, "us"), side="left"
+        )
+        return {name: values[first:] for name, values in window.items()}
+
+    def flush(self):
+        self.buffer.flush()
+
+
+class TickRingStore:
+    def __init__(self, directory: str, capacity: int = 8192, readonly: bool = False):
+        self.directory = directory
+        self.capacity = capacity
+        self.readonly = readonly
+        self.rings: Dict[Tuple[str, str], TickRing] = {}
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, exchange: str, symbol: str) -> str:
+        return os.path.join(
+            self.directory, _safe_name(exchange), f"{_safe_name(symbol)}.ring"
+        )
+
+    def ring(self, exchange: str, symbol: str) -> Optional[TickRing]:
+        key = (exchange, symbol)
+        ring = self.rings.get(key)
+        if ring is None:
+            path = self._path(exchange, symbol)
+            if self.readonly and not os.path.exists(path):
+                return None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            ring = self.rings[key] = TickRing(path, self.capacity, self.readonly)
+        return ring
+
+    def append(self, ticker: Ticker):
+        self.ring(ticker.exchange, ticker.symbol).append(ticker)
+
+    def append_many(self, tickers: List[Ticker]):
+        for ticker in tickers:
+            self.ring(ticker.exchange, ticker.symbol).append(ticker)
+
+    def window(
+        self, exchange: str, symbol: str, seconds: float, now: Optional[datetime] = None
+    ) -> Dict[str, np.ndarray]:
+        ring = self.ring(exchange, symbol)
+        if ring is None:
+            return {
+                name: np.empty(0, dtype=dtype) for name, dtype in RING_COLUMNS.items()
+            }
+        return ring.since((now or datetime.now()) - timedelta(seconds=seconds))
+
+    def spread(
+        self,
+        symbol: str,
+        buy_exchange: str,
+        sell_exchange: str,
+        seconds: float,
+        now: Optional[datetime] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        buy = self.window(buy_exchange, symbol, seconds, now)
+        sell = self.window(sell_exchange, symbol, seconds, now)
+        if not len(buy["timestamp"]) or not len(sell["timestamp"]):
+            return np.empty(0, dtype="datetime64[us]"), np.empty(0)
+
+        timestamps = np.union1d(buy["timestamp"], sell["timestamp"])
+        buy_idx = np.searchsorted(buy["timestamp"], timestamps, side="right") - 1
+        sell_idx = np.searchsorted(sell["timestamp"], timestamps, side="right") - 1
+        known = (buy_idx >= 0) & (sell_idx >= 0)
+
+        asks = buy["ask"][buy_idx[known]]
+        bids = sell["bid"][sell_idx[known]]
+        return timestamps[known], (bids - asks) / asks * 100
+
+    def flush(self):
+        for ring in self.rings.values():
+            ring.flush()
+
+    def close(self):
+        if not self.readonly:
+            self.flush()
+        self.rings = {}
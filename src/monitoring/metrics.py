@@ -1,42 +1,303 @@
-from typing import Dict, List
-from datetime import datetime, timedelta
-from collections import defaultdict
+import math
+import time
+import numpy as np
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from datetime import datetime
+from collections import Counter, defaultdict
+
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+FETCH_FIELDS = ("total", "successful")
+EVENT_FIELDS = ("opportunities", "executions")
+
+
+class LogHistogram:
+    def __init__(self, relative_error: float = 0.01):
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        index = math.ceil(math.log(value) / self.log_gamma) if value > 0 else None
+        self.buckets[index] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        if other.relative_error != self.relative_error:
+            raise ValueError("Cannot merge histograms with different precision")
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        seen = self.buckets.get(None, 0)
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(k for k in self.buckets if k is not None):
+            seen += self.buckets[index]
+            if rank < seen:
+                value = 2 * self.gamma**index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict:
+        summary = {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+        for q in quantiles:
+            summary[f"p{round(q * 100):02d}"] = self.quantile(q)
+        return summary
+
+
+class RollingCounters:
+    def __init__(
+        self,
+        fields: Tuple[str, ...],
+        bucket_seconds: float = 10.0,
+        slots: int = 360,
+        clock: Callable[[], float] = time.monotonic,
+        capacity: int = 16,
+        windows: Iterable[float] = (),
+    ):
+        self.fields = {name: i for i, name in enumerate(fields)}
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self.keys: Dict[Hashable, int] = {}
+        self.epochs = np.full(slots, -1, dtype=np.int64)
+        self.counts = np.zeros((capacity, slots, len(fields)), dtype=np.int64)
+        self.totals = np.zeros((capacity, len(fields)), dtype=np.int64)
+        self.spans = {
+            seconds: math.ceil(seconds / bucket_seconds) for seconds in windows
+        }
+        if any(span > slots for span in self.spans.values()):
+            raise ValueError("Window is longer than the bucket ring")
+        self.window_totals = {
+            seconds: np.zeros((capacity, len(fields)), dtype=np.int64)
+            for seconds in self.spans
+        }
+        self.current: List[List[int]] = []
+        self.epoch = -1
+
+    def _advance(self):
+        epoch = int(self.clock() // self.bucket_seconds)
+        if epoch == self.epoch:
+            return
+
+        closed = None
+        if self.current:
+            slot = self.epoch % len(self.epochs)
+            closed = np.array(self.current, dtype=np.int64)
+            self.counts[: len(closed), slot] = closed
+            self.totals[: len(closed)] += closed
+            self.epochs[slot] = self.epoch
+            self.current = [[0] * len(self.fields) for _ in self.current]
+
+        # Running window totals hold the closed buckets inside each window, so
+        # advancing adds the bucket just closed and subtracts the ones that left.
+        for seconds, span in self.spans.items():
+            totals = self.window_totals[seconds]
+            if epoch - span >= self.epoch:
+                totals[:] = 0
+                continue
+            if closed is not None:
+                totals[: len(closed)] += closed
+            for expired in range(self.epoch - span + 1, epoch - span + 1):
+                slot = expired % len(self.epochs)
+                if self.epochs[slot] == expired:
+                    totals -= self.counts[:, slot]
+        self.epoch = epoch
+
+    def _row(self, key: Hashable) -> int:
+        row = self.keys.get(key)
+        if row is not None:
+            return row
+
+        row = self.keys[key] = len(self.keys)
+        self.current.append([0] * len(self.fields))
+        if row >= len(self.counts):
+            self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+            self.totals = np.concatenate([self.totals, np.zeros_like(self.totals)])
+            self.window_totals = {
+                seconds: np.concatenate([totals, np.zeros_like(totals)])
+                for seconds, totals in self.window_totals.items()
+            }
+        return row
+
+    def add(self, key: Hashable, field: str, amount: int = 1):
+        self._advance()
+        self.current[self._row(key)][self.fields[field]] += amount
+
+    def _current(self) -> np.ndarray:
+        return np.array(self.current, dtype=np.int64).reshape(
+            len(self.keys), len(self.fields)
+        )
+
+    def window(self, seconds: float) -> np.ndarray:
+        self._advance()
+        rows = len(self.keys)
+        if seconds in self.window_totals:
+            return self.window_totals[seconds][:rows] + self._current()
+
+        oldest = self.epoch - math.ceil(seconds / self.bucket_seconds) + 1
+        live = (self.epochs >= oldest) & (self.epochs < self.epoch)
+        return self.counts[:rows][:, live].sum(axis=1) + self._current()
+
+    def total(self) -> np.ndarray:
+        self._advance()
+        return self.totals[: len(self.keys)] + self._current()
+
+    def as_dict(self, values: np.ndarray) -> Dict[str, int]:
+        return {name: int(values[i]) for name, i in self.fields.items()}
+
+
+class RollingHistogram:
+    def __init__(
+        self,
+        bucket_seconds: float = 10.0,
+        slots: int = 360,
+        relative_error: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.relative_error = relative_error
+        self.clock = clock
+        self.epochs: List[int] = [-1] * slots
+        self.histograms: List[Optional[LogHistogram]] = [None] * slots
+        self.cumulative = LogHistogram(relative_error)
+
+    def record(self, value: float):
+        epoch = int(self.clock() // self.bucket_seconds)
+        slot = epoch % len(self.epochs)
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            self.histograms[slot] = LogHistogram(self.relative_error)
+        self.histograms[slot].record(value)
+        self.cumulative.record(value)
+
+    def window(self, seconds: float) -> LogHistogram:
+        epoch = int(self.clock() // self.bucket_seconds)
+        oldest = epoch - math.ceil(seconds / self.bucket_seconds) + 1
+        merged = LogHistogram(self.relative_error)
+        for slot_epoch, histogram in zip(self.epochs, self.histograms):
+            if histogram is not None and oldest <= slot_epoch <= epoch:
+                merged.merge(histogram)
+        return merged
 
 
 class MetricsCollector:
-    def __init__(self):
-        self.metrics = defaultdict(list)
+    def __init__(
+        self,
+        bucket_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.slots = math.ceil(max(WINDOWS.values()) / bucket_seconds)
+        self.clock = clock
         self.start_time = datetime.now()
+        self.started = clock()
+        self.fetches = RollingCounters(
+            FETCH_FIELDS, bucket_seconds, self.slots, clock, windows=WINDOWS.values()
+        )
+        self.events = RollingCounters(
+            EVENT_FIELDS, bucket_seconds, self.slots, clock, windows=WINDOWS.values()
+        )
+        self.symbol_fetches: Dict[str, Dict[str, List[int]]] = defaultdict(dict)
+        self.latencies: Dict[str, RollingHistogram] = {}
+        self.cycles = RollingHistogram(self.bucket_seconds, self.slots, clock=clock)
 
     def record_ticker_fetch(self, exchange: str, symbol: str, success: bool):
-        self.metrics["ticker_fetches"].append(
-            {
-                "exchange": exchange,
-                "symbol": symbol,
-                "success": success,
-                "timestamp": datetime.now(),
-            }
-        )
+        counts = self.symbol_fetches[exchange].get(symbol)
+        if counts is None:
+            counts = self.symbol_fetches[exchange][symbol] = [0] * len(FETCH_FIELDS)
+        counts[0] += 1
+        self.fetches.add(exchange, "total")
+        if success:
+            counts[1] += 1
+            self.fetches.add(exchange, "successful")
+
+    def record_stream_error(self, exchange: str):
+        self.fetches.add(exchange, "total")
+
+    def record_fetch_latency(self, exchange: str, latency_seconds: float):
+        histogram = self.latencies.get(exchange)
+        if histogram is None:
+            histogram = self.latencies[exchange] = RollingHistogram(
+                self.bucket_seconds, self.slots, clock=self.clock
+            )
+        histogram.record(latency_seconds)
+
+    def record_cycle(self, seconds: float):
+        self.cycles.record(seconds)
 
     def record_opportunity(self, opportunity: Dict):
-        self.metrics["opportunities"].append(
-            {"opportunity": opportunity, "timestamp": datetime.now()}
-        )
+        self.events.add(None, "opportunities")
+
+    def record_opportunities(self, count: int):
+        self.events.add(None, "opportunities", count)
 
     def record_execution(self, execution_result: Dict):
-        self.metrics["executions"].append(
-            {"result": execution_result, "timestamp": datetime.now()}
-        )
+        self.events.add(None, "executions")
+
+    def _fetch_windows(self) -> Dict[str, np.ndarray]:
+        windows = {"total": self.fetches.total()}
+        for window, seconds in WINDOWS.items():
+            windows[window] = self.fetches.window(seconds)
+        return windows
+
+    def _latency(self, histograms: Iterable[RollingHistogram]) -> Dict[str, Dict]:
+        histograms = list(histograms)
+        summary = {}
+        for window, seconds in WINDOWS.items():
+            merged = LogHistogram()
+            for histogram in histograms:
+                merged.merge(histogram.window(seconds))
+            summary[window] = merged.summary()
+
+        merged = LogHistogram()
+        for histogram in histograms:
+            merged.merge(histogram.cumulative)
+        summary["total"] = merged.summary()
+        return summary
 
     def get_summary(self) -> Dict:
-        uptime = (datetime.now() - self.start_time).total_seconds()
+        uptime = self.clock() - self.started
+        fetches = {
+            name: self.fetches.as_dict(values.sum(axis=0))
+            for name, values in self._fetch_windows().items()
+        }
+        events = self.events.as_dict(self.events.total().sum(axis=0))
 
-        ticker_fetches = self.metrics.get("ticker_fetches", [])
-        opportunities = self.metrics.get("opportunities", [])
-        executions = self.metrics.get("executions", [])
+        total_fetches = fetches["total"]["total"]
+        successful_fetches = fetches["total"]["successful"]
 
-        successful_fetches = sum(1 for f in ticker_fetches if f["success"])
-        total_fetches = len(ticker_fetches)
+        windows = {}
+        for window, seconds in WINDOWS.items():
+            window_events = self.events.as_dict(self.events.window(seconds).sum(axis=0))
+            windows[window] = {
+                "ticker_fetches": fetches[window]["total"],
+                "successful_ticker_fetches": fetches[window]["successful"],
+                "opportunities_found": window_events["opportunities"],
+                "executions": window_events["executions"],
+            }
 
         return {
             "uptime_seconds": uptime,
@@ -45,25 +306,40 @@ class MetricsCollector:
             "fetch_success_rate": (
                 successful_fetches / total_fetches if total_fetches > 0 else 0
             ),
-            "total_opportunities_found": len(opportunities),
-            "total_executions": len(executions),
+            "total_opportunities_found": events["opportunities"],
+            "total_executions": events["executions"],
             "opportunities_per_minute": (
-                len(opportunities) / (uptime / 60) if uptime > 0 else 0
+                events["opportunities"] / (uptime / 60) if uptime > 0 else 0
             ),
+            "windows": windows,
+            "fetch_latency": self._latency(self.latencies.values()),
+            "cycle_time": self._latency([self.cycles]),
         }
 
     def get_exchange_statistics(self) -> Dict[str, Dict]:
-        ticker_fetches = self.metrics.get("ticker_fetches", [])
-        exchange_stats = defaultdict(lambda: {"total": 0, "successful": 0})
-
-        for fetch in ticker_fetches:
-            exchange = fetch["exchange"]
-            exchange_stats[exchange]["total"] += 1
-            if fetch["success"]:
-                exchange_stats[exchange]["successful"] += 1
+        windows = self._fetch_windows()
+        exchange_stats = {}
 
-        for exchange, stats in exchange_stats.items():
+        for exchange, row in self.fetches.keys.items():
+            total = self.fetches.as_dict(windows["total"][row])
+            stats = {
+                "total": total["total"],
+                "successful": total["successful"],
+                "windows": {
+                    window: self.fetches.as_dict(windows[window][row])
+                    for window in WINDOWS
+                },
+            }
             if stats["total"] > 0:
                 stats["success_rate"] = stats["successful"] / stats["total"]
+            if exchange in self.latencies:
+                stats["latency"] = self._latency([self.latencies[exchange]])
+            exchange_stats[exchange] = stats
 
-        return dict(exchange_stats)
+        return exchange_stats
+
+    def get_symbol_statistics(self, exchange: str) -> Dict[str, Dict[str, int]]:
+        return {
+            symbol: dict(zip(FETCH_FIELDS, counts))
+            for symbol, counts in self.symbol_fetches.get(exchange, {}).items()
+        }
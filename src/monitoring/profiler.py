@@ -0,0 +1,257 @@
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from src.monitoring.metrics import LogHistogram
+from src.monitoring.prometheus import EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    def __init__(self, interval_seconds: float = 0.005, max_depth: int = 128):
+        self.interval_seconds = interval_seconds
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.active = False
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            if self.active:
+                self.sample()
+
+    def sample(self):
+        frame = sys._current_frames().get(self._thread_id)
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(_frame_name(frame))
+            frame = frame.f_back
+        if stack:
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_seconds: float = 0.05):
+        self.interval_seconds = interval_seconds
+        self.histogram = LogHistogram()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(loop.time() - expected, 0.0)
+            self.histogram.record(lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+
+class ProfileSession:
+    def __init__(
+        self,
+        mode: str,
+        iterations: int,
+        sample_interval_seconds: float,
+        lag_interval_seconds: float,
+    ):
+        self.mode = mode
+        self.remaining = iterations
+        self.started_at = datetime.now()
+        self.cycle_times = LogHistogram()
+        self.iterations = 0
+        self.sampler = None
+        self.profile = None
+        if mode == "sampling":
+            self.sampler = SamplingProfiler(sample_interval_seconds)
+            self.sampler.start()
+        else:
+            self.profile = cProfile.Profile()
+        self.lag_monitor = LoopLagMonitor(lag_interval_seconds)
+        self.lag_monitor.start()
+
+    def resume(self):
+        if self.sampler:
+            self.sampler.active = True
+        else:
+            self.profile.enable()
+
+    def pause(self, elapsed: float):
+        if self.sampler:
+            self.sampler.active = False
+        else:
+            self.profile.disable()
+        self.cycle_times.record(elapsed)
+        self.iterations += 1
+        self.remaining -= 1
+
+    async def finish(self, output_dir: Path) -> List[Path]:
+        await self.lag_monitor.stop()
+        if self.sampler:
+            self.sampler.stop()
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        prefix = output_dir / f"profile-{self.started_at:%Y%m%d-%H%M%S}-{self.mode}"
+        written = []
+        if self.sampler:
+            path = prefix.with_suffix(".folded")
+            path.write_text(self.sampler.folded())
+            written.append(path)
+        else:
+            path = prefix.with_suffix(".prof")
+            self.profile.dump_stats(str(path))
+            written.append(path)
+
+        path = prefix.with_suffix(".json")
+        path.write_text(json.dumps(self.summary(), indent=2))
+        written.append(path)
+        return written
+
+    def summary(self) -> Dict:
+        summary = {
+            "mode": self.mode,
+            "started_at": self.started_at.isoformat(),
+            "iterations": self.iterations,
+            "cycle_seconds": self.cycle_times.summary(),
+            "event_loop_lag_seconds": self.lag_monitor.histogram.summary(),
+        }
+        if self.sampler:
+            summary["samples"] = self.sampler.samples
+        return summary
+
+
+class RuntimeProfiler:
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        mode: str = "sampling",
+        iterations: int = 10,
+        sample_interval_seconds: float = 0.005,
+        lag_interval_seconds: float = 0.05,
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+
+        self.output_dir = Path(output_dir)
+        self.mode = mode
+        self.iterations = iterations
+        self.sample_interval_seconds = sample_interval_seconds
+        self.lag_interval_seconds = lag_interval_seconds
+        self.requested = 0
+        self.session: Optional[ProfileSession] = None
+        self.written: List[Path] = []
+
+    def request(self, iterations: Optional[int] = None):
+        if self.session is None:
+            self.requested = iterations or self.iterations
+            logger.info(f"Profiling requested for the next {self.requested} iterations")
+
+    def install_signal_handler(self, signum: Optional[int] = None) -> bool:
+        signum = signum or getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, self.request)
+        except (NotImplementedError, RuntimeError, ValueError) as e:
+            logger.warning(f"Could not install profiling signal handler: {e}")
+            return False
+        return True
+
+    def start_iteration(self):
+        if self.session is None:
+            if not self.requested:
+                return
+            self.session = ProfileSession(
+                self.mode,
+                self.requested,
+                self.sample_interval_seconds,
+                self.lag_interval_seconds,
+            )
+            self.requested = 0
+        self.session.resume()
+
+    async def end_iteration(self, elapsed: float) -> Optional[Dict]:
+        if self.session is None:
+            return None
+
+        self.session.pause(elapsed)
+        if self.session.remaining > 0:
+            return None
+
+        session, self.session = self.session, None
+        summary = session.summary()
+        try:
+            self.written = await session.finish(self.output_dir)
+            logger.info(
+                f"Profile of {session.iterations} iterations written to "
+                f"{', '.join(str(p) for p in self.written)}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to write profile: {e}")
+        return summary
+
+    async def stop(self):
+        if self.session is None:
+            return
+
+        session, self.session = self.session, None
+        if session.sampler:
+            session.sampler.active = False
+        else:
+            session.profile.disable()
+        try:
+            self.written = await session.finish(self.output_dir)
+        except Exception as e:
+            logger.error(f"Failed to write profile: {e}")
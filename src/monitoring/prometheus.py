@@ -0,0 +1,218 @@
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+OVERFLOW_LABEL = "other"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], **extra) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_series: int = 100,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.max_series = max_series
+        self.series: Dict[Tuple[str, ...], List] = {}
+        self.overflowed = 0
+
+    def _series(self, labels: Dict[str, str]) -> List:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        series = self.series.get(key)
+        if series is not None:
+            return series
+
+        if len(self.series) >= self.max_series:
+            self.overflowed += 1
+            key = (OVERFLOW_LABEL,) * len(self.label_names)
+            series = self.series.get(key)
+            if series is not None:
+                return series
+
+        series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        return series
+
+    def observe(self, value: float, **labels: str):
+        series = self._series(labels)
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, le=_format_value(bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self, max_series: int = 100):
+        self.max_series = max_series
+        self.histograms: Dict[str, Histogram] = {}
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(
+                name, documentation, label_names, buckets, self.max_series
+            )
+        return histogram
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self.histograms.values():
+            lines.extend(histogram.render())
+
+        lines.append(
+            "# HELP arbitrage_metric_series_overflow_total "
+            "Observations folded into the overflow series by the cardinality cap"
+        )
+        lines.append("# TYPE arbitrage_metric_series_overflow_total counter")
+        for histogram in self.histograms.values():
+            lines.append(
+                "arbitrage_metric_series_overflow_total"
+                f'{{metric="{histogram.name}"}} {histogram.overflowed}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+FETCH_LATENCY = REGISTRY.histogram(
+    "arbitrage_fetch_latency_seconds", "Ticker fetch latency", ["exchange"]
+)
+ANALYZER_LATENCY = REGISTRY.histogram(
+    "arbitrage_analyzer_latency_seconds", "Opportunity analysis time", ["analyzer"]
+)
+PERSISTENCE_LATENCY = REGISTRY.histogram(
+    "arbitrage_persistence_latency_seconds", "Persistence batch write time", ["sink"]
+)
+AI_LATENCY = REGISTRY.histogram(
+    "arbitrage_ai_latency_seconds",
+    "OpenAI analysis call latency",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+EXECUTOR_LATENCY = REGISTRY.histogram(
+    "arbitrage_executor_latency_seconds", "Opportunity execution latency", ["mode"]
+)
+TICK_TO_DECISION = REGISTRY.histogram(
+    "arbitrage_tick_to_decision_seconds",
+    "Age of the oldest tick behind an execution decision",
+    ["exchange"],
+)
+CYCLE_LATENCY = REGISTRY.histogram(
+    "arbitrage_cycle_seconds", "Main loop iteration time", ["mode"]
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "arbitrage_event_loop_lag_seconds",
+    "Delay between scheduled and actual event loop callbacks while profiling",
+)
+
+
+class MetricsServer:
+    def __init__(
+        self,
+        registry: Registry = REGISTRY,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/metrics", self._handle_metrics)
+        self.app.router.add_get("/health", self._handle_health)
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{port}"
+        logger.info(f"Serving metrics on {self.url}/metrics")
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
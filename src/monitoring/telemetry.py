@@ -1,5 +1,10 @@
 import logging
-from typing import Dict, Any
+import queue
+import time
+from collections import Counter
+from contextlib import nullcontext
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional, Tuple
 from opentelemetry import trace, metrics
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -9,6 +14,7 @@ from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExport
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from azure.monitor.opentelemetry import configure_azure_monitor
 from opencensus.ext.azure.log_exporter import AzureLogHandler
+from src.monitoring.metrics import LogHistogram
 
 logger = logging.getLogger(__name__)
 tracer = None
@@ -16,6 +22,30 @@ meter = None
 event_counter = None
 metric_recorder = None
 
+mode = "verbose"
+sample_rates: Dict[str, float] = {}
+default_metric_sample_rate = 0.0
+default_event_sample_rate = 1.0
+flush_interval_seconds = 60.0
+next_flush = 0.0
+sample_every: Dict[str, int] = {}
+call_counts: Counter = Counter()
+event_counts: Counter = Counter()
+metric_aggregates: Dict[Tuple, LogHistogram] = {}
+log_listener: Optional[QueueListener] = None
+
+
+class _DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def init_telemetry(app_insights_connection_string: str):
     global tracer, meter, event_counter, metric_recorder
@@ -44,7 +74,140 @@ def init_telemetry(app_insights_connection_string: str):
     logger.addHandler(AzureLogHandler(connection_string=app_insights_connection_string))
 
 
+def configure_telemetry(
+    telemetry_mode: str = "verbose",
+    rates: Optional[Dict[str, float]] = None,
+    metric_sample_rate: float = 0.0,
+    event_sample_rate: float = 1.0,
+    flush_interval: float = 60.0,
+    async_logging: bool = False,
+    queue_size: int = 10000,
+):
+    global mode, sample_rates, default_metric_sample_rate, default_event_sample_rate
+    global flush_interval_seconds, next_flush
+
+    if telemetry_mode not in ("verbose", "aggregate"):
+        raise ValueError(f"Unknown telemetry mode: {telemetry_mode}")
+
+    flush_telemetry()
+    mode = telemetry_mode
+    sample_rates = dict(rates or {})
+    default_metric_sample_rate = metric_sample_rate
+    default_event_sample_rate = event_sample_rate
+    flush_interval_seconds = flush_interval
+    next_flush = time.monotonic() + flush_interval
+    sample_every.clear()
+    call_counts.clear()
+
+    if async_logging:
+        start_log_shipper(queue_size)
+
+
+def start_log_shipper(queue_size: int = 10000) -> QueueListener:
+    global log_listener
+
+    if log_listener is not None:
+        return log_listener
+
+    handlers = list(logger.handlers)
+    if logger.propagate:
+        handlers += logging.getLogger().handlers
+    for handler in logger.handlers:
+        logger.removeHandler(handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    logger.addHandler(_DroppingQueueHandler(log_queue))
+    logger.propagate = False
+
+    log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+    return log_listener
+
+
+def stop_telemetry():
+    global log_listener
+
+    flush_telemetry()
+    if log_listener is None:
+        return
+
+    log_listener.stop()
+    for handler in list(logger.handlers):
+        if isinstance(handler, _DroppingQueueHandler):
+            logger.removeHandler(handler)
+    for handler in log_listener.handlers:
+        if handler not in logging.getLogger().handlers:
+            logger.addHandler(handler)
+    logger.propagate = True
+    log_listener = None
+
+
+def _sampled(name: str, default_rate: float) -> bool:
+    every = sample_every.get(name)
+    if every is None:
+        rate = sample_rates.get(name, default_rate)
+        every = sample_every[name] = round(1 / rate) if rate > 0 else 0
+
+    if not every:
+        return False
+    call_counts[name] += 1
+    return call_counts[name] % every == 1 % every
+
+
+def _maybe_flush():
+    if time.monotonic() >= next_flush:
+        flush_telemetry()
+
+
+def flush_telemetry():
+    global next_flush
+
+    next_flush = time.monotonic() + flush_interval_seconds
+    events, metrics_snapshot = dict(event_counts), dict(metric_aggregates)
+    event_counts.clear()
+    metric_aggregates.clear()
+
+    for event_name, count in events.items():
+        if event_counter:
+            event_counter.add(count, {"event_name": event_name})
+
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    for event_name, count in events.items():
+        logger.info(
+            "Event summary: %s count=%d",
+            event_name,
+            count,
+            extra={"custom_dimensions": {"event_name": event_name, "count": count}},
+        )
+    for (metric_name, labels), histogram in metrics_snapshot.items():
+        summary = histogram.summary((0.5, 0.99))
+        summary.update(sum=histogram.sum, min=histogram.min)
+        logger.info(
+            "Metric summary: %s count=%d mean=%s p50=%s p99=%s max=%s",
+            metric_name,
+            summary["count"],
+            summary["mean"],
+            summary["p50"],
+            summary["p99"],
+            summary["max"],
+            extra={"custom_dimensions": {**dict(labels), **summary}},
+        )
+
+
 def track_event(event_name: str, properties: Dict[str, Any] = None):
+    if mode == "aggregate":
+        event_counts[event_name] += 1
+        if _sampled(event_name, default_event_sample_rate):
+            logger.info(
+                "Event: %s",
+                event_name,
+                extra={"custom_dimensions": properties or {}},
+            )
+        _maybe_flush()
+        return
+
     if event_counter:
         event_counter.add(1, {"event_name": event_name})
 
@@ -52,6 +215,32 @@ def track_event(event_name: str, properties: Dict[str, Any] = None):
 
 
 def track_metric(metric_name: str, value: float, properties: Dict[str, Any] = None):
+    if mode == "aggregate":
+        key = (
+            metric_name,
+            tuple(sorted((k, str(v)) for k, v in properties.items()))
+            if properties
+            else (),
+        )
+        histogram = metric_aggregates.get(key)
+        if histogram is None:
+            histogram = metric_aggregates[key] = LogHistogram()
+        histogram.record(value)
+        # The OTel histogram aggregates in-process, so it sees every value;
+        # sampling only thins out the per-value log lines.
+        if metric_recorder:
+            metric_recorder.record(value, {"metric_name": metric_name})
+
+        if _sampled(metric_name, default_metric_sample_rate):
+            logger.info(
+                "Metric: %s=%s",
+                metric_name,
+                value,
+                extra={"custom_dimensions": properties or {}},
+            )
+        _maybe_flush()
+        return
+
     if metric_recorder:
         metric_recorder.record(value, {"metric_name": metric_name})
 
@@ -63,4 +252,4 @@ def track_metric(metric_name: str, value: float, properties: Dict[str, Any] = No
 def create_span(span_name: str):
     if tracer:
         return tracer.start_as_current_span(span_name)
-    return None
+    return nullcontext()
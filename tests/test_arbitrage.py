@@ -1,8 +1,18 @@
+import json
+import random
 import pytest
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 from src.arbitrage.analyzer import ArbitrageAnalyzer, ArbitrageOpportunity
+from src.arbitrage.backtest import BacktestEngine, load_events
 from src.arbitrage.executor import ArbitrageExecutor
-from src.exchanges.base import Ticker
+from src.arbitrage.incremental import IncrementalArbitrageAnalyzer
+from src.arbitrage.depth import executable_size
+from src.arbitrage.parallel import ParallelArbitrageAnalyzer
+from src.arbitrage.triangular import TriangularArbitrageAnalyzer
+from src.config import settings
+from src.exchanges.base import BaseExchange, OrderBook, Ticker
+from src.marketdata.recorder import TickRecorder
 
 
 @pytest.fixture
@@ -75,3 +85,425 @@ async def test_executor_statistics(executor):
     assert stats["total_trades"] == 1
     assert stats["total_profit_usd"] == 200.0
     assert stats["avg_profit_percent"] == 2.0
+
+
+def test_orderbook_opportunity_uses_depth_vwap():
+    analyzer = ArbitrageAnalyzer(threshold_percent=0.5, max_position_size=300)
+    buy_book = OrderBook("binance", "BTC/USDT", asks=[(100.0, 1.0), (102.0, 5.0)])
+    sell_book = OrderBook("kraken", "BTC/USDT", bids=[(104.0, 1.0), (103.0, 5.0)])
+
+    opportunity = analyzer.calculate_orderbook_opportunity(buy_book, sell_book)
+
+    assert opportunity.buy_exchange == "binance"
+    assert opportunity.volume == pytest.approx(1.0 + 200.0 / 102.0)
+    assert opportunity.buy_price == pytest.approx(300.0 / opportunity.volume)
+    assert opportunity.profit_usd == pytest.approx(
+        104.0 + 103.0 * (opportunity.volume - 1.0) - 300.0
+    )
+
+
+def _random_tickers(seed, symbols=50, exchanges=6):
+    rng = random.Random(seed)
+    tickers = []
+    for s in range(symbols):
+        mid = rng.uniform(1, 1000)
+        for e in range(exchanges):
+            price = mid * (1 + rng.gauss(0, 0.005))
+            tickers.append(
+                Ticker(
+                    f"exchange{e}",
+                    f"COIN{s}/USDT",
+                    price * 0.9999,
+                    price * 1.0001,
+                    price,
+                    rng.uniform(0, 50),
+                    datetime.now(),
+                )
+            )
+    return tickers
+
+
+def _as_rows(opportunities):
+    return sorted(
+        (o.symbol, o.buy_exchange, o.sell_exchange, o.profit_percent, o.profit_usd)
+        for o in opportunities
+    )
+
+
+def test_vectorized_engine_matches_python_engine():
+    tickers = _random_tickers(seed=7)
+    python_engine = ArbitrageAnalyzer(0.5, 10000, engine="python")
+    numpy_engine = ArbitrageAnalyzer(0.5, 10000, engine="numpy")
+
+    expected = python_engine.analyze_opportunities(tickers)
+    actual = numpy_engine.analyze_opportunities(tickers)
+
+    assert len(expected) > 0
+    assert _as_rows(actual) == _as_rows(expected)
+    assert [o.profit_percent for o in actual] == sorted(
+        (o.profit_percent for o in actual), reverse=True
+    )
+
+
+def test_incremental_analyzer_emits_change_events():
+    analyzer = IncrementalArbitrageAnalyzer(threshold_percent=0.5)
+    events = []
+    analyzer.add_listener(events.append)
+
+    analyzer.update(Ticker("binance", "BTC/USDT", 99.0, 100.0, 100.0, 10.0, None))
+    analyzer.update(Ticker("kraken", "BTC/USDT", 101.0, 102.0, 101.5, 10.0, None))
+    assert [(e.kind, e.opportunity.sell_exchange) for e in events] == [
+        ("opened", "kraken")
+    ]
+
+    analyzer.update(Ticker("kraken", "BTC/USDT", 102.0, 103.0, 102.5, 10.0, None))
+    assert events[-1].kind == "updated"
+    assert events[-1].opportunity.sell_price == 102.0
+
+    analyzer.update(Ticker("kraken", "BTC/USDT", 100.1, 100.2, 100.1, 10.0, None))
+    assert events[-1].kind == "closed"
+    assert analyzer.current_opportunities() == []
+
+
+def test_incremental_analyzer_drops_unpolled_and_stale_quotes():
+    analyzer = IncrementalArbitrageAnalyzer(0.5, max_quote_age_seconds=30)
+    now = datetime.now()
+    binance = Ticker("binance", "BTC/USDT", 99.0, 100.0, 100.0, 10.0, now)
+    kraken = Ticker("kraken", "BTC/USDT", 101.0, 102.0, 101.5, 10.0, now)
+    kraken_eth = Ticker("kraken", "ETH/USDT", 10.0, 10.1, 10.0, 10.0, now)
+
+    assert len(analyzer.analyze_opportunities([binance, kraken, kraken_eth])) == 1
+
+    assert analyzer.analyze_opportunities([binance, kraken_eth]) == []
+    assert "kraken" not in analyzer.tickers["BTC/USDT"]
+    assert analyzer.asks["BTC/USDT"] == [(100.0, "binance")]
+
+    analyzer.analyze_opportunities([binance, kraken])
+    events = analyzer.expire(now + timedelta(seconds=31))
+    assert [e.kind for e in events] == ["closed"]
+    assert analyzer.tickers == {}
+    assert analyzer.asks == analyzer.bids == analyzer.opportunities == {}
+
+    stale = Ticker(
+        "kraken", "BTC/USDT", 101.0, 102.0, 101.5, 10.0, now - timedelta(minutes=5)
+    )
+    assert analyzer.update(stale) == []
+    assert analyzer.current_opportunities() == []
+
+
+def test_incremental_analyzer_matches_batch_analyzer():
+    tickers = _random_tickers(seed=11)
+    batch = ArbitrageAnalyzer(0.5, 10000, engine="python")
+    incremental = IncrementalArbitrageAnalyzer(0.5, 10000)
+
+    incremental.analyze_opportunities(_random_tickers(seed=3))
+    actual = incremental.analyze_opportunities(tickers)
+
+    assert _as_rows(actual) == _as_rows(batch.analyze_opportunities(tickers))
+
+
+def test_top_opportunities_materializes_only_requested_rows():
+    tickers = _random_tickers(seed=5)
+    analyzer = ArbitrageAnalyzer(0.5, 10000, engine="numpy")
+    everything = analyzer.analyze_opportunities(tickers)
+
+    top = analyzer.top_opportunities(tickers, limit=5)
+
+    assert top.total == len(everything)
+    assert len(top) == 5
+    assert top._cache == {}
+    assert [o.profit_percent for o in top[:2]] == [
+        o.profit_percent for o in everything[:2]
+    ]
+    assert sorted(top._cache) == [0, 1]
+    assert [o.profit_percent for o in top] == [o.profit_percent for o in everything[:5]]
+
+    records = top.records()
+    assert len(records) == len(everything) > 5
+    assert sorted(
+        (r["symbol"], r["buy_exchange"], r["sell_exchange"], r["profit_percent"])
+        for r in records
+    ) == sorted(
+        (o.symbol, o.buy_exchange, o.sell_exchange, o.profit_percent)
+        for o in everything
+    )
+
+
+def test_numpy_engine_reuses_price_matrix_between_cycles():
+    tickers = _random_tickers(seed=7)
+    analyzer = ArbitrageAnalyzer(0.5, 10000, engine="numpy")
+
+    def fresh(cycle):
+        return _as_rows(ArbitrageAnalyzer(0.5, 10000).analyze_opportunities(cycle))
+
+    assert _as_rows(analyzer.analyze_opportunities(tickers)) == fresh(tickers)
+    matrix = analyzer.matrix
+
+    partial = [t for t in tickers if t.exchange != "exchange0"]
+    assert _as_rows(analyzer.analyze_opportunities(partial)) == fresh(partial)
+    assert analyzer.matrix is matrix
+
+    grown = partial + _random_tickers(seed=8, exchanges=7)[-7:]
+    assert _as_rows(analyzer.analyze_opportunities(grown)) == fresh(grown)
+    assert analyzer.matrix is not matrix
+    assert analyzer.matrix.exchanges[: len(matrix.exchanges)] == matrix.exchanges
+
+
+def test_top_opportunities_python_engine():
+    tickers = _random_tickers(seed=5)
+    analyzer = ArbitrageAnalyzer(0.5, 10000, engine="python")
+
+    top = analyzer.top_opportunities(tickers, limit=3)
+
+    assert top.total == len(analyzer.analyze_opportunities(tickers))
+    assert top[0].profit_percent == max(o.profit_percent for o in top)
+    assert len(top.records()) == top.total
+
+
+def test_executable_size_stops_where_marginal_profit_ends():
+    buy_book = OrderBook("binance", "BTC/USDT", asks=[(100.0, 1.0), (103.0, 5.0)])
+    sell_book = OrderBook("kraken", "BTC/USDT", bids=[(104.0, 2.0), (102.0, 5.0)])
+
+    amount, cost, proceeds = executable_size(buy_book, sell_book, 1_000_000)
+
+    assert amount == 2.0
+    assert cost == 203.0
+    assert proceeds == 208.0
+
+
+class _StaticBookExchange(BaseExchange):
+    def __init__(self, name, book):
+        super().__init__("", "", name)
+        self.book = book
+        self.requests = []
+
+    async def get_ticker(self, symbol):
+        return None
+
+    async def get_tickers(self, symbols):
+        return []
+
+    async def get_orderbook(self, symbol, limit=10):
+        self.requests.append(symbol)
+        return self.book
+
+    async def get_balance(self):
+        return {}
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_refine_with_depth_fetches_books_only_for_candidates():
+    analyzer = ArbitrageAnalyzer(threshold_percent=0.5, max_position_size=10000)
+    binance = _StaticBookExchange(
+        "binance", OrderBook("binance", "BTC/USDT", asks=[(100.0, 1.0)])
+    )
+    kraken = _StaticBookExchange(
+        "kraken", OrderBook("kraken", "BTC/USDT", bids=[(102.0, 0.5)])
+    )
+    idle = _StaticBookExchange("bybit", OrderBook("bybit", "BTC/USDT"))
+    candidate = ArbitrageOpportunity(
+        "BTC/USDT", "binance", "kraken", 100.0, 102.0, 2.0, 200.0, 100.0, None
+    )
+
+    refined = await analyzer.refine_with_depth(
+        [candidate, candidate], [binance, kraken, idle]
+    )
+
+    assert binance.requests == ["BTC/USDT"]
+    assert kraken.requests == ["BTC/USDT"]
+    assert idle.requests == []
+    assert refined[0].volume == 0.5
+    assert refined[0].profit_usd == pytest.approx(1.0)
+
+
+def test_triangular_analyzer_finds_and_drops_cycle():
+    analyzer = TriangularArbitrageAnalyzer(threshold_percent=0.1, fee_percent=0.1)
+    tickers = [
+        Ticker("binance", "BTC/USDT", 99.9, 100.0, 100.0, 1.0, datetime.now()),
+        Ticker("binance", "ETH/BTC", 0.0499, 0.05, 0.05, 1.0, datetime.now()),
+        Ticker("binance", "ETH/USDT", 5.2, 5.21, 5.2, 1.0, datetime.now()),
+    ]
+
+    cycles = analyzer.analyze_opportunities(tickers)
+
+    assert len(cycles) == 1
+    assert cycles[0].path == ["USDT", "BTC", "ETH", "USDT"]
+    assert [leg[2] for leg in cycles[0].legs] == ["buy", "buy", "sell"]
+    assert cycles[0].profit_percent == pytest.approx(
+        (1 / 100.0 / 0.05 * 5.2 * 0.999**3 - 1) * 100
+    )
+
+    repriced = Ticker("binance", "ETH/USDT", 5.0, 5.01, 5.0, 1.0, datetime.now())
+    assert analyzer.analyze_opportunities([repriced]) == []
+
+
+def test_triangular_analyzer_incremental_updates_match_fresh_graph():
+    rng = random.Random(3)
+    values = {f"C{i}": rng.uniform(0.01, 1000) for i in range(60)}
+    values.update({"USDT": 1.0, "BTC": 50000.0})
+    pairs = [(c, q) for c in list(values)[:60] for q in ("USDT", "BTC")]
+    latest = {}
+
+    def tick(sample, skew=1.0):
+        tickers = []
+        for base, quote in sample:
+            price = values[base] / values[quote] * (1 + rng.gauss(0, 0.0002))
+            price *= skew if (base, quote) == sample[0] else 1.0
+            latest[(base, quote)] = Ticker(
+                "binance", f"{base}/{quote}", price, price * 1.001, price, 1.0, None
+            )
+            tickers.append(latest[(base, quote)])
+        return tickers
+
+    incremental = TriangularArbitrageAnalyzer(threshold_percent=0.0)
+    incremental.analyze_opportunities(tick(pairs))
+
+    for round_number in range(12):
+        skew = 1.02 if round_number % 4 == 3 else 1.0
+        found = incremental.analyze_opportunities(tick(rng.sample(pairs, 20), skew))
+        fresh = TriangularArbitrageAnalyzer(threshold_percent=0.0)
+
+        assert bool(found) == bool(fresh.analyze_opportunities(list(latest.values())))
+
+
+def test_parallel_analyzer_matches_single_process_scan():
+    tickers = _random_tickers(seed=11, symbols=120)
+    expected = ArbitrageAnalyzer(threshold_percent=0.5).analyze_opportunities(tickers)
+
+    analyzer = ParallelArbitrageAnalyzer(
+        threshold_percent=0.5, workers=3, min_shard_size=16
+    )
+    try:
+        actual = analyzer.analyze_opportunities(tickers)
+        assert _as_rows(actual) == _as_rows(expected)
+
+        grown = tickers + _random_tickers(seed=12, symbols=10, exchanges=7)[-10:]
+        top = analyzer.top_opportunities(grown, limit=5)
+        baseline = ArbitrageAnalyzer(threshold_percent=0.5).top_opportunities(
+            grown, limit=5
+        )
+        assert top.total == baseline.total
+        assert _as_rows(top) == _as_rows(baseline)
+    finally:
+        analyzer.close()
+
+
+def _replay_tickers(start, hours):
+    tickers = []
+    for second in range(0, hours * 3600, 5):
+        timestamp = start + timedelta(seconds=second)
+        skew = 1.01 if second % 600 == 300 else 1.0
+        tickers.append(
+            Ticker("binance", "BTC/USDT", 99.9, 100.0, 100.0, 10.0, timestamp)
+        )
+        tickers.append(
+            Ticker("kraken", "BTC/USDT", 100.0 * skew, 100.1, 100.0, 10.0, timestamp)
+        )
+    return tickers
+
+
+async def test_backtest_replays_with_virtual_clock():
+    start = datetime(2024, 1, 1)
+    tickers = _replay_tickers(start, hours=24)
+    engine = BacktestEngine(
+        ArbitrageAnalyzer(threshold_percent=0.5, max_position_size=1000),
+        interval_seconds=10,
+        max_quote_age_seconds=5,
+    )
+
+    report = await engine.run(tickers)
+
+    assert report.events == len(tickers)
+    assert report.cycles == 24 * 360
+    assert report.trades == report.opportunities == 144
+    assert report.pnl_usd == pytest.approx(144 * 10.0)
+    assert report.end == tickers[-1].timestamp
+    assert report.wall_seconds < 30
+    assert engine.opportunities[0].timestamp == start + timedelta(seconds=300)
+
+    rerun = await BacktestEngine(
+        ArbitrageAnalyzer(threshold_percent=0.5, max_position_size=1000),
+        interval_seconds=10,
+        max_quote_age_seconds=5,
+    ).run(tickers)
+    assert rerun.pnl_usd == report.pnl_usd
+
+
+async def test_backtest_loads_recorded_segments_and_order_books(tmp_path):
+    start = datetime(2024, 1, 1)
+    recorder = TickRecorder()
+    recorder.record_many(
+        [
+            Ticker("binance", "BTC/USDT", 99.9, 100.0, 100.0, 10.0, start),
+            Ticker("kraken", "BTC/USDT", 101.0, 101.1, 101.0, 10.0, start),
+        ]
+    )
+    [segment] = recorder.take_segments(force=True)
+    (tmp_path / "ticks.npz").write_bytes(segment.encode())
+    (tmp_path / "books.json").write_text(
+        json.dumps(
+            [
+                {
+                    "exchange": exchange,
+                    "symbol": "BTC/USDT",
+                    "bids": [[bid, 1.0]],
+                    "asks": [[ask, 1.0]],
+                    "timestamp": start.isoformat(),
+                }
+                for exchange, bid, ask in (
+                    ("binance", 99.9, 100.0),
+                    ("kraken", 101.0, 101.1),
+                )
+            ]
+        )
+    )
+
+    events = sorted(load_events([str(tmp_path)]), key=lambda e: e.timestamp)
+    assert sum(isinstance(e, OrderBook) for e in events) == 2
+    assert sum(isinstance(e, Ticker) for e in events) == 2
+
+    engine = BacktestEngine(
+        ArbitrageAnalyzer(threshold_percent=0.5, max_position_size=1000),
+        interval_seconds=60,
+    )
+    report = await engine.run(events)
+
+    assert report.trades == 1
+    assert engine.opportunities[0].volume == pytest.approx(1.0)
+    assert report.pnl_usd == pytest.approx(1.0)
+
+
+async def test_backtest_expires_stale_quotes_and_books_across_gaps():
+    start = datetime(2024, 1, 1)
+    quotes = [
+        Ticker("binance", "BTC/USDT", 99.9, 100.0, 100.0, 10.0, start),
+        Ticker("kraken", "BTC/USDT", 101.0, 101.1, 101.0, 10.0, start),
+    ]
+    books = [
+        OrderBook(exchange, "BTC/USDT", [[bid, 1.0]], [[ask, 1.0]], start)
+        for exchange, bid, ask in (("binance", 99.9, 100.0), ("kraken", 101.0, 101.1))
+    ]
+    resumed = start + timedelta(minutes=10)
+    late = Ticker("binance", "ETH/USDT", 10.0, 10.01, 10.0, 1.0, resumed)
+
+    report = await BacktestEngine(
+        ArbitrageAnalyzer(threshold_percent=0.5, max_position_size=1000),
+        interval_seconds=10,
+    ).run(quotes + [late])
+    assert report.cycles == 60
+    assert report.trades == settings.max_quote_age_seconds // 10
+
+    engine = BacktestEngine(
+        ArbitrageAnalyzer(threshold_percent=0.5, max_position_size=1000),
+        interval_seconds=10,
+    )
+    engine.clock.now = resumed
+    engine.books = {(b.exchange, b.symbol): b for b in books}
+    engine.tickers = {
+        (t.exchange, t.symbol): replace(t, timestamp=resumed) for t in quotes
+    }
+    await engine._cycle()
+    assert engine.opportunities == []
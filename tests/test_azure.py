@@ -0,0 +1,726 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.azure import sql
+from src.azure.archive import ColumnarArchiveWriter, decode_columns
+from src.azure.datalake import DataLakeManager
+from src.azure.fake import FakeAzureStorageServer
+from src.azure.migrate import migrate_table
+from src.azure.pipeline import PersistencePipeline
+from src.azure.sql import MARKET_DATA_COLUMNS, OPPORTUNITY_COLUMNS
+from src.azure.storage import StorageManager
+from src.azure.transport import SharedTransport
+from src.arbitrage.analyzer import RankedOpportunities
+from src.config import settings
+from src.main import ArbitrageBot
+from src.exchanges.base import Ticker
+from src.marketdata.recorder import TickRecorder, TickSegment
+
+
+async def test_persistence_pipeline_batches_by_size_and_interval():
+    batches = []
+
+    async def handler(batch):
+        batches.append(list(batch))
+
+    pipeline = PersistencePipeline(flush_size=3, flush_interval_seconds=0.05)
+    pipeline.add_sink("blob", handler)
+    await pipeline.start()
+
+    assert pipeline.submit("blob", [1, 2, 3, 4]) == 4
+    await asyncio.sleep(0.1)
+    assert batches == [[1, 2, 3], [4]]
+
+    pipeline.submit("blob", [5])
+    await pipeline.stop()
+
+    assert batches[-1] == [5]
+    assert pipeline.stats()["blob"]["written"] == 5
+    assert pipeline.stats()["blob"]["batches"] == 3
+
+
+async def test_persistence_pipeline_drops_and_drains_without_blocking():
+    release = asyncio.Event()
+    written = []
+
+    async def slow_handler(batch):
+        await release.wait()
+        written.extend(batch)
+
+    async def failing_handler(batch):
+        raise RuntimeError("storage unavailable")
+
+    pipeline = PersistencePipeline(
+        max_queue_size=2, flush_size=10, flush_interval_seconds=0.01
+    )
+    pipeline.add_sink("sql", slow_handler)
+    pipeline.add_sink("table", failing_handler)
+    await pipeline.start()
+
+    pipeline.submit("sql", ["a"])
+    await asyncio.sleep(0.05)
+    pipeline.submit("sql", ["b", "c", "d"])
+    pipeline.submit("table", ["x"])
+    pipeline.submit("missing", ["ignored"])
+
+    stats = pipeline.stats()
+    assert stats["sql"]["queued"] == 2
+    assert stats["sql"]["dropped"] == 1
+
+    release.set()
+    await pipeline.stop(timeout=1.0)
+
+    assert written == ["a", "c", "d"]
+    assert pipeline.stats()["table"]["failed"] == 1
+
+
+def test_persistence_pipeline_rejects_unknown_drop_policy():
+    with pytest.raises(ValueError):
+        PersistencePipeline(drop_policy="block")
+
+
+class _FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        self.connection.statements.append((sql, list(params)))
+        if "OUTPUT" not in sql:
+            return
+        ordinals = params[:: len(OPPORTUNITY_COLUMNS) + 1]
+        start = self.connection.next_id - ordinals[0]
+        self.connection.next_id += len(ordinals)
+        self.rows = [(ordinal, start + ordinal) for ordinal in reversed(ordinals)]
+
+    def fetchall(self):
+        return self.rows
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.next_id = 1
+        self.commits = 0
+        self.closed = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+async def test_sql_manager_bulk_inserts_through_pooled_connection(monkeypatch):
+    connections = []
+
+    def connect(self):
+        connections.append(_FakeConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(sql, "PYODBC_AVAILABLE", True)
+    monkeypatch.setattr(sql.SQLManager, "get_connection", connect)
+    manager = sql.SQLManager("Driver=fake", pool_size=2)
+
+    opportunity = {
+        "symbol": "BTC/USDT",
+        "buy_exchange": "binance",
+        "sell_exchange": "kraken",
+        "buy_price": 100.0,
+        "sell_price": 101.0,
+        "profit_percent": 1.0,
+        "profit_usd": 10.0,
+        "volume": 0.1,
+        "timestamp": datetime(2024, 1, 1),
+    }
+
+    ids = await manager.save_opportunities([opportunity] * 450)
+    assert ids == list(range(1, 451))
+    assert await manager.save_opportunity(opportunity) == 451
+    assert await manager.save_opportunities([]) == []
+
+    assert len(connections) == 1
+    statements = connections[0].statements
+    assert [len(params) for _, params in statements] == [2000, 2000, 500, 10]
+    assert [params[0] for _, params in statements] == [0, 200, 400, 0]
+    assert all(
+        statement.endswith("OUTPUT source.ordinal, INSERTED.id;")
+        for statement, _ in statements
+    )
+    assert connections[0].commits == 2
+
+    manager.close()
+    assert connections[0].closed
+
+
+async def test_sql_write_failures_are_counted_by_the_pipeline(monkeypatch):
+    class _BrokenCursor(_FakeCursor):
+        def execute(self, sql, params=()):
+            raise RuntimeError("deadlock victim")
+
+    connection = _FakeConnection()
+    connection.cursor = lambda: _BrokenCursor(connection)
+    monkeypatch.setattr(sql, "PYODBC_AVAILABLE", True)
+    monkeypatch.setattr(sql.SQLManager, "get_connection", lambda self: connection)
+    manager = sql.SQLManager("Driver=fake")
+
+    pipeline = PersistencePipeline(flush_size=10, flush_interval_seconds=0.01)
+    pipeline.add_sink("sql", manager.save_opportunities)
+    pipeline.add_sink("market_data_sql", manager.save_market_data)
+    await pipeline.start()
+    pipeline.submit("sql", [{column: 0 for column in OPPORTUNITY_COLUMNS}])
+    pipeline.submit("market_data_sql", [tuple(range(len(MARKET_DATA_COLUMNS)))])
+    await pipeline.stop(timeout=1.0)
+
+    stats = pipeline.stats()
+    assert stats["sql"]["failed"] == 1 and stats["sql"]["written"] == 0
+    assert stats["market_data_sql"]["failed"] == 1
+    assert await manager.save_opportunity({}) is None
+    manager.close()
+
+
+async def test_bot_queues_full_result_sets_for_sql_only_when_configured(monkeypatch):
+    monkeypatch.setattr(settings, "depth_aware_sizing", False)
+    monkeypatch.setattr(settings, "top_opportunities_limit", 3)
+    tickers = [
+        Ticker(exchange, f"COIN{i}/USDT", bid, bid + 0.01, bid, 10.0, datetime.now())
+        for i in range(20)
+        for exchange, bid in (("binance", 100.0), ("kraken", 102.0))
+    ]
+
+    bot = ArbitrageBot()
+    monkeypatch.setattr(
+        RankedOpportunities, "records", lambda self: pytest.fail("records built")
+    )
+    await bot.analyze_and_execute(tickers)
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "depth_aware_sizing", False)
+
+    saved = []
+
+    class _SQL:
+        async def save_opportunities(self, records):
+            saved.append(records)
+
+    bot.sql_manager = _SQL()
+    bot.persistence.flush_interval_seconds = 0.01
+    bot._add_sink("sql", bot._write_sql, 2)
+    await bot.persistence.start()
+    await bot.analyze_and_execute(tickers)
+    await bot.persistence.stop(timeout=1.0)
+
+    assert [len(records) for records in saved] == [20]
+    assert bot.persistence.stats()["sql"]["written"] == 1
+
+
+async def test_bot_records_ticks_only_with_a_market_data_sink(monkeypatch):
+    monkeypatch.setattr(settings, "tick_recording_enabled", True)
+
+    bot = ArbitrageBot()
+    await bot._initialize_azure_services()
+    await bot.persistence.stop()
+    assert bot.tick_recorder is None
+
+    bot = ArbitrageBot()
+    bot.sql_manager = object()
+    await bot._initialize_azure_services()
+    await bot.persistence.stop()
+    assert isinstance(bot.tick_recorder, TickRecorder)
+
+
+async def test_bot_table_sink_fails_batch_when_a_transaction_fails():
+    class _Storage:
+        async def save_opportunities_to_table(self, records):
+            return [
+                {"operations": 2, "succeeded": True},
+                {"operations": 1, "succeeded": False},
+            ]
+
+    bot = ArbitrageBot()
+    bot.storage_manager = _Storage()
+    with pytest.raises(RuntimeError, match="1 of 3"):
+        await bot._write_table([{}, {}, {}])
+
+    bot.persistence.flush_interval_seconds = 0.01
+    bot._add_sink("table", bot._write_table)
+    await bot.persistence.start()
+    bot.persistence.submit("table", [{}, {}, {}])
+    await bot.persistence.stop(timeout=1.0)
+
+    assert bot.persistence.stats()["table"]["failed"] == 3
+    assert bot.persistence.stats()["table"]["written"] == 0
+
+
+class _HistoryCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.result = []
+
+    def execute(self, sql, params):
+        limit, start, end = params[:3]
+        rows = [r for r in self.rows if start <= r["timestamp"] < end]
+        if len(params) > 3:
+            key = (params[3], params[5])
+            rows = [r for r in rows if (r["timestamp"], r["id"]) > key]
+        rows = sorted(rows, key=lambda r: (r["timestamp"], r["id"]))[:limit]
+
+        columns = sql.split("TOP (?) ")[1].split(" FROM")[0].split(", ")
+        self.result = [tuple(r[c] for c in columns) for r in rows]
+
+    def fetchmany(self, size):
+        chunk, self.result = self.result[:size], self.result[size:]
+        return chunk
+
+
+class _HistoryConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def cursor(self):
+        self.queries += 1
+        return _HistoryCursor(self.rows)
+
+    def close(self):
+        pass
+
+
+async def test_sql_manager_streams_history_with_keyset_pages(monkeypatch):
+    start = datetime(2024, 1, 1)
+    rows = [
+        {
+            "id": i,
+            "symbol": f"S{i % 3}/USDT",
+            "profit_percent": Decimal(i) / 10,
+            "timestamp": start + timedelta(minutes=i // 2),
+        }
+        for i in range(1, 26)
+    ]
+    connection = _HistoryConnection(rows)
+
+    monkeypatch.setattr(sql, "PYODBC_AVAILABLE", True)
+    monkeypatch.setattr(sql.SQLManager, "get_connection", lambda self: connection)
+    manager = sql.SQLManager("Driver=fake")
+
+    batches = [
+        batch
+        async for batch in manager.iter_opportunities(
+            start, start + timedelta(hours=1), ["id", "symbol"], batch_size=4
+        )
+    ]
+    assert [len(b) for b in batches] == [4] * 6 + [1]
+    assert [row[0] for b in batches for row in b] == list(range(1, 26))
+    assert batches[0][0] == (1, "S1/USDT")
+
+    records = [
+        batch
+        async for batch in manager.iter_opportunities(
+            start + timedelta(minutes=5),
+            start + timedelta(minutes=8),
+            ["symbol", "profit_percent"],
+            batch_size=100,
+            as_numpy=True,
+        )
+    ]
+    assert len(records) == 1
+    assert records[0].profit_percent.dtype == np.float64
+    assert records[0].profit_percent.tolist() == [1.0, 1.1, 1.2, 1.3, 1.4, 1.5]
+
+    with pytest.raises(ValueError):
+        async for _ in manager.iter_opportunities(start, start, ["password"]):
+            pass
+
+    manager.close()
+
+
+@pytest.fixture
+async def azure_server():
+    server = FakeAzureStorageServer(latency_seconds=0.01)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+async def test_storage_managers_share_transport_against_fake_azure(azure_server):
+    transport = SharedTransport()
+    storage = StorageManager(
+        azure_server.connection_string, transport=transport, max_concurrency=3
+    )
+    datalake = DataLakeManager(
+        azure_server.account_name,
+        account_url=azure_server.dfs_url,
+        credential=azure_server.account_key,
+        transport=transport,
+    )
+
+    try:
+        await storage.init_storage()
+        await storage.init_storage()
+        await datalake.init_filesystem()
+
+        await storage.save_opportunities_to_blob(
+            [{"symbol": "BTC/USDT"}], datetime.now()
+        )
+        await asyncio.gather(
+            *(
+                storage.save_opportunity_to_table(
+                    {"symbol": "BTC/USDT", "buy_exchange": str(i), "profit_usd": 1.0}
+                )
+                for i in range(12)
+            )
+        )
+        await datalake.upload_arbitrage_results({"opportunities": [], "count": 0})
+
+        blobs = azure_server.containers["arbitrage-data"]
+        assert [json.loads(b) for b in blobs.values()] == [[{"symbol": "BTC/USDT"}]]
+        assert len(azure_server.tables["opportunities"]) == 12
+        assert azure_server.max_in_flight <= 3
+
+        files = azure_server.containers["arbitrage"]
+        assert [json.loads(f)["count"] for f in files.values()] == [0]
+
+        recent = await storage.get_recent_opportunities(limit=5)
+        assert len(recent) == 5
+        assert transport.session is not None and not transport.session.closed
+    finally:
+        await storage.close()
+        await datalake.close()
+        await transport.close()
+
+
+async def test_table_writes_are_grouped_into_partition_transactions(azure_server):
+    storage = StorageManager(azure_server.connection_string)
+    timestamp = datetime(2024, 1, 1, 12, 0, 0)
+    opportunities = [
+        {"symbol": symbol, "buy_exchange": "binance", "timestamp": timestamp}
+        for symbol, count in (("BTC/USDT", 230), ("ETH/USDT", 40))
+        for _ in range(count)
+    ]
+
+    try:
+        await storage.init_storage()
+        results = await storage.save_opportunities_to_table(opportunities)
+
+        assert sorted((r["partition_key"], r["operations"]) for r in results) == [
+            ("BTC-USDT", 30),
+            ("BTC-USDT", 100),
+            ("BTC-USDT", 100),
+            ("ETH-USDT", 40),
+        ]
+        assert all(r["succeeded"] for r in results)
+        assert azure_server.request_counts["batch"] == 5
+        assert sorted(azure_server.tables["opportunitysymbols"]) == [
+            ("symbols", "BTC-USDT"),
+            ("symbols", "ETH-USDT"),
+        ]
+        assert len(azure_server.tables["opportunities"]) == 270
+
+        azure_server.tables.pop("opportunities")
+        failed = await storage.save_opportunities_to_table(opportunities[:5])
+        assert [(r["succeeded"], r["operations"]) for r in failed] == [(False, 5)]
+        assert "TableNotFound" in failed[0]["error"]
+        assert not await storage.save_opportunity_to_table(opportunities[0])
+    finally:
+        await storage.close()
+
+
+async def test_recent_and_range_queries_use_inverted_tick_row_keys(azure_server):
+    storage = StorageManager(azure_server.connection_string, partition_bucket="hour")
+    now = datetime.now().replace(microsecond=0)
+    opportunities = [
+        {
+            "symbol": symbol,
+            "buy_exchange": "binance",
+            "profit_usd": float(minutes),
+            "timestamp": now - timedelta(minutes=minutes),
+        }
+        for minutes in range(0, 180, 15)
+        for symbol in ("BTC/USDT", "ETH/USDT")
+    ]
+
+    try:
+        await storage.init_storage()
+        await storage.save_opportunities_to_table(opportunities)
+
+        partitions = {key[0] for key in azure_server.tables["opportunities"]}
+        assert f"BTC-USDT_{now:%Y%m%d%H}" in partitions
+
+        recent = await storage.get_recent_opportunities(limit=5, select=["profit_usd"])
+        assert [r["profit_usd"] for r in recent] == [0.0, 0.0, 15.0, 15.0, 30.0]
+        assert set(recent[0]) == {"PartitionKey", "RowKey", "profit_usd"}
+
+        in_range = await storage.get_opportunities_in_range(
+            "ETH/USDT", now - timedelta(minutes=100), now - timedelta(minutes=30)
+        )
+        assert [r["profit_usd"] for r in in_range] == [30.0, 45.0, 60.0, 75.0, 90.0]
+    finally:
+        await storage.close()
+
+    restarted = StorageManager(azure_server.connection_string, partition_bucket="hour")
+    try:
+        recent = await restarted.get_recent_opportunities(limit=3)
+        assert [r["profit_usd"] for r in recent] == [0.0, 0.0, 15.0]
+        assert list(restarted.known_symbols) == ["BTC/USDT", "ETH/USDT"]
+    finally:
+        await restarted.close()
+
+
+async def test_table_migration_rewrites_legacy_row_keys(azure_server):
+    storage = StorageManager(azure_server.connection_string)
+    try:
+        await storage.init_storage()
+        legacy = azure_server.tables["opportunities"]
+        for minute in range(3):
+            row_key = f"2024-01-01T12:0{minute}:00.000001_binance_kraken"
+            legacy[("BTC-USDT", row_key)] = {
+                "PartitionKey": "BTC-USDT",
+                "RowKey": row_key,
+                "symbol": "BTC/USDT",
+                "profit_usd": float(minute),
+            }
+
+        stats = await migrate_table(storage, delete_source=True, batch_size=2)
+        assert (stats["migrated"], stats["deleted"], stats["failed"]) == (3, 3, 0)
+
+        rerun = await migrate_table(storage, delete_source=True)
+        assert rerun == {"scanned": 3, "skipped": 3}
+
+        recent = await storage.get_recent_opportunities(limit=3, symbols=["BTC/USDT"])
+        assert [r["profit_usd"] for r in recent] == [2.0, 1.0, 0.0]
+        assert list(azure_server.tables["opportunitysymbols"]) == [
+            ("symbols", "BTC-USDT")
+        ]
+    finally:
+        await storage.close()
+
+
+async def test_archive_writer_flushes_columnar_files_and_compacts_hours(azure_server):
+    datalake = DataLakeManager(
+        azure_server.account_name,
+        account_url=azure_server.dfs_url,
+        credential=azure_server.account_key,
+    )
+    archive = ColumnarArchiveWriter(datalake, flush_rows=4, file_format="npz")
+    hour = datetime(2024, 1, 1, 12)
+
+    def rows(minutes):
+        return [
+            {
+                "symbol": "BTC/USDT",
+                "profit_usd": float(m),
+                "timestamp": hour + timedelta(minutes=m),
+            }
+            for m in minutes
+        ]
+
+    try:
+        await datalake.init_filesystem()
+        archive.append(rows([30, 10]))
+        assert not archive.flush_due()
+        archive.append(rows([20, 40]))
+        assert archive.flush_due()
+        written = await archive.flush()
+        archive.append(rows([5, 50]))
+        written += await archive.flush()
+
+        directory = "opportunities/date=2024-01-01/symbol=BTC-USDT/hour=12"
+        assert [path.rsplit("/", 1)[0] for path in written] == [directory] * 2
+        assert len(datalake.directories) == 1
+
+        assert await archive.compact_due(now=hour + timedelta(minutes=59)) == []
+        [compacted] = await archive.compact_due(now=hour + timedelta(hours=1))
+        assert await datalake.list_files(directory) == [compacted]
+
+        columns = decode_columns(await datalake.download_file(compacted), "npz")
+        assert columns["profit_usd"].tolist() == [5.0, 10.0, 20.0, 30.0, 40.0, 50.0]
+        assert columns["timestamp"].dtype == np.dtype("datetime64[us]")
+        assert columns["symbol"].tolist() == ["BTC/USDT"] * 6
+        assert archive.pending_compaction == {}
+    finally:
+        await datalake.close()
+
+
+async def test_archive_writer_keeps_rows_when_an_upload_fails():
+    class _FlakyStore:
+        def __init__(self):
+            self.files = {}
+            self.failures = 1
+
+        async def upload_file(self, path, data):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("blob endpoint unavailable")
+            self.files[path] = data
+
+    store = _FlakyStore()
+    archive = ColumnarArchiveWriter(store, flush_rows=2, file_format="npz")
+    timestamp = datetime(2024, 1, 1, 12)
+
+    async def write(batch):
+        archive.append(batch)
+        if archive.flush_due():
+            await archive.flush()
+
+    pipeline = PersistencePipeline(flush_size=2, flush_interval_seconds=0.01)
+    pipeline.add_sink("blob", write)
+    await pipeline.start()
+    pipeline.submit(
+        "blob",
+        [
+            {"symbol": "BTC/USDT", "volume": float(i), "timestamp": timestamp}
+            for i in (1, 2)
+        ],
+    )
+    await asyncio.sleep(0.05)
+
+    assert pipeline.stats()["blob"]["failed"] == 2
+    assert pipeline.stats()["blob"]["written"] == 0
+    assert archive.buffered_rows == 2 and archive.flush_due()
+
+    pipeline.submit(
+        "blob", [{"symbol": "BTC/USDT", "volume": 3.0, "timestamp": timestamp}]
+    )
+    await pipeline.stop(timeout=1.0)
+
+    [data] = store.files.values()
+    assert decode_columns(data, "npz")["volume"].tolist() == [1.0, 2.0, 3.0]
+    assert pipeline.stats()["blob"]["written"] == 1
+    assert archive.buffered_rows == 0
+
+
+async def test_archive_compaction_resumes_without_duplicating_rows():
+    class _Store:
+        def __init__(self):
+            self.files = {}
+            self.failing_deletes = 1
+
+        async def upload_file(self, path, data):
+            self.files[path] = data
+
+        async def list_files(self, prefix):
+            return sorted(p for p in self.files if p.startswith(prefix))
+
+        async def download_file(self, path):
+            return self.files[path]
+
+        async def delete_file(self, path):
+            if self.failing_deletes and "compacted-" not in path:
+                self.failing_deletes -= 1
+                raise ConnectionError("delete timed out")
+            del self.files[path]
+
+    store = _Store()
+    archive = ColumnarArchiveWriter(store, flush_rows=1, file_format="npz")
+    hour = datetime(2024, 1, 1, 12)
+    for minute in (10, 20, 30):
+        archive.append(
+            [
+                {
+                    "symbol": "BTC/USDT",
+                    "volume": float(minute),
+                    "timestamp": hour + timedelta(minutes=minute),
+                }
+            ]
+        )
+        await archive.flush()
+
+    assert await archive.compact_due(now=hour + timedelta(hours=1)) == []
+    assert len(store.files) == 4 and archive.pending_compaction
+
+    archive.append(
+        [
+            {
+                "symbol": "BTC/USDT",
+                "volume": 40.0,
+                "timestamp": hour + timedelta(minutes=40),
+            }
+        ]
+    )
+    await archive.flush()
+    [compacted] = await archive.compact_due(now=hour + timedelta(hours=1))
+
+    assert list(store.files) == [compacted]
+    columns = decode_columns(store.files[compacted], "npz")
+    assert columns["volume"].tolist() == [10.0, 20.0, 30.0, 40.0]
+    assert archive.pending_compaction == {}
+
+
+async def test_archive_writer_writes_parquet_to_blob(azure_server):
+    pytest.importorskip("pyarrow")
+    storage = StorageManager(azure_server.connection_string)
+    archive = ColumnarArchiveWriter(storage, file_format="parquet")
+    timestamp = datetime(2024, 1, 1, 12)
+
+    try:
+        await storage.init_storage()
+        archive.append([{"symbol": "ETH/USDT", "volume": 2.5, "timestamp": timestamp}])
+        [path] = await archive.flush()
+
+        assert path.endswith(".parquet")
+        columns = decode_columns(await storage.download_file(path), "parquet")
+        assert columns["volume"].tolist() == [2.5]
+    finally:
+        await storage.close()
+
+
+async def test_tick_segments_flush_to_sql_and_datalake(azure_server, monkeypatch):
+    recorder = TickRecorder(segment_size=300)
+    timestamp = datetime(2024, 1, 1, 12, 30)
+    recorder.record_many(
+        [
+            Ticker(exchange, "BTC/USDT", 99.0, 101.0, 100.0, float(i), timestamp)
+            for i in range(250)
+            for exchange in ("binance", "kraken")
+        ]
+    )
+    segments = recorder.take_segments(force=True)
+    assert [len(s) for s in segments] == [300, 200]
+
+    connection = _FakeConnection()
+    monkeypatch.setattr(sql, "PYODBC_AVAILABLE", True)
+    monkeypatch.setattr(sql.SQLManager, "get_connection", lambda self: connection)
+    manager = sql.SQLManager("Driver=fake")
+    assert await manager.save_market_data(segments[0].rows()) == 300
+    assert await manager.save_market_data([]) == 0
+    manager.close()
+
+    statements = connection.statements
+    assert [len(params) for _, params in statements] == [1400, 700]
+    assert statements[0][0].startswith(
+        f"INSERT INTO market_data ({', '.join(MARKET_DATA_COLUMNS)})"
+    )
+    assert statements[0][1][:7] == [
+        "binance",
+        "BTC/USDT",
+        99.0,
+        101.0,
+        100.0,
+        0.0,
+        timestamp,
+    ]
+
+    datalake = DataLakeManager(
+        azure_server.account_name,
+        account_url=azure_server.dfs_url,
+        credential=azure_server.account_key,
+    )
+    try:
+        await datalake.init_filesystem()
+        path = await datalake.upload_market_data(
+            segments[1].encode(), segments[1].started_at
+        )
+        assert path.startswith("market_data/2024/01/01/12/123000-")
+
+        decoded = TickSegment.decode(await datalake.download_file(path))
+        assert decoded.rows() == segments[1].rows()
+    finally:
+        await datalake.close()
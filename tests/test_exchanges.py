@@ -1,8 +1,26 @@
+import random
+import time
+from datetime import datetime
+import numpy as np
 import pytest
+from src.exchanges.base import OrderBook, Ticker
 from src.exchanges.binance import BinanceExchange
 from src.exchanges.bybit import BybitExchange
 from src.exchanges.gateio import GateioExchange
 from src.exchanges.kraken import KrakenExchange
+from src.exchanges.fake import FakeExchange, FakeExchangeServer
+from src.exchanges.stream import MarketDataStream
+from src.marketdata.recorder import TickRecorder
+from src.config import settings
+from src.main import ArbitrageBot
+
+
+@pytest.fixture
+async def fake_server():
+    server = FakeExchangeServer(seed=42, tick_interval_seconds=0.01)
+    await server.start()
+    yield server
+    await server.stop()
 
 
 def test_exchange_initialization():
@@ -22,3 +40,282 @@ def test_exchange_names():
     assert BybitExchange("k", "s").name == "bybit"
     assert GateioExchange("k", "s").name == "gateio"
     assert KrakenExchange("k", "s").name == "kraken"
+
+
+@pytest.mark.asyncio
+async def test_ccxt_adapters_share_ticker_parsing_and_symbol_filter():
+    class _Client:
+        async def fetch_tickers(self, symbols):
+            return {
+                symbol: {"bid": 1.0, "ask": 1.1, "last": 1.05, "baseVolume": 5.0}
+                for symbol in ("BTC/USDT", "ETH/USDT", "XRP/USDT")
+            }
+
+    for exchange_class in (BybitExchange, GateioExchange, KrakenExchange):
+        exchange = exchange_class("k", "s")
+        await exchange.close()
+        exchange.exchange = _Client()
+
+        tickers = await exchange.get_tickers(["ETH/USDT", "BTC/USDT"])
+
+        assert [(t.exchange, t.symbol) for t in tickers] == [
+            (exchange.name, "BTC/USDT"),
+            (exchange.name, "ETH/USDT"),
+        ]
+        assert tickers[0].volume == 5.0
+
+
+@pytest.mark.asyncio
+async def test_fake_exchange_streams_tickers(fake_server):
+    exchange = FakeExchange("fake", fake_server.url)
+    received = []
+
+    async for ticker in exchange.watch_tickers(["BTC/USDT", "ETH/USDT"]):
+        received.append(ticker)
+        if len(received) == 4:
+            break
+
+    await exchange.close()
+
+    assert {t.symbol for t in received} == {"BTC/USDT", "ETH/USDT"}
+    assert all(isinstance(t, Ticker) and t.bid < t.ask for t in received)
+
+
+@pytest.mark.asyncio
+async def test_market_data_stream_keeps_latest_ticker_per_exchange(fake_server):
+    exchanges = [
+        FakeExchange("fake_a", fake_server.url),
+        FakeExchange("fake_b", fake_server.url),
+    ]
+    stream = MarketDataStream(exchanges, ["BTC/USDT"])
+    updates = []
+
+    def failing_listener(ticker):
+        raise RuntimeError("listener bug")
+
+    stream.add_listener(failing_listener)
+    stream.add_listener(updates.append)
+
+    await stream.start()
+    while len(stream.snapshot()) < 2:
+        assert await stream.wait_for_update(timeout=5)
+    await stream.stop()
+    for exchange in exchanges:
+        await exchange.close()
+
+    assert {t.exchange for t in stream.snapshot()} == {"fake_a", "fake_b"}
+    assert len(updates) >= 2
+    assert stream.listener_errors == len(updates)
+
+
+@pytest.mark.asyncio
+async def test_streaming_cycles_are_throttled_and_counted_as_fetches(
+    fake_server, monkeypatch
+):
+    monkeypatch.setattr(settings, "market_data_mode", "streaming")
+    monkeypatch.setattr(settings, "trading_pairs", ["BTC/USDT", "ETH/USDT"])
+    monkeypatch.setattr(settings, "stream_min_cycle_interval_seconds", 0.2)
+
+    bot = ArbitrageBot()
+    bot.exchanges = [FakeExchange("fake_a", fake_server.url)]
+    await bot._initialize_exchanges()
+    try:
+        while len(bot.market_stream.snapshot()) < 2:
+            assert await bot.market_stream.wait_for_update(timeout=5)
+
+        bot.cycle_started_at = time.perf_counter()
+        await bot._wait_for_next_cycle()
+        assert time.perf_counter() - bot.cycle_started_at >= 0.2
+
+        for listener in bot.market_stream.error_listeners:
+            listener("fake_a", ConnectionError("stream closed"))
+    finally:
+        await bot.market_stream.stop()
+        await bot.exchanges[0].close()
+
+    summary = bot.metrics_collector.get_summary()
+    assert summary["successful_ticker_fetches"] >= 2
+    assert summary["total_ticker_fetches"] == summary["successful_ticker_fetches"] + 1
+    assert 0.5 < summary["fetch_success_rate"] < 1.0
+
+
+@pytest.mark.asyncio
+async def test_depth_sizing_and_ai_only_rerun_when_the_top_set_changes(monkeypatch):
+    monkeypatch.setattr(settings, "depth_aware_sizing", True)
+    monkeypatch.setattr(settings, "depth_refresh_seconds", 3600)
+    calls = {"depth": 0, "ai": 0}
+
+    async def refine_with_depth(opportunities, exchanges, depth):
+        calls["depth"] += 1
+        return opportunities
+
+    class _AI:
+        async def analyze_opportunities(self, opportunities):
+            calls["ai"] += 1
+            return {"recommendation": "hold", "analysis": ""}
+
+    def tickers(symbol):
+        return [
+            Ticker("binance", symbol, 100.0, 100.1, 100.0, 1.0, datetime.now()),
+            Ticker("kraken", symbol, 102.0, 102.1, 102.0, 1.0, datetime.now()),
+        ]
+
+    bot = ArbitrageBot()
+    bot.exchanges = [FakeExchange("binance", "http://unused")]
+    bot.ai_analyzer = _AI()
+    monkeypatch.setattr(bot.analyzer, "refine_with_depth", refine_with_depth)
+
+    for symbol in ("BTC/USDT", "BTC/USDT", "ETH/USDT"):
+        await bot.analyze_and_execute(tickers(symbol))
+
+    assert calls == {"depth": 2, "ai": 2}
+
+
+@pytest.mark.asyncio
+async def test_fetch_market_data_makes_one_request_per_exchange(
+    fake_server, monkeypatch
+):
+    symbols = [f"COIN{i}/USDT" for i in range(25)]
+    monkeypatch.setattr(settings, "trading_pairs", symbols)
+
+    bot = ArbitrageBot()
+    bot.tick_recorder = TickRecorder()
+    bot.exchanges = [
+        FakeExchange("fake_a", fake_server.url),
+        FakeExchange("fake_b", fake_server.url),
+    ]
+
+    tickers = await bot.fetch_market_data()
+    for exchange in bot.exchanges:
+        await exchange.close()
+
+    assert len(tickers) == 50
+    assert bot.tick_recorder.recorded == 50
+    assert fake_server.request_counts["/tickers"] == 2
+    assert fake_server.request_counts["/ticker"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fake_exchange_server_injects_latency_errors_and_rate_limits():
+    server = FakeExchangeServer(seed=7, latency_seconds=0.02, error_rate=1.0)
+    await server.start()
+    exchange = FakeExchange("fake", server.url)
+
+    started = time.perf_counter()
+    assert await exchange.get_tickers(["BTC/USDT"]) == []
+    assert time.perf_counter() - started >= 0.02
+    assert await exchange.get_orderbook("BTC/USDT") is None
+    assert server.status_counts[503] == 2
+
+    server.latency_seconds, server.error_rate = 0.0, 0.0
+    server.rate_limit_per_second, server.rate_limit_burst = 1.0, 2
+    server._tokens = 2.0
+    results = [await exchange.get_ticker("BTC/USDT") for _ in range(3)]
+    balance = await exchange.get_balance()
+
+    await exchange.close()
+    await server.stop()
+
+    assert [r is not None for r in results] == [True, True, False]
+    assert balance == {}
+    assert server.status_counts[429] == 2
+
+    with pytest.raises(ValueError):
+        FakeExchangeServer(latency_distribution="pareto")
+
+
+@pytest.mark.asyncio
+async def test_binance_adapter_runs_through_ccxt_against_the_fake_server():
+    prices = {f"SYM{i:04d}/USDT": 10.0 + i for i in range(600)}
+    server = FakeExchangeServer(prices=prices, seed=3)
+    await server.start()
+    exchange = BinanceExchange("", "", rest_url=server.url)
+
+    try:
+        tickers = await exchange.get_tickers(list(prices))
+        book = await exchange.get_orderbook("SYM0001/USDT", 5)
+
+        server.error_rate = 1.0
+        failed = await exchange.get_tickers(["SYM0001/USDT"])
+    finally:
+        await exchange.close()
+        await server.stop()
+
+    assert len(tickers) == 600
+    assert all(t.bid < t.last < t.ask for t in tickers)
+    assert len(book.bids) == len(book.asks) == 5
+    assert failed == []
+    assert server.request_counts["/api/v3/exchangeInfo"] == 1
+    assert server.request_counts["/api/v3/ticker/24hr"] == 2
+    assert server.status_counts[503] == 1
+
+
+def test_orderbook_applies_snapshot_and_deltas_in_place():
+    book = OrderBook(
+        "binance",
+        "BTC/USDT",
+        bids=[(99.0, 2.0), (100.0, 1.0), (98.0, 3.0)],
+        asks=[(101.0, 1.0), (102.0, 2.0)],
+    )
+
+    assert book.best_bid() == (100.0, 1.0)
+    assert book.best_ask() == (101.0, 1.0)
+
+    book.apply_deltas(bids=[(100.0, 0.0), (99.5, 4.0)], asks=[(100.5, 0.5)])
+
+    assert book.bids == [(99.5, 4.0), (99.0, 2.0), (98.0, 3.0)]
+    assert book.asks == [(100.5, 0.5), (101.0, 1.0), (102.0, 2.0)]
+    assert book.depth_at("bids", 99.0) == 2.0
+    assert book.depth_at("bids", 100.0) == 0.0
+
+
+def test_orderbook_vwap_walks_levels():
+    book = OrderBook("binance", "BTC/USDT", asks=[(100.0, 1.0), (110.0, 1.0)])
+
+    assert book.vwap("asks", 1.0) == 100.0
+    assert book.vwap("asks", 2.0) == 105.0
+    assert book.fill("asks", 5.0) == (2.0, 210.0)
+    assert book.fill_notional("asks", 155.0) == (1.5, 155.0)
+
+
+def test_orderbook_prefix_sums_stay_exact_across_interleaved_deltas():
+    rng = random.Random(3)
+    book = OrderBook(
+        "binance",
+        "BTC/USDT",
+        bids=[(100.0 - i * 0.5, 1.0) for i in range(50)],
+        asks=[(101.0 + i * 0.5, 1.0) for i in range(50)],
+    )
+    book._sides["asks"].resync_every = 10**9
+
+    for _ in range(2000):
+        price = 101.0 + rng.randrange(80) * 0.5
+        size = rng.choice([0.0, rng.uniform(0.1, 5.0)])
+        book.apply_deltas(asks=[(price, size)])
+
+        prices, cum_sizes, cum_notional = book.cumulative("asks")
+        sizes = np.array([s for _, s in book.asks])
+        assert np.allclose(cum_sizes, np.cumsum(sizes))
+        assert np.allclose(cum_notional, np.cumsum(sizes * prices))
+
+    amount = float(book.cumulative("asks")[1][-1]) / 2
+    levels = book.asks
+    expected = OrderBook("binance", "BTC/USDT", asks=levels).fill("asks", amount)
+    assert book.fill("asks", amount) == pytest.approx(expected)
+
+
+@pytest.mark.asyncio
+async def test_fetched_orderbooks_are_independent_snapshots(fake_server):
+    exchange = FakeExchange("fake", fake_server.url)
+    first = await exchange.get_orderbook("BTC/USDT", limit=5)
+    first_levels = first.asks
+    second = await exchange.get_orderbook("BTC/USDT", limit=5)
+    await exchange.close()
+
+    assert first is not second
+    assert first.asks == first_levels
+    assert second.asks != first_levels
+
+    copy = second.copy()
+    copy.apply_deltas(asks=[(second.asks[0][0], 0.0)])
+    assert second.depth("asks") == 5 and copy.depth("asks") == 4
@@ -0,0 +1,160 @@
+import numpy as np
+from datetime import datetime, timedelta
+from src.exchanges.base import Ticker
+from src.marketdata.recorder import TickRecorder, TickSegment
+from src.marketdata.ringstore import TickRingStore
+
+
+def _tickers(count, start=datetime(2024, 1, 1)):
+    return [
+        Ticker(
+            exchange=("binance", "kraken", "bybit")[i % 3],
+            symbol=f"COIN{i % 5}/USDT",
+            bid=100.0 + i,
+            ask=101.0 + i,
+            last=100.5 + i,
+            volume=float(i),
+            timestamp=start + timedelta(milliseconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def test_tick_recorder_encodes_ids_into_fixed_width_segments():
+    tickers = _tickers(25)
+    recorder = TickRecorder(segment_size=10, flush_interval_seconds=3600)
+    for ticker in tickers[:7]:
+        recorder.record(ticker)
+    recorder.record_many(tickers[7:])
+
+    segments = recorder.take_segments()
+    assert [len(s) for s in segments] == [10, 10]
+    assert recorder.size == 5 and recorder.recorded == 25
+
+    segments += recorder.take_segments(force=True)
+    assert [len(s) for s in segments] == [10, 10, 5]
+    assert recorder.take_segments(force=True) == []
+
+    first = segments[0]
+    assert first.columns["exchange_id"].dtype == np.uint8
+    assert first.columns["symbol_id"].dtype == np.uint16
+    assert first.columns["exchange_id"][:4].tolist() == [0, 1, 2, 0]
+    assert first.exchanges == ["binance", "kraken", "bybit"]
+    assert first.started_at == datetime(2024, 1, 1)
+
+    rows = [row for segment in segments for row in segment.rows()]
+    assert rows == [
+        (t.exchange, t.symbol, t.bid, t.ask, t.last, t.volume, t.timestamp)
+        for t in tickers
+    ]
+
+
+def test_tick_segment_round_trips_through_compressed_encoding():
+    recorder = TickRecorder()
+    recorder.record_many(_tickers(1000))
+    [segment] = recorder.take_segments(force=True)
+
+    data = segment.encode()
+    decoded = TickSegment.decode(data)
+
+    assert len(data) < sum(v.nbytes for v in segment.columns.values())
+    assert decoded.symbols == segment.symbols
+    assert decoded.rows() == segment.rows()
+
+
+def test_tick_segment_rows_skip_incomplete_quotes():
+    tickers = _tickers(6)
+    tickers[1].bid = float("nan")
+    tickers[4].volume = float("nan")
+    recorder = TickRecorder()
+    recorder.record_many(tickers)
+    [segment] = recorder.take_segments(force=True)
+
+    assert len(segment) == 6
+    assert [row[6] for row in segment.rows()] == [
+        t.timestamp for i, t in enumerate(tickers) if i not in (1, 4)
+    ]
+
+
+def test_tick_ring_windows_are_contiguous_views_across_wraparound(tmp_path):
+    store = TickRingStore(str(tmp_path), capacity=8)
+    start = datetime(2024, 1, 1)
+    for i in range(13):
+        store.append(
+            Ticker(
+                "binance",
+                "BTC/USDT",
+                i,
+                i + 1,
+                i + 0.5,
+                1.0,
+                start + timedelta(seconds=i),
+            )
+        )
+
+    ring = store.ring("binance", "BTC/USDT")
+    window = ring.last()
+    assert len(ring) == 8 and ring.count == 13
+    assert window["bid"].tolist() == list(range(5, 13))
+    assert ring.last(3)["ask"].tolist() == [11, 12, 13]
+    assert all(np.shares_memory(values, ring.buffer) for values in window.values())
+
+    recent = store.window("binance", "BTC/USDT", 2.5, now=start + timedelta(seconds=12))
+    assert recent["bid"].tolist() == [10, 11, 12]
+    store.close()
+
+    reader = TickRingStore(str(tmp_path), readonly=True)
+    reopened = reader.ring("binance", "BTC/USDT")
+    assert reopened.capacity == 8
+    assert reopened.last()["timestamp"][-1] == np.datetime64(
+        start + timedelta(seconds=12)
+    )
+    assert reader.ring("kraken", "BTC/USDT") is None
+    reader.close()
+
+
+def test_tick_ring_store_aligns_spread_between_exchanges(tmp_path):
+    store = TickRingStore(str(tmp_path))
+    start = datetime(2024, 1, 1)
+    store.append_many(
+        [
+            Ticker("binance", "BTC/USDT", 99.0, 100.0, 99.5, 1.0, start),
+            Ticker(
+                "kraken",
+                "BTC/USDT",
+                101.0,
+                102.0,
+                101.5,
+                1.0,
+                start + timedelta(seconds=1),
+            ),
+            Ticker(
+                "binance",
+                "BTC/USDT",
+                100.0,
+                101.0,
+                100.5,
+                1.0,
+                start + timedelta(seconds=2),
+            ),
+            Ticker(
+                "kraken",
+                "BTC/USDT",
+                102.0,
+                103.0,
+                102.5,
+                1.0,
+                start + timedelta(seconds=3),
+            ),
+        ]
+    )
+
+    timestamps, spread = store.spread(
+        "BTC/USDT", "binance", "kraken", 60, now=start + timedelta(seconds=4)
+    )
+    assert timestamps.tolist() == [start + timedelta(seconds=s) for s in (1, 2, 3)]
+    assert np.allclose(spread, [1.0, 0.0, 100 / 101])
+
+    empty_timestamps, empty = store.spread("BTC/USDT", "binance", "bybit", 60)
+    assert len(empty_timestamps) == 0 and len(empty) == 0
+    store.close()
@@ -0,0 +1,340 @@
+import aiohttp
+import asyncio
+import json
+import logging
+import os
+import pstats
+import signal
+import time
+import pytest
+import random
+from src.monitoring.metrics import LogHistogram, MetricsCollector, RollingCounters
+from src.monitoring.profiler import RuntimeProfiler
+from src.monitoring.prometheus import MetricsServer, Registry
+from src.monitoring import telemetry
+from src.monitoring.telemetry import create_span
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_log_histogram_quantiles_stay_within_relative_error():
+    histogram = LogHistogram(relative_error=0.01)
+    for value in range(1, 10001):
+        histogram.record(value / 1000)
+
+    for q, expected in ((0.5, 5.0), (0.9, 9.0), (0.99, 9.9)):
+        assert histogram.quantile(q) == pytest.approx(expected, rel=0.02)
+    assert len(histogram.buckets) < 500
+
+    low, high = LogHistogram(), LogHistogram()
+    for value in range(1, 10001):
+        (low if value <= 5000 else high).record(value / 1000)
+    merged = low.merge(high)
+    assert merged.count == histogram.count
+    assert merged.quantile(0.99) == histogram.quantile(0.99)
+
+    with pytest.raises(ValueError):
+        merged.merge(LogHistogram(relative_error=0.05))
+
+
+def test_rolling_counters_expire_old_buckets():
+    clock = _Clock()
+    counters = RollingCounters(("hits",), bucket_seconds=10, slots=6, clock=clock)
+
+    for _ in range(5):
+        counters.add("a", "hits")
+        counters.add("b", "hits", 2)
+        clock.now += 10
+
+    assert counters.window(30)[:, 0].tolist() == [2, 4]
+    assert counters.window(60)[:, 0].tolist() == [5, 10]
+
+    clock.now += 120
+    assert counters.window(60)[:, 0].tolist() == [0, 0]
+    assert counters.total()[:, 0].tolist() == [5, 10]
+
+
+def test_rolling_counter_running_windows_match_a_full_scan():
+    clock = _Clock()
+    scanned = RollingCounters(("hits",), bucket_seconds=10, slots=6, clock=clock)
+    running = RollingCounters(
+        ("hits",), bucket_seconds=10, slots=6, clock=clock, windows=(30, 60)
+    )
+    rng = random.Random(7)
+
+    for step in range(500):
+        key = rng.randrange(40)
+        scanned.add(key, "hits", step)
+        running.add(key, "hits", step)
+        clock.now += rng.choice((0, 0, 3, 10, 25, 70))
+        for seconds in (30, 60):
+            assert running.window(seconds).tolist() == scanned.window(seconds).tolist()
+
+    with pytest.raises(ValueError):
+        RollingCounters(("hits",), bucket_seconds=10, slots=6, windows=(120,))
+
+
+def test_metrics_collector_memory_is_flat_and_windows_roll():
+    clock = _Clock()
+    collector = MetricsCollector(clock=clock)
+
+    for minute in range(24 * 60):
+        for symbol in ("BTC/USDT", "ETH/USDT"):
+            collector.record_ticker_fetch("binance", symbol, minute % 10 != 0)
+            collector.record_ticker_fetch("kraken", symbol, True)
+        collector.record_fetch_latency("binance", 0.1)
+        collector.record_fetch_latency("kraken", 0.3)
+        collector.record_opportunities(2)
+        collector.record_cycle(0.5)
+        clock.now += 60
+
+    assert collector.fetches.counts.shape[:2] == (16, 360)
+    assert list(collector.fetches.keys) == ["binance", "kraken"]
+    assert len(collector.latencies["binance"].histograms) == 360
+
+    summary = collector.get_summary()
+    assert summary["total_ticker_fetches"] == 4 * 24 * 60
+    assert summary["successful_ticker_fetches"] == 4 * 24 * 60 - 2 * 144
+    assert summary["total_opportunities_found"] == 2 * 24 * 60
+    assert summary["windows"]["5m"]["ticker_fetches"] == 4 * 4
+    assert summary["windows"]["1h"]["opportunities_found"] == 2 * 59
+    assert summary["fetch_latency"]["1h"]["p50"] == pytest.approx(0.1, rel=0.02)
+    assert summary["fetch_latency"]["total"]["p99"] == pytest.approx(0.3, rel=0.02)
+    assert summary["cycle_time"]["1h"]["count"] == 59
+    assert summary["cycle_time"]["total"]["p50"] == pytest.approx(0.5, rel=0.02)
+
+    stats = collector.get_exchange_statistics()
+    assert stats["binance"]["success_rate"] == pytest.approx(0.9)
+    assert stats["kraken"]["windows"]["1h"] == {"total": 118, "successful": 118}
+    assert stats["kraken"]["latency"]["5m"]["count"] == 4
+    assert collector.get_symbol_statistics("kraken")["BTC/USDT"]["total"] == 1440
+
+
+def test_metrics_collector_summary_stays_cheap_with_many_symbols():
+    clock = _Clock()
+    collector = MetricsCollector(clock=clock)
+    exchanges = [f"venue{i:02d}" for i in range(20)]
+    symbols = [f"SYM{i:04d}/USDT" for i in range(2000)]
+
+    for _ in range(3):
+        for exchange in exchanges:
+            for symbol in symbols:
+                collector.record_ticker_fetch(exchange, symbol, True)
+        clock.now += 10
+
+    summary = collector.get_summary()
+    statistics = collector.get_exchange_statistics()
+    assert summary["windows"]["1m"]["ticker_fetches"] == 3 * 40_000
+
+    # Rolling counters are keyed by exchange only; symbols never get a bucket ring.
+    assert collector.fetches.counts.shape[:2] == (32, collector.slots)
+    assert len(collector.fetches.keys) == len(exchanges)
+    assert sum(map(len, collector.symbol_fetches.values())) == 40_000
+
+    # Every summary window is a running total, so reading it must not scan slots.
+    class _Unreadable:
+        def __getitem__(self, index):
+            raise AssertionError("window() scanned the bucket ring")
+
+    collector.fetches.counts = collector.events.counts = _Unreadable()
+    assert collector.get_summary()["windows"] == summary["windows"]
+    assert collector.get_exchange_statistics() == statistics
+
+
+def test_registry_renders_histograms_and_caps_label_cardinality():
+    registry = Registry(max_series=2)
+    histogram = registry.histogram(
+        "fetch_seconds", "Fetch latency", ["exchange"], buckets=(0.1, 1.0)
+    )
+
+    histogram.observe(0.05, exchange="binance")
+    histogram.observe(0.5, exchange="binance")
+    histogram.observe(2.0, exchange='kra"ken')
+    histogram.observe(0.05, exchange="bybit")
+    histogram.observe(0.05, exchange="gateio")
+
+    text = registry.render()
+    assert "# TYPE fetch_seconds histogram" in text
+    assert 'fetch_seconds_bucket{exchange="binance",le="0.1"} 1' in text
+    assert 'fetch_seconds_bucket{exchange="binance",le="+Inf"} 2' in text
+    assert 'fetch_seconds_count{exchange="kra\\"ken"} 1' in text
+    assert 'fetch_seconds_count{exchange="other"} 2' in text
+    assert 'arbitrage_metric_series_overflow_total{metric="fetch_seconds"} 2' in text
+    assert len(histogram.series) == 3
+
+
+async def test_metrics_server_serves_prometheus_text():
+    registry = Registry()
+    with registry.histogram("cycle_seconds", "Cycle time").time():
+        pass
+
+    server = MetricsServer(registry, host="127.0.0.1", port=0)
+    url = await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{url}/metrics") as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"].startswith("text/plain")
+                body = await response.text()
+    finally:
+        await server.stop()
+
+    assert "cycle_seconds_count 1" in body
+
+
+def test_create_span_without_tracer_is_a_context_manager():
+    with create_span("noop"):
+        pass
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def telemetry_handler():
+    handler = _ListHandler()
+    level, propagate = telemetry.logger.level, telemetry.logger.propagate
+    telemetry.logger.addHandler(handler)
+    telemetry.logger.setLevel(logging.INFO)
+    telemetry.logger.propagate = False
+    yield handler
+    telemetry.stop_telemetry()
+    telemetry.configure_telemetry("verbose")
+    telemetry.logger.removeHandler(handler)
+    telemetry.logger.setLevel(level)
+    telemetry.logger.propagate = propagate
+
+
+def test_aggregate_telemetry_samples_and_flushes_summaries(telemetry_handler):
+    telemetry.configure_telemetry(
+        "aggregate", rates={"ticker_price": 0.1}, flush_interval=3600
+    )
+
+    for i in range(100):
+        telemetry.track_metric("ticker_price", float(i + 1), {"exchange": "binance"})
+        telemetry.track_metric("opportunities_found", 1)
+    telemetry.track_event("bot_started")
+
+    assert telemetry_handler.messages == [
+        f"Metric: ticker_price={float(i + 1)}" for i in range(0, 100, 10)
+    ] + ["Event: bot_started"]
+
+    telemetry.flush_telemetry()
+    summaries = telemetry_handler.messages[11:]
+    assert "Event summary: bot_started count=1" in summaries
+    assert any(
+        m.startswith("Metric summary: ticker_price count=100 mean=50.5")
+        for m in summaries
+    )
+    assert any(
+        m.startswith("Metric summary: opportunities_found count=100") for m in summaries
+    )
+    assert telemetry.metric_aggregates == {}
+
+    with pytest.raises(ValueError):
+        telemetry.configure_telemetry("debug")
+
+
+def test_aggregate_telemetry_feeds_every_value_to_the_otel_histogram(
+    telemetry_handler, monkeypatch
+):
+    class _Recorder:
+        def __init__(self):
+            self.values = []
+
+        def record(self, value, attributes):
+            self.values.append((value, attributes["metric_name"]))
+
+    recorder = _Recorder()
+    monkeypatch.setattr(telemetry, "metric_recorder", recorder)
+    telemetry.configure_telemetry("aggregate")
+
+    for i in range(50):
+        telemetry.track_metric("fetch_latency", float(i))
+
+    assert recorder.values == [(float(i), "fetch_latency") for i in range(50)]
+    assert telemetry_handler.messages == []
+
+
+def test_log_shipper_moves_handlers_behind_a_queue(telemetry_handler):
+    telemetry.configure_telemetry("verbose", async_logging=True)
+    assert telemetry_handler not in telemetry.logger.handlers
+
+    for i in range(50):
+        telemetry.track_metric("ticker_price", i)
+    telemetry.stop_telemetry()
+
+    assert len(telemetry_handler.messages) == 50
+    assert telemetry_handler in telemetry.logger.handlers
+
+
+def _busy_cycle(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def _profile_iterations(profiler: RuntimeProfiler, count: int):
+    summaries = []
+    for _ in range(count):
+        profiler.start_iteration()
+        started = time.perf_counter()
+        _busy_cycle(0.05)
+        await asyncio.sleep(0.03)
+        summaries.append(await profiler.end_iteration(time.perf_counter() - started))
+    return summaries
+
+
+async def test_sampling_profiler_writes_folded_stacks_and_loop_lag(tmp_path):
+    profiler = RuntimeProfiler(
+        str(tmp_path), iterations=2, sample_interval_seconds=0.001
+    )
+    profiler.lag_interval_seconds = 0.01
+    assert await _profile_iterations(profiler, 1) == [None]
+
+    profiler.request()
+    summaries = await _profile_iterations(profiler, 3)
+    assert summaries[0] is None and summaries[2] is None
+    summary = summaries[1]
+    assert summary["iterations"] == 2
+    assert summary["samples"] > 0
+    assert summary["event_loop_lag_seconds"]["max"] >= 0.02
+    assert profiler.session is None
+
+    folded, report = sorted(profiler.written, key=lambda p: p.suffix != ".folded")
+    lines = folded.read_text().splitlines()
+    assert any("_busy_cycle (test_monitoring.py" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert json.loads(report.read_text())["iterations"] == 2
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="requires SIGUSR1")
+async def test_cprofile_mode_is_started_by_signal(tmp_path):
+    profiler = RuntimeProfiler(str(tmp_path), mode="cprofile", iterations=1)
+    assert profiler.install_signal_handler()
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        await asyncio.sleep(0.01)
+    finally:
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR1)
+    assert profiler.requested == 1
+
+    summaries = await _profile_iterations(profiler, 1)
+    assert summaries[0]["mode"] == "cprofile"
+    stats = pstats.Stats(str(profiler.written[0]))
+    assert any(name == "_busy_cycle" for _, _, name in stats.stats)
+
+    with pytest.raises(ValueError):
+        RuntimeProfiler(mode="perf")